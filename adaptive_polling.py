@@ -0,0 +1,326 @@
+import os
+import math
+import time
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 적응형 조회 설정 (환경 변수로 조정 가능)
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "on").lower() not in ("off", "0", "false")
+ADAPTIVE_MIN_FACTOR = float(os.getenv("ADAPTIVE_MIN_FACTOR", 0.25))  # 기본 주기 대비 가장 짧은 조회 간격 배율
+ADAPTIVE_MAX_FACTOR = float(os.getenv("ADAPTIVE_MAX_FACTOR", 4))  # 기본 주기 대비 가장 긴 조회 간격 배율
+VOLATILITY_REFERENCE = float(os.getenv("ADAPTIVE_VOLATILITY_REFERENCE", 5))  # 가중치 1에 해당하는 시간당 변동성(%)
+VOLATILITY_HALF_LIFE = float(os.getenv("ADAPTIVE_VOLATILITY_HALF_LIFE", 3600))  # 변동성 지수 평균의 반감기(초)
+ALERT_PROXIMITY = float(os.getenv("ADAPTIVE_ALERT_PROXIMITY", 5))  # 알림 조건까지 이 거리(%) 안이면 빠르게 조회
+DORMANT_SECONDS = float(os.getenv("ADAPTIVE_DORMANT_SECONDS", 6 * 3600))  # 이 시간 동안 가격이 그대로면 휴면
+ACTIVITY_RETENTION = 24 * 3600  # 이 시간(초) 동안 조회되지 않은 자산의 기록은 제거
+
+# 가중치 범위 (변동성, 알림 근접도 각각)
+WEIGHT_MIN = 0.25
+WEIGHT_MAX = 4.0
+
+# 스테이블코인 심볼 (가격이 거의 움직이지 않으므로 느리게 조회)
+STABLECOIN_SYMBOLS = {
+    "USDT", "USDC", "DAI", "BUSD", "TUSD", "USDP", "FDUSD", "PYUSD", "USDE", "FRAX", "LUSD", "USDD", "GUSD", "USDC.E", "USDT.E",
+}
+
+
+# 자산 키 (네트워크, 토큰 주소 소문자)
+def asset_key(token_address: str, network: str) -> Tuple[str, str]:
+    return network.lower(), token_address.lower()
+
+
+class AssetActivity:
+    """
+    자산별 최근 가격과 변동성(시간당 %, 지수 가중 평균) 추정치입니다.
+    """
+
+    def __init__(self, price: float, now: float):
+        self.price = price
+        self.observed_at = now
+        self.changed_at = now
+        self.variance = None  # 초당 로그 수익률 분산
+
+    def update(self, price: float, now: float):
+        elapsed = now - self.observed_at
+        if elapsed <= 0 or price <= 0 or self.price <= 0:
+            return
+
+        log_return = math.log(price / self.price)
+        alpha = 1 - math.exp(-elapsed * math.log(2) / VOLATILITY_HALF_LIFE)
+        sample = log_return * log_return / elapsed
+        self.variance = sample if self.variance is None else self.variance + alpha * (sample - self.variance)
+
+        if price != self.price:
+            self.changed_at = now
+        self.price = price
+        self.observed_at = now
+
+    @property
+    def volatility(self) -> Optional[float]:
+        if self.variance is None:
+            return None
+        return math.sqrt(self.variance * 3600) * 100
+
+
+class AdaptivePolicy:
+    """
+    자산마다 조회 간격을 정하는 정책입니다. 변동성이 크거나, 구독자가 많거나, 가격이 알림 조건에 가까운 자산은
+    빠르게, 스테이블코인과 휴면 자산은 느리게 조회하되, tokens/multi 요청 수는 모든 자산을 기본 주기로 조회할 때를 넘지 않게 합니다.
+    """
+
+    def __init__(self, min_factor: float, max_factor: float):
+        self.min_factor = min(max(min_factor, 0.01), 1.0)
+        self.max_factor = max(max_factor, 1.0)
+        self._activity: Dict[Tuple[str, str], AssetActivity] = {}
+        self._pruned_at = time.monotonic()
+
+        # 통계 (소비자별 마지막 계산 기준)
+        self.reasons: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, token_address: str, network: str, price: float, now: Optional[float] = None):
+        """
+        새로 조회한 가격을 기록하여 변동성을 갱신합니다. 캐시에서 재사용한 가격은 기록하지 않습니다.
+
+        Args:
+            token_address (str): 토큰 주소
+            network (str): 네트워크 이름
+            price (float): 조회한 가격
+            now (float, optional): 조회 시각 (time.monotonic 기준)
+        """
+        if not price or price <= 0:
+            return
+
+        now = time.monotonic() if now is None else now
+        key = asset_key(token_address, network)
+        activity = self._activity.get(key)
+        if activity is None:
+            self._activity[key] = AssetActivity(price, now)
+        else:
+            activity.update(price, now)
+
+        # 더 이상 추적하지 않는 자산 정리 (분에 한 번)
+        if now - self._pruned_at >= 60:
+            self._pruned_at = now
+            for expired in [k for k, a in self._activity.items() if now - a.observed_at > ACTIVITY_RETENTION]:
+                del self._activity[expired]
+
+    def last_price(self, token_address: str, network: str) -> Optional[float]:
+        """
+        마지막으로 관측한 가격을 반환합니다.
+        """
+        activity = self._activity.get(asset_key(token_address, network))
+        return activity.price if activity else None
+
+    def weight(self, asset: Dict[str, Any], distance: Optional[float] = None,
+               now: Optional[float] = None) -> Tuple[float, str]:
+        """
+        자산의 조회 가중치(클수록 자주 조회)와 주된 이유를 계산합니다.
+
+        Args:
+            asset (Dict[str, Any]): token_address, network, symbol, subscribers(목록 또는 수)를 가진 자산
+            distance (float, optional): 현재 가격에서 가장 가까운 알림 조건까지의 거리(%)
+            now (float, optional): 현재 시각 (time.monotonic 기준)
+
+        Returns:
+            Tuple[float, str]: (가중치, 이유: volatile/near_alert/popular/stable/dormant/normal)
+        """
+        now = time.monotonic() if now is None else now
+        activity = self._activity.get(asset_key(asset["token_address"], asset["network"]))
+        reason = "normal"
+
+        # 변동성
+        volatility_weight = 1.0
+        if activity is not None and now - activity.changed_at >= DORMANT_SECONDS:
+            volatility_weight = WEIGHT_MIN
+            reason = "dormant"
+        elif activity is not None and activity.volatility is not None:
+            volatility_weight = min(max(activity.volatility / VOLATILITY_REFERENCE, WEIGHT_MIN), WEIGHT_MAX)
+            if volatility_weight > 1:
+                reason = "volatile"
+
+        # 스테이블코인은 변동성 추정과 관계없이 느리게 (디페깅은 알림 근접도가 보완)
+        if (asset.get("symbol") or "").upper() in STABLECOIN_SYMBOLS:
+            volatility_weight = WEIGHT_MIN
+            reason = "stable"
+
+        # 구독자 수 (1명 1, 4명 2, 16명 3)
+        subscribers = asset.get("subscribers", 1)
+        subscriber_count = len(subscribers) if isinstance(subscribers, (list, tuple, set)) else int(subscribers or 1)
+        subscriber_weight = 1 + math.log2(max(subscriber_count, 1)) / 2
+        if subscriber_weight > 1 and reason == "normal":
+            reason = "popular"
+
+        # 알림 조건 근접도
+        proximity_weight = 1.0
+        if distance is not None and distance < ALERT_PROXIMITY:
+            proximity_weight = min(ALERT_PROXIMITY / max(distance, ALERT_PROXIMITY / WEIGHT_MAX), WEIGHT_MAX)
+            reason = "near_alert"
+
+        return volatility_weight * subscriber_weight * proximity_weight, reason
+
+    def exponent_range(self) -> Tuple[int, int]:
+        """
+        조회 간격으로 쓸 수 있는 기본 주기 배율의 2의 거듭제곱 지수 범위를 반환합니다.
+        """
+        return (math.ceil(math.log2(self.min_factor) - 1e-9), math.floor(math.log2(self.max_factor) + 1e-9))
+
+    @staticmethod
+    def request_cost(counts: Dict[Tuple[str, int], int], batch_size: int) -> float:
+        """
+        (네트워크, 주기 지수)별 자산 수로 기본 주기당 tokens/multi 요청 수를 계산합니다.
+        같은 네트워크, 같은 주기의 자산은 분할 수집기가 배치 크기만큼 묶어 함께 조회합니다.
+
+        Args:
+            counts (Dict[Tuple[str, int], int]): (네트워크, 지수) → 자산 수 (간격 = 기본 주기 × 2^지수)
+            batch_size (int): tokens/multi 요청 한 번에 조회하는 최대 자산 수
+
+        Returns:
+            float: 기본 주기당 요청 수
+        """
+        return sum(math.ceil(count / batch_size) / 2 ** exponent for (_, exponent), count in counts.items() if count)
+
+    def intervals(self, assets: Iterable[Dict[str, Any]], base_interval: float,
+                  distances: Optional[Dict[Tuple[str, str], float]] = None,
+                  now: Optional[float] = None, consumer: str = "default",
+                  batch_size: int = 30) -> Dict[Tuple[str, str], float]:
+        """
+        자산별 조회 간격을 계산합니다. 가중치에 반비례하게 나눈 간격을 기본 주기 × 2의 거듭제곱
+        ([최소 배율, 최대 배율] 범위)으로 맞추고, tokens/multi 요청 수가 모든 자산을 기본 주기로 조회할 때를
+        넘지 않을 때까지 전체 간격을 늘립니다. 넘는 상태로 수렴하지 않으면 모든 자산에 기본 주기를 사용합니다.
+        예산 안에서 이미 보내는 요청에 빈자리가 있으면 가중치가 큰 자산부터 빠른 주기로 옮깁니다.
+
+        Args:
+            assets (Iterable[Dict[str, Any]]): 추적 자산 목록
+            base_interval (float): 기본 조회 주기(초)
+            distances (Dict[Tuple[str, str], float], optional): asset_key별 알림 조건까지의 거리(%)
+            now (float, optional): 현재 시각 (time.monotonic 기준)
+            consumer (str, optional): 소비자 이름 (통계 구분용)
+            batch_size (int, optional): tokens/multi 요청 한 번에 조회하는 최대 자산 수
+
+        Returns:
+            Dict[Tuple[str, str], float]: asset_key별 조회 간격(초)
+        """
+        distances = distances or {}
+        weights: Dict[Tuple[str, str], float] = {}
+        reasons: Dict[str, int] = {}
+
+        for asset in assets:
+            key = asset_key(asset["token_address"], asset["network"])
+            weight, reason = self.weight(asset, distances.get(key), now)
+            weights[key] = weight
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+        self.reasons[consumer] = reasons
+        if not weights:
+            return {}
+
+        batch_size = max(batch_size, 1)
+        low, high = self.exponent_range()
+
+        def count(exponents: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, int], int]:
+            counts: Dict[Tuple[str, int], int] = {}
+            for (network, _), exponent in exponents.items():
+                counts[(network, exponent)] = counts.get((network, exponent), 0) + 1
+            return counts
+
+        # 예산: 모든 자산을 기본 주기로 조회할 때의 요청 수
+        budget = self.request_cost(count({key: 0 for key in weights}), batch_size)
+
+        def snap(scale: float) -> Dict[Tuple[str, str], int]:
+            return {key: min(max(round(math.log2(scale / weight)), low), high) for key, weight in weights.items()}
+
+        # 예산 안에 들어올 때까지 전체 간격을 늘림
+        exponents = None
+        scale = sum(weights.values()) / len(weights)
+        for _ in range(8):
+            trial = snap(scale)
+            cost = self.request_cost(count(trial), batch_size)
+            if cost <= budget + 1e-9:
+                exponents = trial
+                break
+            scale *= max(cost / budget, 1.25)
+
+        if exponents is None:
+            # 수렴하지 않으면 기본 주기 사용 (예산과 같음)
+            exponents = {key: 0 for key in weights}
+        else:
+            # 예산 안에서 전체 간격을 최대한 줄임 (배율이 절반이 될 때마다 지수가 1씩 줄어듦)
+            for _ in range(high - low):
+                trial = snap(scale / 2)
+                if trial == exponents or self.request_cost(count(trial), batch_size) > budget + 1e-9:
+                    break
+                exponents, scale = trial, scale / 2
+
+        # 네트워크별로 같은 간격의 자산 묶음을 한 단계 빠른 주기로 옮겨도 예산 안이면 옮김 (가중치가 큰 묶음부터)
+        for _ in range(high - low):
+            moved = False
+            classes = sorted(
+                {(key[0], exponent) for key, exponent in exponents.items() if exponent > low},
+                key=lambda cls: max(weights[key] for key, exponent in exponents.items()
+                                    if (key[0], exponent) == cls),
+                reverse=True
+            )
+            for network, exponent in classes:
+                trial = {key: value - 1 if (key[0], value) == (network, exponent) else value
+                         for key, value in exponents.items()}
+                if self.request_cost(count(trial), batch_size) <= budget + 1e-9:
+                    exponents, moved = trial, True
+            if not moved:
+                break
+
+        # 이미 보내는 요청의 빈자리 채우기: 한 단계 빠른 주기에 같은 네트워크 자산이 있고 배치에 여유가 있으면 옮김
+        counts = count(exponents)
+        for exponent in range(low + 1, high + 1):
+            for network in {network for network, value in counts if value == exponent}:
+                faster = counts.get((network, exponent - 1), 0)
+                spare = -faster % batch_size if faster else 0
+                if not spare or not counts.get((network, exponent)):
+                    continue
+                candidates = sorted(
+                    (key for key, value in exponents.items() if key[0] == network and value == exponent),
+                    key=lambda key: weights[key], reverse=True
+                )[:spare]
+                for key in candidates:
+                    exponents[key] = exponent - 1
+                counts[(network, exponent)] -= len(candidates)
+                counts[(network, exponent - 1)] = faster + len(candidates)
+
+        return {key: base_interval * 2 ** exponent for key, exponent in exponents.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        정책 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 변동성을 추정 중인 자산 수, 소비자별 마지막 계산의 이유별 자산 수
+        """
+        return {
+            "tracked": len(self._activity),
+            "with_volatility": sum(1 for activity in self._activity.values() if activity.variance is not None),
+            "reasons": {consumer: dict(reasons) for consumer, reasons in self.reasons.items()},
+        }
+
+
+# 프로세스 전역 적응형 조회 정책
+adaptive_policy = AdaptivePolicy(min_factor=ADAPTIVE_MIN_FACTOR, max_factor=ADAPTIVE_MAX_FACTOR)
+
+
+# 목표 가격 알림까지의 거리 계산
+def distance_to_targets(price: Optional[float], targets: Iterable[float]) -> Optional[float]:
+    """
+    현재 가격에서 가장 가까운 목표 가격까지의 거리를 현재 가격 대비 %로 계산합니다.
+
+    Args:
+        price (float, optional): 현재 가격
+        targets (Iterable[float]): 목표 가격 목록 (price_above/price_below 임계값)
+
+    Returns:
+        Optional[float]: 거리(%). 가격이나 목표가 없으면 None
+    """
+    if not price or price <= 0:
+        return None
+    distances = [abs(price - target) / price * 100 for target in targets if target and target > 0]
+    return min(distances) if distances else None
@@ -1,11 +1,12 @@
 import logging
 import asyncio
-import sqlite3
 from datetime import datetime, timedelta
-import requests
 import json
 from typing import Dict, List, Any, Tuple
 from scam_checker_all import check_token_scam
+from gecko_client import api_get, GECKO_API_BASE
+from models import parse_token, parse_token_info, parse_pools
+from db import get_connection, run_db
 import time
 
 # 지원하는 네트워크 목록
@@ -32,9 +33,9 @@ def get_all_tokens() -> List[Tuple[int, str, str]]:
     Returns:
         List[Tuple[int, str, str]]: (user_id, token_address, network) 형태의 튜플 리스트
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT user_id, token, network FROM tokens")
+    cursor.execute("SELECT user_id, token_address, network FROM subscriptions")
     tokens = cursor.fetchall()
     conn.close()
     return tokens
@@ -50,39 +51,13 @@ def get_user_tokens(user_id: int) -> List[Tuple[str, str]]:
     Returns:
         List[Tuple[str, str]]: (token_address, network) 형태의 튜플 리스트
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT token, network FROM tokens WHERE user_id = ?", (user_id,))
+    cursor.execute("SELECT token_address, network FROM subscriptions WHERE user_id = ?", (user_id,))
     tokens = cursor.fetchall()
     conn.close()
     return tokens
 
-# API 요청 사이에 지연 시간을 추가하는 함수
-async def rate_limited_request(url, headers=None):
-    max_retries = 5
-    retry_delay = 3
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=headers)
-            
-            # 성공적인 응답이면 바로 반환
-            if response.status_code != 429:
-                return response
-            
-            # 429 오류(Rate Limit)인 경우 지연 후 재시도
-            logger.warning(f"API 요청 제한 도달 (429). {retry_delay}초 후 재시도 ({attempt+1}/{max_retries})...")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2  # 지수 백오프 적용
-            
-        except Exception as e:
-            logger.error(f"API 요청 중 오류: {str(e)}")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2
-    
-    # 모든 재시도 실패 시 마지막 응답 반환
-    return response
-
 # 토큰 가격 정보 조회 개선
 async def get_token_price(token_address: str, network: str = "ethereum") -> Dict[str, Any]:
     """
@@ -112,34 +87,25 @@ async def get_token_price(token_address: str, network: str = "ethereum") -> Dict
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"API 요청: {url}")
         
-        # 일반 requests.get 대신 rate_limited_request 사용
-        response = await rate_limited_request(url, headers=headers)
+        # 공유 HTTP 클라이언트 사용 (재시도/백오프 포함)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
-                # 더 많은 정보 추출
-                price_usd = float(attrs.get('price_usd') or 0)
-                token_name = attrs.get('name', '알 수 없음')
-                token_symbol = attrs.get('symbol', '???')
-                decimals = int(attrs.get('decimals') or 0)
-                total_supply = float(attrs.get('total_supply') or 0)
-                
+            token = parse_token(data)
+            if token is not None:
                 return {
                     "success": True,
-                    "price": price_usd,
-                    "name": token_name,
-                    "symbol": token_symbol,
-                    "decimals": decimals,
-                    "total_supply": total_supply,
-                    "coingecko_id": attrs.get('coingecko_coin_id')
+                    "price": token.price_usd,
+                    "name": token.name,
+                    "symbol": token.symbol,
+                    "decimals": token.decimals,
+                    "total_supply": token.total_supply,
+                    "coingecko_id": token.coingecko_coin_id
                 }
             else:
                 logger.error(f"API 응답에 필요한 데이터가 없습니다: {data}")
@@ -189,60 +155,53 @@ async def get_token_additional_info(token_address: str, network: str = "ethereum
         result = {"success": True}
         
         # 1. 토큰 정보 엔드포인트 (소셜 미디어, 웹사이트 등)
-        info_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/info"
-        headers = {"Accept": "application/json"}
+        info_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/info"
         
         logger.info(f"토큰 정보 API 요청: {info_url}")
-        info_response = await rate_limited_request(info_url, headers=headers)
+        info_response = await api_get(info_url)
         
         if info_response.status_code == 200:
-            info_data = info_response.json()
-            if 'data' in info_data and 'attributes' in info_data['data']:
-                attrs = info_data['data']['attributes']
-                
+            info = parse_token_info(info_response.json())
+            if info is not None:
                 # 소셜 미디어 및 웹사이트 정보
-                result["image_url"] = attrs.get('image_url')
-                result["websites"] = attrs.get('websites', [])
-                result["description"] = attrs.get('description')
-                result["discord_url"] = attrs.get('discord_url')
-                result["telegram_handle"] = attrs.get('telegram_handle')
-                result["twitter_handle"] = attrs.get('twitter_handle')
-                result["categories"] = attrs.get('categories', [])
-                result["gt_score"] = float(attrs.get('gt_score') or 0)
+                result["image_url"] = info.image_url
+                result["websites"] = info.websites
+                result["description"] = info.description
+                result["discord_url"] = info.discord_url
+                result["telegram_handle"] = info.telegram_handle
+                result["twitter_handle"] = info.twitter_handle
+                result["categories"] = info.categories
+                result["gt_score"] = info.gt_score
         
         # 2. 토큰 기본 정보 및 시장 데이터
-        token_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        token_response = await rate_limited_request(token_url, headers=headers)
+        token_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
+        token_response = await api_get(token_url)
         
         if token_response.status_code == 200:
-            token_data = token_response.json()
-            if 'data' in token_data and 'attributes' in token_data['data']:
-                attrs = token_data['data']['attributes']
-                
+            token = parse_token(token_response.json())
+            if token is not None:
                 # 시가총액
-                if 'fdv_usd' in attrs and attrs['fdv_usd']:
-                    result["market_cap"] = float(attrs['fdv_usd'])
+                if token.fdv_usd:
+                    result["market_cap"] = token.fdv_usd
                 
                 # 총 공급량
-                if 'total_supply' in attrs and attrs['total_supply']:
-                    result["total_supply"] = float(attrs['total_supply'])
+                if token.total_supply:
+                    result["total_supply"] = token.total_supply
                 
                 # 가격 변동
-                if 'price_change_percentage' in attrs and attrs['price_change_percentage']:
-                    price_changes = {}
-                    for period, value in attrs['price_change_percentage'].items():
-                        if value:
-                            price_changes[period] = float(value)
-                    result["price_changes"] = price_changes
+                if token.price_change_percentage:
+                    result["price_changes"] = {
+                        period: float(value) for period, value in token.price_change_percentage.items() if value
+                    }
         
         # 3. 풀 정보 조회
-        pools_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/pools"
-        pools_response = await rate_limited_request(pools_url, headers=headers)
+        pools_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/pools"
+        pools_response = await api_get(pools_url)
         
         if pools_response.status_code == 200:
-            pools_data = pools_response.json()
+            pools = parse_pools(pools_response.json())
             
-            if 'data' in pools_data and pools_data['data']:
+            if pools:
                 # 총 유동성 계산
                 total_liquidity = 0
                 total_volume = 0
@@ -250,45 +209,37 @@ async def get_token_additional_info(token_address: str, network: str = "ethereum
                 top_liquidity = 0
                 pools_info = []
                 
-                for pool in pools_data['data']:
-                    if 'attributes' in pool:
-                        pool_attr = pool['attributes']
+                for pool in pools:
+                    # 풀 정보 저장
+                    pool_info = {
+                        "address": pool.address,
+                        "name": pool.name,
+                        "dex_name": pool.dex_name,
+                        "created_at": pool.created_at
+                    }
+                    
+                    # 유동성 합산
+                    if pool.reserve_in_usd:
+                        total_liquidity += pool.reserve_in_usd
+                        pool_info["liquidity"] = pool.reserve_in_usd
                         
-                        # 풀 정보 저장
-                        pool_info = {
-                            "address": pool_attr.get('address'),
-                            "name": pool_attr.get('name'),
-                            "dex_name": pool_attr.get('dex_name'),
-                            "created_at": pool_attr.get('pool_created_at')
+                        # 가장 큰 유동성을 가진 DEX 찾기
+                        if pool.reserve_in_usd > top_liquidity:
+                            top_liquidity = pool.reserve_in_usd
+                            top_dex = pool.dex_name
+                    
+                    # 거래량 합산
+                    if pool.volume_usd:
+                        pool_info["volume"] = {
+                            period: float(value) for period, value in pool.volume_usd.items() if value
                         }
-                        
-                        # 유동성 합산
-                        if 'reserve_in_usd' in pool_attr and pool_attr['reserve_in_usd']:
-                            pool_liquidity = float(pool_attr['reserve_in_usd'])
-                            total_liquidity += pool_liquidity
-                            pool_info["liquidity"] = pool_liquidity
-                            
-                            # 가장 큰 유동성을 가진 DEX 찾기
-                            if pool_liquidity > top_liquidity:
-                                top_liquidity = pool_liquidity
-                                top_dex = pool_attr.get('dex_name')
-                        
-                        # 거래량 합산
-                        if 'volume_usd' in pool_attr and pool_attr['volume_usd']:
-                            volume_data = {}
-                            for period, value in pool_attr['volume_usd'].items():
-                                if value:
-                                    volume_data[period] = float(value)
-                                    if period == 'h24' and value:
-                                        total_volume += float(value)
-                            
-                            pool_info["volume"] = volume_data
-                        
-                        # 거래 건수
-                        if 'transactions' in pool_attr and pool_attr['transactions']:
-                            pool_info["transactions"] = pool_attr['transactions']
-                        
-                        pools_info.append(pool_info)
+                        total_volume += pool.volume_24h
+                    
+                    # 거래 건수
+                    if pool.transactions:
+                        pool_info["transactions"] = pool.transactions
+                    
+                    pools_info.append(pool_info)
                 
                 result["liquidity"] = total_liquidity
                 result["volume_24h"] = total_volume
@@ -296,8 +247,8 @@ async def get_token_additional_info(token_address: str, network: str = "ethereum
                 result["pools"] = pools_info
         
         # 4. 가격 차트 데이터 (OHLCV)
-        ohlcv_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/ohlcv/day"
-        ohlcv_response = await rate_limited_request(ohlcv_url, headers=headers)
+        ohlcv_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/ohlcv/day"
+        ohlcv_response = await api_get(ohlcv_url)
         
         if ohlcv_response.status_code == 200:
             ohlcv_data = ohlcv_response.json()
@@ -338,13 +289,12 @@ async def analyze_token(token_address: str, network: str = "ethereum") -> Dict[s
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"API 요청: {url}")
         
-        # 일반 requests.get 대신 rate_limited_request 사용
-        response = await rate_limited_request(url, headers=headers)
+        # 공유 HTTP 클라이언트 사용 (재시도/백오프 포함)
+        response = await api_get(url)
         
         # 초기화: token_info 변수를 여기서 정의
         token_info = {
@@ -359,37 +309,18 @@ async def analyze_token(token_address: str, network: str = "ethereum") -> Dict[s
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
-                # 기본 정보 추출
-                token_info = {
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???'),
-                    "price": float(attrs.get('price_usd') or 0),
-                    "decimals": int(attrs.get('decimals') or 0),
-                    "total_supply": float(attrs.get('total_supply') or 0),
-                    "market_cap": float(attrs.get('market_cap_usd') or 0),
-                    "created_at": attrs.get('created_at')
-                }
-                
-                # 더 많은 정보 추출
-                price_usd = float(attrs.get('price_usd') or 0)
-                token_name = attrs.get('name', '알 수 없음')
-                token_symbol = attrs.get('symbol', '???')
-                decimals = int(attrs.get('decimals') or 0)
-                total_supply = float(attrs.get('total_supply') or 0)
-                
+            token = parse_token(data)
+            if token is not None:
                 return {
                     "success": True,
                     "token_address": token_address,
                     "network": network,
-                    "name": token_name,
-                    "symbol": token_symbol,
-                    "price": price_usd,
-                    "decimals": decimals,
-                    "total_supply": total_supply,
-                    "coingecko_id": attrs.get('coingecko_coin_id')
+                    "name": token.name,
+                    "symbol": token.symbol,
+                    "price": token.price_usd,
+                    "decimals": token.decimals,
+                    "total_supply": token.total_supply,
+                    "coingecko_id": token.coingecko_coin_id
                 }
             else:
                 logger.error(f"API 응답에 필요한 데이터가 없습니다: {data}")
@@ -415,7 +346,7 @@ async def analyze_all_tokens() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: 분석 결과
     """
-    tokens = get_all_tokens()
+    tokens = await run_db(get_all_tokens)
     
     if not tokens:
         return {
@@ -441,12 +372,16 @@ async def analyze_all_tokens() -> Dict[str, Any]:
     high_risk_count = 0
     network_distribution = {}  # 네트워크별 토큰 분포
     
-    for key, (token_address, network) in unique_tokens.items():
+    # 모든 토큰을 동시에 분석 (동시 요청 수와 예산은 gecko_client가 조절)
+    analyses = await asyncio.gather(
+        *(analyze_token(token_address, network) for token_address, network in unique_tokens.values()),
+        return_exceptions=True
+    )
+    
+    for (key, (token_address, network)), analysis in zip(unique_tokens.items(), analyses):
         try:
-            # 각 토큰 분석 사이에 지연 시간 추가
-            await asyncio.sleep(2)  # 1초에서 2초로 증가
-            
-            analysis = await analyze_token(token_address, network)
+            if isinstance(analysis, Exception):
+                raise analysis
             
             if analysis["success"]:
                 # 고위험 토큰 카운트
@@ -531,7 +466,7 @@ async def analyze_user_tokens(user_id: int) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: 분석 결과
     """
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         return {
@@ -544,12 +479,16 @@ async def analyze_user_tokens(user_id: int) -> Dict[str, Any]:
     total_portfolio_value = 0
     portfolio_risk_score = 0
     
-    for token_address, network in tokens:
+    # 모든 토큰을 동시에 분석 (동시 요청 수와 예산은 gecko_client가 조절)
+    analyses = await asyncio.gather(
+        *(analyze_token(token_address, network) for token_address, network in tokens),
+        return_exceptions=True
+    )
+    
+    for (token_address, network), analysis in zip(tokens, analyses):
         try:
-            # 각 토큰 분석 사이에 지연 시간 추가
-            await asyncio.sleep(2)  # 1초에서 2초로 증가
-            
-            analysis = await analyze_token(token_address, network)
+            if isinstance(analysis, Exception):
+                raise analysis
             
             if analysis["success"]:
                 # 고위험 토큰 카운트
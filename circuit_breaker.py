@@ -0,0 +1,202 @@
+import os
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 회로 차단 설정 (환경 변수로 조정 가능)
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))  # 연속 실패 몇 번에 차단할지
+RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 60))  # 차단 후 시험 요청까지 대기(초)
+MAX_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_MAX_RECOVERY_TIMEOUT", 600))  # 시험 실패 시 늘어나는 대기의 상한(초)
+
+# 회로 상태
+STATE_CLOSED = "closed"        # 정상
+STATE_OPEN = "open"            # 차단 (요청 즉시 실패)
+STATE_HALF_OPEN = "half_open"  # 시험 요청 1건만 허용
+
+
+class CircuitOpenError(Exception):
+    """
+    회로가 열려 있어 요청을 보내지 않고 즉시 실패할 때 발생합니다.
+    """
+
+    def __init__(self, network: Optional[str], endpoint: str, retry_in: float):
+        self.network = network
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"{network or 'global'}/{endpoint} 엔드포인트 일시 차단 중 ({retry_in:.0f}초 후 재시도)")
+
+
+class CircuitBreaker:
+    """
+    (네트워크, 엔드포인트 유형) 하나에 대한 회로 차단기입니다.
+    연속 실패가 임계값에 도달하면 열리고, 대기 시간이 지나면 시험 요청 1건으로 복구 여부를 확인합니다.
+    """
+
+    def __init__(self, network: Optional[str], endpoint: str):
+        self.network = network
+        self.endpoint = endpoint
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.recovery_timeout = RECOVERY_TIMEOUT
+        self.probe_in_flight = False
+
+        # 통계
+        self.trip_count = 0
+        self.rejected_count = 0
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+
+    def is_open(self) -> bool:
+        """
+        요청을 보내도 소용없는 상태인지 확인합니다. (시험 요청 가능 시점이 되면 False)
+        """
+        if self.state == STATE_OPEN:
+            return self.retry_in() > 0
+        if self.state == STATE_HALF_OPEN:
+            return self.probe_in_flight
+        return False
+
+    def allow(self):
+        """
+        요청을 보내기 전에 호출합니다.
+
+        Raises:
+            CircuitOpenError: 회로가 열려 있거나 시험 요청이 이미 진행 중인 경우
+        """
+        if self.state == STATE_CLOSED:
+            return
+
+        if self.state == STATE_OPEN and self.retry_in() <= 0:
+            self.state = STATE_HALF_OPEN
+            self.probe_in_flight = False
+            logger.info(f"회로 시험 요청 허용: {self.network}/{self.endpoint}")
+
+        if self.state == STATE_HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return
+
+        self.rejected_count += 1
+        raise CircuitOpenError(self.network, self.endpoint, self.retry_in())
+
+    def record_success(self):
+        if self.state != STATE_CLOSED:
+            logger.info(f"회로 복구: {self.network}/{self.endpoint}")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+        self.recovery_timeout = RECOVERY_TIMEOUT
+
+    def release_probe(self):
+        # 성공/실패를 판단할 수 없는 결과(429, 취소)로 끝난 시험 요청 반납
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+
+        if self.state == STATE_HALF_OPEN:
+            # 시험 요청 실패: 대기 시간을 늘려 다시 차단
+            self.recovery_timeout = min(self.recovery_timeout * 2, MAX_RECOVERY_TIMEOUT)
+            self._trip()
+        elif self.state == STATE_CLOSED and self.failures >= FAILURE_THRESHOLD:
+            self._trip()
+
+    def _trip(self):
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        self.trip_count += 1
+        logger.warning(
+            f"회로 차단: {self.network}/{self.endpoint} 연속 {self.failures}회 실패, "
+            f"{self.recovery_timeout:.0f}초 동안 요청 중단"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": self.retry_in() if self.state == STATE_OPEN else 0.0,
+            "trip_count": self.trip_count,
+            "rejected_count": self.rejected_count,
+        }
+
+
+# (네트워크, 엔드포인트 유형)별 회로 차단기
+_breakers: Dict[Tuple[Optional[str], str], CircuitBreaker] = {}
+
+
+# 회로 차단기 가져오기
+def get_breaker(network: Optional[str], endpoint: str) -> CircuitBreaker:
+    """
+    (네트워크, 엔드포인트 유형)에 해당하는 회로 차단기를 반환합니다. 없으면 새로 만듭니다.
+
+    Args:
+        network (Optional[str]): GeckoTerminal 네트워크 ID (예: "eth", "solana")
+        endpoint (str): 엔드포인트 유형 (gecko_client.classify_url 참고)
+
+    Returns:
+        CircuitBreaker: 회로 차단기
+    """
+    key = (network, endpoint)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = _breakers[key] = CircuitBreaker(network, endpoint)
+    return breaker
+
+
+# 회로가 열려 있는지 확인 (스케줄러에서 네트워크 건너뛰기 판단용)
+def is_circuit_open(network: Optional[str], endpoint: str) -> bool:
+    """
+    해당 (네트워크, 엔드포인트 유형)이 차단 중인지 확인합니다.
+
+    Args:
+        network (Optional[str]): GeckoTerminal 네트워크 ID
+        endpoint (str): 엔드포인트 유형
+
+    Returns:
+        bool: 차단 중이면 True
+    """
+    breaker = _breakers.get((network, endpoint))
+    return breaker is not None and breaker.is_open()
+
+
+# 전체 회로 상태
+def circuit_status() -> Dict[str, Dict[str, Any]]:
+    """
+    모든 회로 차단기의 상태를 반환합니다.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: "네트워크/엔드포인트" → 상태
+    """
+    return {
+        f"{network or 'global'}/{endpoint}": breaker.status()
+        for (network, endpoint), breaker in sorted(_breakers.items(), key=lambda item: str(item[0]))
+    }
+
+
+# 회로 상태 텍스트 생성 (텔레그램 메시지용)
+def format_circuit_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 회로 차단 상태 문자열을 생성합니다.
+    정상(closed)이 아닌 회로만 표시합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    degraded = {name: item for name, item in circuit_status().items() if item["state"] != STATE_CLOSED}
+
+    text = "\n⚡ <b>회로 차단기</b>\n"
+    if not degraded:
+        return text + "모든 엔드포인트 정상\n"
+
+    for name, item in degraded.items():
+        if item["state"] == STATE_OPEN:
+            text += f"• {name}: 차단 ({item['retry_in']:.0f}초 후 시험), 거부 {item['rejected_count']}회\n"
+        else:
+            text += f"• {name}: 복구 시험 중\n"
+
+    return text
@@ -0,0 +1,648 @@
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 데이터베이스 파일 경로
+DB_PATH = os.getenv("DB_PATH", "tokens.db")
+
+# SQLite 설정 (환경 변수로 조정 가능)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL: 읽기가 쓰기를 기다리지 않음
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # WAL에서는 NORMAL로도 손상 없음
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -16000))  # 음수는 KiB 단위 (약 16MB)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 128 * 1024 * 1024))  # 메모리 매핑 크기(바이트)
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))  # 잠금 대기 시간(ms)
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", 256))  # 연결당 준비된 문장 캐시 크기
+
+# 비동기 코드의 DB 작업을 실행할 전용 스레드 수 (1이면 모든 쓰기가 한 스레드에서 순서대로 실행됨)
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", 1))
+DB_SLOW_CALL_MS = float(os.getenv("DB_SLOW_CALL_MS", 200))  # 이 시간 이상 걸린 DB 작업은 경고 로그
+
+# 스레드별 연결 (sqlite3 연결은 만든 스레드에서만 사용 가능)
+_local = threading.local()
+
+# 연결 통계
+db_stats = {
+    "connections_opened": 0,  # 실제로 연 연결 수
+    "handles_issued": 0,      # get_connection 호출 수
+}
+
+
+# 연결 설정 적용
+def _apply_pragmas(conn: sqlite3.Connection):
+    journal_mode = conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}").fetchone()[0]
+    if journal_mode.lower() != SQLITE_JOURNAL_MODE.lower():
+        logger.warning(f"SQLite 저널 모드 {SQLITE_JOURNAL_MODE} 설정 실패, 현재 모드: {journal_mode}")
+
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+# 현재 스레드의 연결 가져오기 (없으면 새로 열기)
+def _thread_connection() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            timeout=SQLITE_BUSY_TIMEOUT / 1000,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+        )
+        _apply_pragmas(conn)
+        _local.conn = conn
+        db_stats["connections_opened"] += 1
+        logger.info(f"SQLite 연결 열림: {DB_PATH} (스레드 {threading.current_thread().name})")
+    return conn
+
+
+class ManagedConnection:
+    """
+    스레드별 장기 연결을 감싸는 핸들입니다.
+    기존 코드의 connect() … close() 흐름을 그대로 쓸 수 있도록 close()는 연결을 닫지 않고,
+    이 핸들에서 시작되어 커밋되지 않은 트랜잭션만 롤백합니다.
+    row_factory는 공유 연결이 아니라 이 핸들에서 만든 커서에만 적용됩니다.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._outer_transaction = conn.in_transaction  # 핸들을 받을 때 이미 진행 중이던 트랜잭션
+        self.row_factory: Optional[Any] = None
+
+    def cursor(self) -> sqlite3.Cursor:
+        cursor = self._conn.cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        cursor = self.cursor()
+        cursor.execute(sql, parameters)
+        return cursor
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Iterable[Any]]) -> sqlite3.Cursor:
+        cursor = self.cursor()
+        cursor.executemany(sql, seq_of_parameters)
+        return cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.in_transaction
+
+    @property
+    def total_changes(self) -> int:
+        return self._conn.total_changes
+
+    def close(self):
+        # 연결은 유지하고, 커밋하지 않은 이 핸들의 변경만 버림 (기존 close()와 같은 동작)
+        if self._conn.in_transaction and not self._outer_transaction:
+            self._conn.rollback()
+
+    def __enter__(self) -> "ManagedConnection":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and self._conn.in_transaction and not self._outer_transaction:
+            self._conn.commit()
+        self.close()
+
+
+# 데이터베이스 연결 가져오기
+def get_connection() -> ManagedConnection:
+    """
+    현재 스레드의 장기 SQLite 연결 핸들을 반환합니다.
+    처음 호출할 때 WAL 모드와 pragma 설정이 적용된 연결을 열고, 이후에는 같은 연결을 재사용합니다.
+
+    Returns:
+        ManagedConnection: 연결 핸들 (close()는 연결을 닫지 않음)
+    """
+    db_stats["handles_issued"] += 1
+    return ManagedConnection(_thread_connection())
+
+
+# 현재 스레드의 연결 닫기 (종료 시)
+def close_connection():
+    """
+    현재 스레드의 장기 연결을 닫습니다. 봇 종료 시 호출합니다.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.close()
+        _local.conn = None
+        logger.info("SQLite 연결 닫힘")
+
+
+# 연결 상태
+def db_status() -> Dict[str, Any]:
+    """
+    데이터베이스 연결 통계와 현재 설정을 반환합니다.
+
+    Returns:
+        Dict[str, Any]: 연결 수, 핸들 발급 수, 저널 모드 등
+    """
+    conn = _thread_connection()
+    return {
+        "path": DB_PATH,
+        "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+        "synchronous": conn.execute("PRAGMA synchronous").fetchone()[0],
+        "connections_opened": db_stats["connections_opened"],
+        "handles_issued": db_stats["handles_issued"],
+    }
+
+
+class DatabaseExecutor:
+    """
+    이벤트 루프 밖의 전용 스레드에서 DB 작업을 실행합니다.
+    각 스레드는 get_connection()으로 자신의 장기 연결을 사용하므로 기존 동기 함수를 그대로 넘기면 됩니다.
+    느린 조회나 쓰기 잠금 대기가 텔레그램 업데이트 처리와 다른 스케줄러를 막지 않습니다.
+    """
+
+    def __init__(self, threads: int):
+        self.threads = max(threads, 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="db")
+        self._lock = threading.Lock()
+
+        # 통계
+        self.queued = 0       # 제출되었지만 아직 시작하지 않은 작업 수
+        self.running = 0      # 실행 중인 작업 수
+        self.max_queued = 0
+        self.calls = 0
+        self.errors = 0
+        self.slow_calls = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def _call(self, func: Callable[..., Any], submitted: float) -> Any:
+        started = time.perf_counter()
+        wait_ms = (started - submitted) * 1000
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+        failed = False
+        try:
+            return func()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            run_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.running -= 1
+                self.calls += 1
+                self.errors += failed
+                self.total_run_ms += run_ms
+                self.max_run_ms = max(self.max_run_ms, run_ms)
+                if run_ms >= DB_SLOW_CALL_MS:
+                    self.slow_calls += 1
+
+            if run_ms >= DB_SLOW_CALL_MS:
+                logger.warning(f"느린 DB 작업: {getattr(func, 'func', func).__name__} {run_ms:.0f}ms")
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        동기 DB 함수를 전용 스레드에서 실행하고 결과를 기다립니다.
+
+        Args:
+            func (Callable[..., Any]): get_connection()을 사용하는 동기 함수
+            *args, **kwargs: 함수 인자
+
+        Returns:
+            Any: 함수의 반환값 (예외는 그대로 전달됨)
+        """
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        call = functools.partial(self._call, functools.partial(func, *args, **kwargs), time.perf_counter())
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def shutdown(self):
+        """
+        각 작업 스레드의 연결을 닫고 실행기를 종료합니다. 봇 종료 시 호출합니다.
+        """
+        # 모든 스레드가 하나씩 맡도록 장벽에서 서로를 기다림 (sqlite3 연결은 만든 스레드에서만 닫을 수 있음)
+        barrier = threading.Barrier(self.threads)
+
+        def close_on_worker():
+            close_connection()
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+
+        for future in [self._executor.submit(close_on_worker) for _ in range(self.threads)]:
+            future.result()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        실행기 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 대기/실행 중인 작업 수, 호출 수, 대기/실행 시간(ms)
+        """
+        with self._lock:
+            return {
+                "threads": self.threads,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "calls": self.calls,
+                "errors": self.errors,
+                "slow_calls": self.slow_calls,
+                "avg_wait_ms": self.total_wait_ms / self.calls if self.calls else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+                "avg_run_ms": self.total_run_ms / self.calls if self.calls else 0.0,
+                "max_run_ms": self.max_run_ms,
+            }
+
+
+# 프로세스 전역 DB 실행기
+db_executor = DatabaseExecutor(threads=DB_EXECUTOR_THREADS)
+
+
+# 동기 DB 함수를 이벤트 루프 밖에서 실행
+async def run_db(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    비동기 핸들러와 스케줄러에서 DB 함수를 호출할 때 사용합니다.
+    예: tokens = await run_db(get_user_tokens, user_id)
+
+    Args:
+        func (Callable[..., Any]): get_connection()을 사용하는 동기 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        Any: 함수의 반환값
+    """
+    return await db_executor.run(func, *args, **kwargs)
+
+
+# DB 상태 텍스트 생성 (텔레그램 메시지용)
+def format_db_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 DB 실행기 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    stats = db_executor.stats()
+
+    return (
+        f"\n🗄 <b>DB 실행기</b> (스레드 {stats['threads']}개)\n"
+        f"대기: <b>{stats['queued']}</b>건 (최대 {stats['max_queued']}), 실행 중 {stats['running']}건, 완료 {stats['calls']}건\n"
+        f"대기 시간: 평균 {stats['avg_wait_ms']:.1f}ms / 최대 {stats['max_wait_ms']:.1f}ms\n"
+        f"실행 시간: 평균 {stats['avg_run_ms']:.1f}ms / 최대 {stats['max_run_ms']:.1f}ms\n"
+        + (f"느린 작업({DB_SLOW_CALL_MS:.0f}ms 이상): {stats['slow_calls']}건\n" if stats["slow_calls"] else "")
+        + (f"오류: {stats['errors']}건\n" if stats["errors"] else "")
+    )
+
+
+# 마이그레이션 작업 단위(행 수). 큰 테이블도 짧은 트랜잭션으로 나누어 변환
+MIGRATION_BATCH_SIZE = int(os.getenv("DB_MIGRATION_BATCH_SIZE", 5000))
+
+
+# 테이블 컬럼 선언 타입 조회 (테이블이 없으면 빈 딕셔너리)
+def _column_types(conn: ManagedConnection, table: str) -> Dict[str, str]:
+    return {row[1]: (row[2] or "").upper() for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+# token_ohlc.timestamp를 로컬 ISO 문자열에서 UTC epoch 정수 구간으로 변환
+def _migrate_ohlc_epoch(conn: ManagedConnection):
+    columns = _column_types(conn, "token_ohlc")
+    if not columns or columns.get("timestamp") == "INTEGER":
+        return
+
+    # TEXT 컬럼은 정수를 문자열로 저장하므로 INTEGER 컬럼의 새 테이블로 나누어 복사한 뒤 교체
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS token_ohlc_migrating (
+        token_address TEXT,
+        network TEXT,
+        timestamp INTEGER,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume REAL DEFAULT 0,
+        interval TEXT,
+        PRIMARY KEY (token_address, network, timestamp, interval)
+    )
+    """)
+    conn.commit()
+
+    # 로컬 시각 → UTC epoch. 일봉은 로컬 자정과 가장 가까운 UTC 자정으로 맞춤
+    epoch = "CAST(strftime('%s', timestamp, 'utc') AS INTEGER)"
+    bucket = (
+        f"CASE interval WHEN '1h' THEN {epoch} - {epoch} % 3600 "
+        f"WHEN '1d' THEN ({epoch} + 43200) - ({epoch} + 43200) % 86400 "
+        f"ELSE {epoch} END"
+    )
+
+    last_rowid = 0
+    while True:
+        rowids = [row[0] for row in conn.execute(
+            "SELECT rowid FROM token_ohlc WHERE rowid > ? ORDER BY rowid LIMIT ?", (last_rowid, MIGRATION_BATCH_SIZE)
+        ).fetchall()]
+        if not rowids:
+            break
+
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO token_ohlc_migrating
+            SELECT token_address, network, {bucket}, open, high, low, close, volume, interval
+            FROM token_ohlc WHERE rowid > ? AND rowid <= ? AND {epoch} IS NOT NULL
+            """,
+            (last_rowid, rowids[-1])
+        )
+        conn.commit()
+        last_rowid = rowids[-1]
+
+    conn.execute("BEGIN")
+    conn.execute("DROP TABLE token_ohlc")
+    conn.execute("ALTER TABLE token_ohlc_migrating RENAME TO token_ohlc")
+    conn.commit()
+
+
+# pair_ratios.timestamp를 UTC 문자열(CURRENT_TIMESTAMP)에서 epoch 정수로 변환
+def _migrate_pair_ratio_epoch(conn: ManagedConnection):
+    if not _column_types(conn, "pair_ratios"):
+        return
+
+    # TIMESTAMP(NUMERIC) 컬럼은 정수를 그대로 저장하므로 제자리에서 나누어 변환
+    while True:
+        cursor = conn.execute(
+            """
+            UPDATE pair_ratios SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER)
+            WHERE rowid IN (SELECT rowid FROM pair_ratios WHERE typeof(timestamp) = 'text' LIMIT ?)
+            """,
+            (MIGRATION_BATCH_SIZE,)
+        )
+        conn.commit()
+        if cursor.rowcount <= 0:
+            break
+
+
+# 사용자별 tokens 테이블을 자산 상태(tracked_assets)와 구독(subscriptions)으로 분리
+def _migrate_tokens_to_subscriptions(conn: ManagedConnection):
+    if not _column_types(conn, "tokens") or not _column_types(conn, "subscriptions"):
+        return
+
+    conn.execute("BEGIN")
+    # 같은 자산을 여러 사용자가 추적했다면 가장 최근에 갱신된 가격을 기준 가격으로 사용
+    conn.execute("""
+    INSERT OR IGNORE INTO tracked_assets (token_address, network, last_price, last_updated)
+    SELECT token, network, last_price, last_updated FROM tokens ORDER BY last_updated DESC
+    """)
+    conn.execute("""
+    INSERT OR IGNORE INTO subscriptions (user_id, token_address, network, created_at)
+    SELECT user_id, token, network, last_updated FROM tokens
+    """)
+    conn.execute("DROP TABLE tokens")
+    conn.commit()
+
+
+# 사용자별 페어 비율 기록을 (네트워크, 토큰 A, 토큰 B)별 공유 기록으로 변환
+def _migrate_shared_pair_ratios(conn: ManagedConnection):
+    if "user_id" in _column_types(conn, "pair_ratios"):
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS pair_ratios_migrating (
+            network TEXT,
+            token_a_address TEXT,
+            token_b_address TEXT,
+            timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            ratio REAL,
+            token_a_price REAL,
+            token_b_price REAL,
+            change_percent REAL DEFAULT 0,
+            PRIMARY KEY (network, token_a_address, token_b_address, timestamp)
+        )
+        """)
+        conn.commit()
+
+        # 여러 사용자가 같은 시각에 기록한 같은 페어는 한 행으로 합쳐짐 (삭제된 페어의 기록은 버림)
+        last_rowid = 0
+        while True:
+            rowids = [row[0] for row in conn.execute(
+                "SELECT rowid FROM pair_ratios WHERE rowid > ? ORDER BY rowid LIMIT ?", (last_rowid, MIGRATION_BATCH_SIZE)
+            ).fetchall()]
+            if not rowids:
+                break
+
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO pair_ratios_migrating
+                SELECT p.network, p.token_a_address, p.token_b_address, r.timestamp,
+                       r.ratio, r.token_a_price, r.token_b_price, r.change_percent
+                FROM pair_ratios r JOIN token_pairs p ON p.user_id = r.user_id AND p.pair_name = r.pair_name
+                WHERE r.rowid > ? AND r.rowid <= ?
+                """,
+                (last_rowid, rowids[-1])
+            )
+            conn.commit()
+            last_rowid = rowids[-1]
+
+        conn.execute("BEGIN")
+        conn.execute("DROP TABLE pair_ratios")
+        conn.execute("ALTER TABLE pair_ratios_migrating RENAME TO pair_ratios")
+        conn.commit()
+
+    if "user_id" in _column_types(conn, "pair_ratio_hourly"):
+        conn.execute("BEGIN")
+        conn.execute("""
+        CREATE TABLE pair_ratio_hourly_migrating (
+            network TEXT,
+            token_a_address TEXT,
+            token_b_address TEXT,
+            timestamp INTEGER,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            samples INTEGER,
+            PRIMARY KEY (network, token_a_address, token_b_address, timestamp)
+        )
+        """)
+        conn.execute("""
+        INSERT OR IGNORE INTO pair_ratio_hourly_migrating
+        SELECT p.network, p.token_a_address, p.token_b_address, h.timestamp, h.open, h.high, h.low, h.close, h.samples
+        FROM pair_ratio_hourly h JOIN token_pairs p ON p.user_id = h.user_id AND p.pair_name = h.pair_name
+        """)
+        conn.execute("DROP TABLE pair_ratio_hourly")
+        conn.execute("ALTER TABLE pair_ratio_hourly_migrating RENAME TO pair_ratio_hourly")
+        conn.commit()
+
+
+# 스키마 마이그레이션 (PRAGMA user_version 기준, 번호 순서대로 한 번씩 적용)
+# 테이블은 각 모듈의 init_* 함수가 만들고, 마이그레이션은 그 뒤에 인덱스/스키마 변경을 적용합니다.
+# 함수 단계는 큰 테이블을 나누어 변환하며 중단 후 다시 실행해도 안전해야 하고, SQL 문보다 먼저 실행됩니다.
+MigrationStep = Union[str, Callable[[ManagedConnection], None]]
+
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "자주 쓰는 조회용 보조 인덱스", [
+        # check_ohlc_alerts: 토큰/네트워크로 알림 조회 (PK는 user_id로 시작)
+        "CREATE INDEX IF NOT EXISTS idx_ohlc_alerts_token ON ohlc_alerts (token_address, network, enabled)",
+        # calculate_pair_ratio, get_pair_history: 페어별 최신 비율 (ORDER BY timestamp DESC LIMIT 1)
+        "CREATE INDEX IF NOT EXISTS idx_pair_ratios_pair_time ON pair_ratios (user_id, pair_name, timestamp, ratio)",
+        # track_potential_breakout_tokens, /potential 명령어: breakout_detected = 0 ORDER BY market_cap
+        "CREATE INDEX IF NOT EXISTS idx_potential_tokens_breakout ON potential_tokens (breakout_detected, market_cap)",
+        # get_recent_breakout_tokens: breakout_detected = 1 ORDER BY last_updated
+        "CREATE INDEX IF NOT EXISTS idx_potential_tokens_breakout_time ON potential_tokens (breakout_detected, last_updated)",
+        # get_ohlc_data: 토큰/간격별 캔들을 시간순으로
+        "CREATE INDEX IF NOT EXISTS idx_token_ohlc_series ON token_ohlc (token_address, network, interval, timestamp)",
+    ]),
+    (2, "OHLC/페어 비율 시각을 UTC epoch 정수로 변환", [
+        _migrate_ohlc_epoch,
+        _migrate_pair_ratio_epoch,
+        # 테이블 교체로 사라진 인덱스 다시 생성
+        "CREATE INDEX IF NOT EXISTS idx_token_ohlc_series ON token_ohlc (token_address, network, interval, timestamp)",
+    ]),
+    (3, "사용자별 토큰 행을 추적 자산과 구독으로 분리", [
+        _migrate_tokens_to_subscriptions,
+    ]),
+    (4, "페어 비율을 (네트워크, 토큰 A, 토큰 B)별 공유 기록으로 변환", [
+        _migrate_shared_pair_ratios,
+        # 마이그레이션 1의 사용자별 인덱스는 공유 pair_ratios의 기본 키가 대신함 (테이블 교체로 이미 사라졌으면 무시)
+        "DROP INDEX IF EXISTS idx_pair_ratios_pair_time",
+    ]),
+]
+
+# 전체 테이블 스캔이 되면 안 되는 자주 쓰는 조회 (EXPLAIN QUERY PLAN 확인용)
+HOT_QUERIES: Dict[str, Tuple[str, Tuple[Any, ...]]] = {
+    "ohlc_alerts_by_token": (
+        "SELECT * FROM ohlc_alerts WHERE token_address = ? AND network = ? AND enabled = 1",
+        ("0x", "ethereum"),
+    ),
+    "latest_pair_ratio": (
+        "SELECT ratio FROM pair_ratios WHERE network = ? AND token_a_address = ? AND token_b_address = ? "
+        "ORDER BY timestamp DESC LIMIT 1",
+        ("ethereum", "0xa", "0xb"),
+    ),
+    "pair_history": (
+        "SELECT ratio, token_a_price, token_b_price, change_percent, timestamp FROM pair_ratios "
+        "WHERE network = ? AND token_a_address = ? AND token_b_address = ? AND timestamp >= ? "
+        "ORDER BY timestamp DESC LIMIT 100",
+        ("ethereum", "0xa", "0xb", 0),
+    ),
+    "daily_candle": (
+        "SELECT open, close FROM token_ohlc WHERE token_address = ? AND network = ? AND interval = '1d' "
+        "AND timestamp >= ? AND timestamp < ? ORDER BY timestamp DESC LIMIT 1",
+        ("0x", "ethereum", 0, 86400),
+    ),
+    "asset_subscribers": (
+        "SELECT user_id FROM subscriptions WHERE token_address = ? AND network = ?",
+        ("0x", "ethereum"),
+    ),
+    "breakout_candidates": (
+        "SELECT token_address, network, name, symbol FROM potential_tokens WHERE breakout_detected = 0",
+        (),
+    ),
+    "ohlc_series": (
+        "SELECT * FROM token_ohlc WHERE token_address = ? AND network = ? AND interval = ? ORDER BY timestamp DESC LIMIT ?",
+        ("0x", "ethereum", "1h", 24),
+    ),
+    "user_subscriptions": (
+        "SELECT token_address, network FROM subscriptions WHERE user_id = ?",
+        (0,),
+    ),
+}
+
+
+# 스키마 마이그레이션 적용
+def migrate() -> int:
+    """
+    아직 적용되지 않은 마이그레이션을 순서대로 적용합니다.
+    함수 단계는 자체적으로 나누어 커밋하고, SQL 문은 하나의 트랜잭션으로 실행되며,
+    모두 성공하면 user_version을 해당 번호로 올립니다.
+
+    Returns:
+        int: 적용 후 스키마 버전
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    for number, description, statements in MIGRATIONS:
+        if number <= version:
+            continue
+
+        try:
+            for step in statements:
+                if callable(step):
+                    step(conn)
+
+            cursor.execute("BEGIN")
+            for step in statements:
+                if not callable(step):
+                    cursor.execute(step)
+            cursor.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"마이그레이션 {number} ({description}) 실패: {str(e)}")
+            break
+
+        version = number
+        logger.info(f"마이그레이션 {number} 적용: {description}")
+
+    conn.close()
+    return version
+
+
+# 자주 쓰는 조회의 실행 계획 확인
+def check_query_plans() -> Dict[str, List[str]]:
+    """
+    HOT_QUERIES의 EXPLAIN QUERY PLAN을 확인하여 인덱스 없이 테이블 전체를 스캔하는 조회를 찾습니다.
+    테이블이 커진 뒤에 인덱스가 빠지거나 조회가 바뀌어 생기는 성능 저하를 시작 시점에 경고합니다.
+
+    Returns:
+        Dict[str, List[str]]: 조회 이름 → 전체 스캔 계획 목록 (문제가 없으면 빈 딕셔너리)
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    problems: Dict[str, List[str]] = {}
+
+    for name, (sql, params) in HOT_QUERIES.items():
+        try:
+            plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        except sqlite3.OperationalError as e:
+            # 아직 생성되지 않은 테이블
+            logger.debug(f"실행 계획 확인 건너뜀 ({name}): {str(e)}")
+            continue
+
+        scans = [detail for detail in plan if detail.startswith("SCAN") and "INDEX" not in detail]
+        if scans:
+            problems[name] = scans
+            logger.warning(f"인덱스를 사용하지 않는 조회: {name} → {'; '.join(scans)}")
+
+    conn.close()
+    return problems
+
+
+if __name__ == "__main__":
+    # 마이그레이션 적용 후 실행 계획 확인 (전체 스캔이 있으면 종료 코드 1)
+    logging.basicConfig(level=logging.INFO)
+    print(f"스키마 버전: {migrate()}")
+    problems = check_query_plans()
+    for name, scans in problems.items():
+        print(f"{name}: {'; '.join(scans)}")
+    raise SystemExit(1 if problems else 0)
@@ -0,0 +1,400 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 서버 기본 설정 (환경 변수 또는 명령행 인자로 조정 가능)
+FAKE_GECKO_HOST = os.getenv("FAKE_GECKO_HOST", "127.0.0.1")
+FAKE_GECKO_PORT = int(os.getenv("FAKE_GECKO_PORT", 8765))
+FAKE_GECKO_LATENCY_MS = float(os.getenv("FAKE_GECKO_LATENCY_MS", 80))  # 평균 응답 지연(ms)
+FAKE_GECKO_JITTER_MS = float(os.getenv("FAKE_GECKO_JITTER_MS", 40))  # 지연 편차(ms)
+FAKE_GECKO_RATE_LIMIT = int(os.getenv("FAKE_GECKO_RATE_LIMIT", 0))  # 분당 허용 요청 수 (0이면 제한 없음)
+FAKE_GECKO_429_RATE = float(os.getenv("FAKE_GECKO_429_RATE", 0))  # 무작위 429 응답 비율 (0~1)
+FAKE_GECKO_ERROR_RATE = float(os.getenv("FAKE_GECKO_ERROR_RATE", 0))  # 무작위 5xx 응답 비율 (0~1)
+FAKE_GECKO_FIXTURES = os.getenv("FAKE_GECKO_FIXTURES", "")  # 녹화된 응답(JSON) 디렉터리
+
+# tokens/multi 최대 주소 수 (실제 API와 동일)
+MULTI_MAX_ADDRESSES = 30
+
+API_PREFIX = "/api/v2"
+
+
+# 주소별로 항상 같은 난수 생성기 (같은 토큰은 같은 이름/기준 가격을 가짐)
+def _seeded(*parts: str) -> random.Random:
+    digest = hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+# 합성 가격 (기준 가격 주변에서 시간에 따라 천천히 움직임)
+def _synthetic_price(network: str, address: str) -> float:
+    rng = _seeded(network, address.lower())
+    base = 10 ** rng.uniform(-6, 3)
+    phase = rng.uniform(0, 6.28)
+    minute = time.time() / 60
+    drift = 0.05 * ((minute + phase) % 20 - 10) / 10
+    noise = random.uniform(-0.01, 0.01)
+    return base * (1 + drift + noise)
+
+
+def _token_attributes(network: str, address: str) -> Dict[str, Any]:
+    rng = _seeded(network, address.lower())
+    symbol = "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ") for _ in range(rng.randint(3, 5)))
+    price = _synthetic_price(network, address)
+    supply = 10 ** rng.uniform(6, 12)
+    fdv = price * supply
+
+    return {
+        "address": address,
+        "name": f"{symbol} Token",
+        "symbol": symbol,
+        "decimals": rng.choice([6, 9, 18]),
+        "image_url": None,
+        "coingecko_coin_id": None,
+        "total_supply": f"{supply:.2f}",
+        "price_usd": f"{price:.12f}",
+        "fdv_usd": f"{fdv:.2f}",
+        "market_cap_usd": f"{fdv * rng.uniform(0.3, 1.0):.2f}" if rng.random() < 0.6 else None,
+        "total_reserve_in_usd": f"{fdv * rng.uniform(0.01, 0.2):.2f}",
+        "volume_usd": {"h24": f"{fdv * rng.uniform(0.001, 0.5):.2f}"},
+    }
+
+
+def _token_resource(network: str, address: str) -> Dict[str, Any]:
+    return {"id": f"{network}_{address}", "type": "token", "attributes": _token_attributes(network, address)}
+
+
+def _info_attributes(network: str, address: str) -> Dict[str, Any]:
+    rng = _seeded("info", network, address.lower())
+    attrs = _token_attributes(network, address)
+    social = rng.random() < 0.7
+
+    return {
+        "address": address,
+        "name": attrs["name"],
+        "symbol": attrs["symbol"],
+        "decimals": attrs["decimals"],
+        "image_url": None,
+        "coingecko_coin_id": None,
+        "websites": [f"https://{attrs['symbol'].lower()}.example"] if social else [],
+        "description": f"Synthetic token {attrs['symbol']} on {network}",
+        "gt_score": round(rng.uniform(0, 100), 2),
+        "discord_url": None,
+        "telegram_handle": attrs["symbol"].lower() if social else None,
+        "twitter_handle": attrs["symbol"].lower() if social else None,
+        "categories": [],
+    }
+
+
+def _pools(network: str, address: str) -> List[Dict[str, Any]]:
+    rng = _seeded("pools", network, address.lower())
+    attrs = _token_attributes(network, address)
+    pools = []
+
+    for index in range(rng.randint(1, 20)):
+        reserve = float(attrs["total_reserve_in_usd"]) * rng.uniform(0.01, 0.6)
+        buys, sells = rng.randint(0, 500), rng.randint(0, 500)
+        dex = rng.choice(["uniswap_v2", "uniswap_v3", "pancakeswap_v2", "raydium", "orca"])
+        pools.append({
+            "id": f"{network}_pool{index}_{address}",
+            "type": "pool",
+            "attributes": {
+                "address": f"pool{index}_{address}",
+                "name": f"{attrs['symbol']} / USDC",
+                "pool_created_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z",
+                "reserve_in_usd": f"{reserve:.2f}",
+                "volume_usd": {"m5": "0", "h1": f"{reserve * 0.01:.2f}", "h6": f"{reserve * 0.05:.2f}", "h24": f"{reserve * 0.2:.2f}"},
+                "transactions": {"h24": {"buys": buys, "sells": sells}},
+                "price_change_percentage": {"h1": f"{rng.uniform(-5, 5):.2f}", "h24": f"{rng.uniform(-30, 30):.2f}"},
+            },
+            "relationships": {"dex": {"data": {"id": dex, "type": "dex"}}},
+        })
+
+    return pools
+
+
+def _holders(network: str, address: str, limit: int) -> List[Dict[str, Any]]:
+    rng = _seeded("holders", network, address.lower())
+    remaining = 100.0
+    holders = []
+
+    for index in range(limit):
+        percentage = remaining * rng.uniform(0.05, 0.4)
+        remaining -= percentage
+        holders.append({
+            "id": f"holder{index}",
+            "type": "holder",
+            "attributes": {
+                "address": f"0x{rng.getrandbits(160):040x}",
+                "balance": f"{percentage * 1e6:.2f}",
+                "percentage": f"{percentage:.4f}",
+                "is_contract": rng.random() < 0.2,
+            },
+        })
+
+    return holders
+
+
+def _trades(network: str, address: str, limit: int) -> List[Dict[str, Any]]:
+    price = _synthetic_price(network, address)
+    now = int(time.time())
+    trades = []
+
+    for index in range(limit):
+        trades.append({
+            "id": f"trade{index}",
+            "type": "trade",
+            "attributes": {
+                "tx_hash": f"0x{random.getrandbits(256):064x}",
+                "kind": random.choice(["buy", "sell"]),
+                "volume_in_usd": f"{random.uniform(10, 10000):.2f}",
+                "price_to_in_usd": f"{price:.12f}",
+                "block_timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now - index * 30)),
+            },
+        })
+
+    return trades
+
+
+def _ohlcv(network: str, address: str, limit: int) -> List[List[float]]:
+    rng = _seeded("ohlcv", network, address.lower())
+    close = _synthetic_price(network, address)
+    day = 86400
+    today = int(time.time()) // day * day
+    rows = []
+
+    # 최신 캔들부터 과거로 생성 (실제 API와 같은 순서)
+    for index in range(limit):
+        open_price = close * (1 + rng.uniform(-0.1, 0.1))
+        high = max(open_price, close) * (1 + rng.uniform(0, 0.05))
+        low = min(open_price, close) * (1 - rng.uniform(0, 0.05))
+        rows.append([today - index * day, open_price, high, low, close, rng.uniform(1e3, 1e7)])
+        close = open_price
+
+    return rows
+
+
+def _recently_updated(network: Optional[str], limit: int = 100) -> List[Dict[str, Any]]:
+    networks = [network] if network else ["eth", "solana", "bsc", "base"]
+    tokens = []
+    bucket = int(time.time() // 60)
+
+    for index in range(limit):
+        net = networks[index % len(networks)]
+        address = hashlib.sha1(f"{net}:{bucket}:{index}".encode("utf-8")).hexdigest()
+        tokens.append({
+            "id": f"{net}_{address}",
+            "type": "token",
+            "attributes": _info_attributes(net, address),
+            "relationships": {"network": {"data": {"id": net, "type": "network"}}},
+        })
+
+    return tokens
+
+
+class FakeGeckoServer:
+    """
+    GeckoTerminal API를 흉내 내는 로컬 서버입니다.
+    녹화된 응답 또는 합성 데이터를 반환하며, 지연/429/5xx를 주입할 수 있습니다.
+    """
+
+    def __init__(self, latency_ms: float = FAKE_GECKO_LATENCY_MS, jitter_ms: float = FAKE_GECKO_JITTER_MS,
+                 rate_limit: int = FAKE_GECKO_RATE_LIMIT, rate_429: float = FAKE_GECKO_429_RATE,
+                 error_rate: float = FAKE_GECKO_ERROR_RATE, fixtures_dir: str = FAKE_GECKO_FIXTURES):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.fixtures_dir = fixtures_dir
+
+        self._recent: List[float] = []
+        self.stats: Dict[str, int] = {}
+
+    def _count(self, key: str):
+        self.stats[key] = self.stats.get(key, 0) + 1
+
+    # 녹화된 응답 찾기 (경로의 "/"를 "__"로 바꾼 파일명, 예: networks__eth__tokens__0x....json)
+    def _fixture(self, path: str) -> Optional[Any]:
+        if not self.fixtures_dir:
+            return None
+
+        name = path[len(API_PREFIX):].strip("/").replace("/", "__") + ".json"
+        file_path = os.path.join(self.fixtures_dir, name)
+        if not os.path.exists(file_path):
+            return None
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        self._count("requests")
+
+        # 응답 지연
+        delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        # 분당 요청 한도 (실제 API처럼 초과 시 429)
+        now = time.monotonic()
+        self._recent = [ts for ts in self._recent if now - ts < 60]
+        if self.rate_limit and len(self._recent) >= self.rate_limit:
+            self._count("status_429")
+            retry_after = max(1, int(60 - (now - self._recent[0])) + 1)
+            return web.json_response({"errors": [{"status": "429", "title": "Rate Limited"}]},
+                                     status=429, headers={"Retry-After": str(retry_after)})
+        self._recent.append(now)
+
+        # 무작위 429 / 5xx 주입
+        roll = random.random()
+        if roll < self.rate_429:
+            self._count("status_429")
+            return web.json_response({"errors": [{"status": "429", "title": "Rate Limited"}]},
+                                     status=429, headers={"Retry-After": "1"})
+        if roll < self.rate_429 + self.error_rate:
+            status = random.choice([500, 502, 503, 504])
+            self._count(f"status_{status}")
+            return web.json_response({"errors": [{"status": str(status)}]}, status=status)
+
+        fixture = self._fixture(request.path)
+        if fixture is not None:
+            self._count("fixture_hits")
+            return web.json_response(fixture)
+
+        return await handler(request)
+
+    async def token(self, request: web.Request) -> web.Response:
+        self._count("token")
+        network, address = request.match_info["network"], request.match_info["address"]
+        return web.json_response({"data": _token_resource(network, address)})
+
+    async def tokens_multi(self, request: web.Request) -> web.Response:
+        self._count("multi")
+        network = request.match_info["network"]
+        addresses = [address for address in request.match_info["addresses"].split(",") if address]
+
+        if len(addresses) > MULTI_MAX_ADDRESSES:
+            return web.json_response(
+                {"errors": [{"status": "400", "title": f"Maximum {MULTI_MAX_ADDRESSES} addresses"}]}, status=400
+            )
+
+        return web.json_response({"data": [_token_resource(network, address) for address in addresses]})
+
+    async def token_info(self, request: web.Request) -> web.Response:
+        self._count("info")
+        network, address = request.match_info["network"], request.match_info["address"]
+        return web.json_response({"data": {"id": f"{network}_{address}", "type": "token_info",
+                                           "attributes": _info_attributes(network, address)}})
+
+    async def token_pools(self, request: web.Request) -> web.Response:
+        self._count("pools")
+        network, address = request.match_info["network"], request.match_info["address"]
+        return web.json_response({"data": _pools(network, address)})
+
+    async def token_holders(self, request: web.Request) -> web.Response:
+        self._count("holders")
+        network, address = request.match_info["network"], request.match_info["address"]
+        limit = min(int(request.query.get("limit", 10)), 100)
+        return web.json_response({"data": _holders(network, address, limit)})
+
+    async def token_trades(self, request: web.Request) -> web.Response:
+        self._count("trades")
+        network, address = request.match_info["network"], request.match_info["address"]
+        limit = min(int(request.query.get("limit", 20)), 300)
+        return web.json_response({"data": _trades(network, address, limit)})
+
+    async def token_ohlcv(self, request: web.Request) -> web.Response:
+        self._count("ohlcv")
+        network, address = request.match_info["network"], request.match_info["address"]
+        limit = min(int(request.query.get("limit", 100)), 1000)
+        return web.json_response({"data": {"id": f"{network}_{address}", "type": "ohlcv_request_response",
+                                           "attributes": {"ohlcv_list": _ohlcv(network, address, limit)}}})
+
+    async def recently_updated(self, request: web.Request) -> web.Response:
+        self._count("recently_updated")
+        return web.json_response({"data": _recently_updated(request.query.get("network"))})
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        # 부하 테스트 결과 확인용 통계 (요청 수, 엔드포인트별 호출 수, 주입된 오류 수)
+        return web.json_response(self.stats)
+
+    def build_app(self) -> web.Application:
+        """
+        aiohttp 애플리케이션을 생성합니다.
+
+        Returns:
+            web.Application: 라우트가 등록된 애플리케이션
+        """
+        app = web.Application(middlewares=[self.middleware])
+        base = f"{API_PREFIX}/networks/{{network}}/tokens"
+
+        app.router.add_get(f"{base}/multi/{{addresses}}", self.tokens_multi)
+        app.router.add_get(f"{base}/{{address}}", self.token)
+        app.router.add_get(f"{base}/{{address}}/info", self.token_info)
+        app.router.add_get(f"{base}/{{address}}/pools", self.token_pools)
+        app.router.add_get(f"{base}/{{address}}/holders", self.token_holders)
+        app.router.add_get(f"{base}/{{address}}/trades", self.token_trades)
+        app.router.add_get(f"{base}/{{address}}/ohlcv/{{timeframe}}", self.token_ohlcv)
+        app.router.add_get(f"{API_PREFIX}/tokens/info_recently_updated", self.recently_updated)
+        app.router.add_get("/__stats", self.stats_handler)
+        return app
+
+
+# 백그라운드에서 서버 시작 (부하 테스트 스크립트에서 사용)
+async def start_fake_server(host: str = FAKE_GECKO_HOST, port: int = FAKE_GECKO_PORT, **options) -> web.AppRunner:
+    """
+    현재 이벤트 루프에서 가짜 GeckoTerminal 서버를 시작합니다.
+    봇이 이 서버를 사용하게 하려면 GECKO_API_BASE를 http://host:port/api/v2로 설정합니다.
+
+    Args:
+        host (str, optional): 바인딩 주소
+        port (int, optional): 포트
+        **options: FakeGeckoServer 설정 (latency_ms, rate_limit, rate_429, error_rate 등)
+
+    Returns:
+        web.AppRunner: 종료 시 runner.cleanup()을 호출합니다.
+    """
+    server = FakeGeckoServer(**options)
+    runner = web.AppRunner(server.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"가짜 GeckoTerminal 서버 시작: http://{host}:{port}{API_PREFIX}")
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 GeckoTerminal 대체 서버 (부하 테스트용)")
+    parser.add_argument("--host", default=FAKE_GECKO_HOST)
+    parser.add_argument("--port", type=int, default=FAKE_GECKO_PORT)
+    parser.add_argument("--latency-ms", type=float, default=FAKE_GECKO_LATENCY_MS, help="평균 응답 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=FAKE_GECKO_JITTER_MS, help="지연 편차(ms)")
+    parser.add_argument("--rate-limit", type=int, default=FAKE_GECKO_RATE_LIMIT, help="분당 허용 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--rate-429", type=float, default=FAKE_GECKO_429_RATE, help="무작위 429 응답 비율 (0~1)")
+    parser.add_argument("--error-rate", type=float, default=FAKE_GECKO_ERROR_RATE, help="무작위 5xx 응답 비율 (0~1)")
+    parser.add_argument("--fixtures", default=FAKE_GECKO_FIXTURES, help="녹화된 응답(JSON) 디렉터리")
+    args = parser.parse_args()
+
+    server = FakeGeckoServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        rate_429=args.rate_429,
+        error_rate=args.error_rate,
+        fixtures_dir=args.fixtures,
+    )
+    logger.info(f"봇 연결: GECKO_API_BASE=http://{args.host}:{args.port}{API_PREFIX}")
+    web.run_app(server.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
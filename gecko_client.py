@@ -0,0 +1,325 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from rate_limiter import limiter, concurrency
+from response_cache import response_cache
+from circuit_breaker import get_breaker
+from models import loads
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# GeckoTerminal API 기본 주소 (부하 테스트 시 fake_gecko_server.py 주소로 변경)
+GECKO_API_BASE = os.getenv("GECKO_API_BASE", "https://api.geckoterminal.com/api/v2").rstrip("/")
+
+# 공통 요청 헤더
+DEFAULT_HEADERS = {"Accept": "application/json"}
+
+# 타임아웃 / 커넥션 풀 / 재시도 설정 (환경 변수로 조정 가능)
+REQUEST_TIMEOUT = float(os.getenv("GECKO_REQUEST_TIMEOUT", 10))  # 요청 전체 타임아웃(초)
+CONNECT_TIMEOUT = float(os.getenv("GECKO_CONNECT_TIMEOUT", 5))  # 연결 타임아웃(초)
+MAX_CONNECTIONS = int(os.getenv("GECKO_MAX_CONNECTIONS", 20))  # 커넥션 풀 최대 크기
+KEEPALIVE_TIMEOUT = float(os.getenv("GECKO_KEEPALIVE_TIMEOUT", 60))  # keep-alive 유지 시간(초)
+MAX_RETRIES = int(os.getenv("GECKO_MAX_RETRIES", 3))  # 최대 재시도 횟수
+RETRY_BASE_DELAY = float(os.getenv("GECKO_RETRY_BASE_DELAY", 1.0))  # 첫 재시도 대기(초)
+RETRY_MAX_DELAY = float(os.getenv("GECKO_RETRY_MAX_DELAY", 30.0))  # 최대 재시도 대기(초)
+
+# 재시도 대상 상태 코드 (429는 요청 제한기에서 별도 처리)
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+# 공유 세션 (프로세스당 하나)
+_session: Optional[aiohttp.ClientSession] = None
+
+# 진행 중인 동일 요청 (single-flight)
+_inflight: Dict[str, asyncio.Task] = {}
+
+# single-flight 통계
+singleflight_stats = {
+    "upstream_calls": 0,  # 실제로 보낸 요청 수
+    "deduplicated": 0,    # 진행 중인 요청에 합류한 호출 수
+}
+
+
+class GeckoResponse:
+    """
+    GeckoTerminal 응답을 담는 가벼운 객체입니다.
+    본문은 이미 모두 읽힌 상태이므로 세션과 무관하게 여러 번 사용할 수 있습니다.
+    """
+
+    __slots__ = ("status_code", "url", "content", "headers", "_json")
+
+    def __init__(self, status_code: int, url: str, content: bytes, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+        self._json = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        # 한 번만 파싱하고 결과를 재사용
+        if self._json is None:
+            self._json = loads(self.content)
+        return self._json
+
+
+# 공유 세션 가져오기
+async def get_session() -> aiohttp.ClientSession:
+    """
+    keep-alive 커넥션 풀을 사용하는 공유 aiohttp 세션을 반환합니다.
+
+    Returns:
+        aiohttp.ClientSession: 공유 세션
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            ttl_dns_cache=300,
+            keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS)
+        logger.info(f"GeckoTerminal HTTP 세션 생성 (최대 연결 {MAX_CONNECTIONS}개)")
+
+    return _session
+
+
+# 공유 세션 종료
+async def close_session():
+    """
+    공유 세션을 닫습니다. 봇 종료 시 호출합니다.
+    """
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("GeckoTerminal HTTP 세션 종료")
+
+    _session = None
+
+
+# 재시도 대기 시간 계산 (지수 백오프 + 지터)
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+
+    delay = min(RETRY_BASE_DELAY * (2 ** attempt), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+
+# URL 경로에서 네트워크와 엔드포인트 유형 추출
+_TOKEN_PATH_RE = re.compile(r"/networks/([^/]+)/tokens/(multi/)?[^/?]+(?:/([a-z_]+))?")
+
+
+def classify_url(url: str) -> Tuple[Optional[str], str]:
+    """
+    요청 URL을 (네트워크, 엔드포인트 유형)으로 분류합니다.
+
+    Args:
+        url (str): 요청 URL
+
+    Returns:
+        Tuple[Optional[str], str]: 네트워크 ID (없으면 None)와 엔드포인트 유형
+            ("price", "multi", "pools", "info", "holders", "trades", "ohlcv", "recently_updated", "other")
+    """
+    if "/tokens/info_recently_updated" in url:
+        return None, "recently_updated"
+
+    match = _TOKEN_PATH_RE.search(url)
+    if not match:
+        return None, "other"
+
+    network, multi, suffix = match.groups()
+    if multi:
+        return network, "multi"
+    if suffix is None:
+        return network, "price"
+    if suffix in ("pools", "info", "holders", "trades", "ohlcv"):
+        return network, suffix
+    return network, "other"
+
+
+# 요청 식별 키 생성
+def _request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    if not params:
+        return url
+    query = "&".join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{url}?{query}"
+
+
+# GeckoTerminal GET 요청
+async def api_get(url: str, params: Optional[Dict[str, Any]] = None, max_age: Optional[float] = None) -> GeckoResponse:
+    """
+    GeckoTerminal API에 GET 요청을 보냅니다.
+    엔드포인트별 TTL 안의 성공 응답이 캐시에 있으면 요청하지 않고 재사용하며,
+    같은 URL에 대한 요청이 이미 진행 중이면 새 요청을 보내지 않고 그 결과를 함께 받습니다.
+
+    Args:
+        url (str): 전체 URL 또는 GECKO_API_BASE 기준 경로 (예: "/networks/eth/tokens/0x...")
+        params (Dict[str, Any], optional): 쿼리 파라미터
+        max_age (float, optional): 허용할 캐시 최대 경과 시간(초). 생략 시 엔드포인트 TTL, 0이면 캐시 사용 안 함
+
+    Returns:
+        GeckoResponse: 응답 객체. 재시도 후에도 실패한 경우 마지막 응답을 반환합니다.
+
+    Raises:
+        aiohttp.ClientError, asyncio.TimeoutError: 모든 재시도가 네트워크 오류로 실패한 경우
+        circuit_breaker.CircuitOpenError: 해당 네트워크/엔드포인트의 회로가 열려 있는 경우
+    """
+    if not url.startswith("http"):
+        url = f"{GECKO_API_BASE}{url}"
+
+    key = _request_key(url, params)
+    _, endpoint = classify_url(url)
+
+    cached = response_cache.get(key, endpoint, max_age)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+
+    if task is None:
+        singleflight_stats["upstream_calls"] += 1
+        task = asyncio.create_task(_fetch(url, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        singleflight_stats["deduplicated"] += 1
+        logger.debug(f"진행 중인 요청에 합류: {key}")
+
+    # 한 호출자가 취소되어도 다른 대기자의 요청은 계속 진행
+    response = await asyncio.shield(task)
+
+    if response.status_code == 200:
+        response_cache.set(key, endpoint, response)
+
+    return response
+
+
+# 실제 HTTP 요청 (요청 제한기, 타임아웃, 재시도/백오프 적용)
+async def _fetch(url: str, params: Optional[Dict[str, Any]] = None) -> GeckoResponse:
+    session = await get_session()
+
+    # (네트워크, 엔드포인트 유형)별 회로 차단기
+    network, endpoint = classify_url(url)
+    breaker = get_breaker(network or (params or {}).get("network"), endpoint)
+
+    for attempt in range(MAX_RETRIES + 1):
+        # 회로가 열려 있으면 예산을 쓰지 않고 즉시 실패
+        breaker.allow()
+
+        # 프로세스 전역 토큰 버킷에서 요청 예산 획득 후 동시 요청 슬롯 확보
+        try:
+            await limiter.acquire()
+            await concurrency.acquire()
+        except BaseException:
+            breaker.release_probe()
+            raise
+
+        started = time.monotonic()
+
+        try:
+            async with session.get(url, params=params) as resp:
+                content = await resp.read()
+                response = GeckoResponse(resp.status, url, content, dict(resp.headers))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            concurrency.release(overloaded=isinstance(e, asyncio.TimeoutError))
+            breaker.record_failure()
+
+            if attempt >= MAX_RETRIES:
+                logger.error(f"API 요청 실패 ({url}): {type(e).__name__} {str(e)}")
+                raise
+
+            delay = _retry_delay(attempt)
+            logger.warning(f"API 요청 중 오류 ({type(e).__name__}). {delay:.1f}초 후 재시도 ({attempt+1}/{MAX_RETRIES})...")
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            concurrency.release()
+            breaker.release_probe()
+            raise
+
+        # 응답 상태와 지연 시간으로 동시 요청 수 조절
+        concurrency.release(
+            time.monotonic() - started,
+            overloaded=response.status_code == 429 or response.status_code in RETRY_STATUS_CODES
+        )
+
+        if response.status_code == 429:
+            breaker.release_probe()
+        elif response.status_code in RETRY_STATUS_CODES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if response.status_code == 429:
+            # 모든 서브시스템의 요청을 함께 멈춰 429 재시도로 예산을 낭비하지 않음
+            limiter.penalize(_retry_delay(attempt, response.headers.get("Retry-After")))
+            if attempt < MAX_RETRIES:
+                continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+            delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"API 응답 {response.status_code} ({url}). {delay:.1f}초 후 재시도 ({attempt+1}/{MAX_RETRIES})...")
+            await asyncio.sleep(delay)
+            continue
+
+        return response
+
+    return response
+
+
+# 외부에서 얻은 데이터를 캐시에 저장
+def cache_response(url: str, data: Any, params: Optional[Dict[str, Any]] = None):
+    """
+    다른 요청(예: tokens/multi)에서 얻은 데이터를 해당 URL의 응답처럼 캐시에 저장합니다.
+    이후 같은 URL을 요청하면 API를 호출하지 않고 이 데이터를 사용합니다.
+
+    Args:
+        url (str): 전체 URL 또는 GECKO_API_BASE 기준 경로
+        data (Any): 응답 본문으로 사용할 JSON 데이터
+        params (Dict[str, Any], optional): 쿼리 파라미터
+    """
+    if not url.startswith("http"):
+        url = f"{GECKO_API_BASE}{url}"
+
+    response = GeckoResponse(200, url, json.dumps(data).encode("utf-8"))
+    response._json = data
+    response_cache.set(_request_key(url, params), classify_url(url)[1], response)
+
+
+# HTTP 클라이언트 상태 텍스트 생성 (텔레그램 메시지용)
+def format_client_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 HTTP 클라이언트 통계 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    upstream = singleflight_stats["upstream_calls"]
+    deduplicated = singleflight_stats["deduplicated"]
+    total = upstream + deduplicated
+    ratio = (deduplicated / total * 100) if total else 0
+
+    return (
+        f"\n🔗 <b>요청 병합 (single-flight)</b>\n"
+        f"실제 요청: <b>{upstream}</b>회\n"
+        f"병합된 호출: <b>{deduplicated}</b>회 ({ratio:.1f}%)\n"
+        f"진행 중: <b>{len(_inflight)}</b>건\n"
+    )
@@ -0,0 +1,320 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rate_limiter import set_subsystem
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 스케줄러 설정 (환경 변수로 조정 가능)
+JOB_STAGGER_SECONDS = float(os.getenv("JOB_STAGGER_SECONDS", 5))  # 작업별 첫 실행 간격(초), 시작 시 동시 실행 방지
+JOB_JITTER_RATIO = float(os.getenv("JOB_JITTER_RATIO", 0.05))  # 실행 간격 대비 무작위 지연 비율
+JOB_MAX_JITTER = float(os.getenv("JOB_MAX_JITTER", 30))  # 무작위 지연 최대값(초)
+
+# 실행 방식
+FIXED_RATE = "fixed_rate"    # 예정 시각 기준으로 일정 간격 (실행 시간이 길어도 밀리지 않음)
+FIXED_DELAY = "fixed_delay"  # 이전 실행이 끝난 뒤 일정 시간 대기
+DAILY = "daily"              # 매일 지정한 시각 (로컬 시간)
+
+
+# 환경 변수에서 작업별 제한 시간 읽기 (예: "market_scan=1800,ohlc=240")
+def _load_job_deadlines() -> Dict[str, float]:
+    deadlines = {}
+    raw = os.getenv("JOB_DEADLINES", "")
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            deadlines[name.strip()] = max(float(value), 0.0)
+        except ValueError:
+            logger.warning(f"잘못된 작업 제한 시간 설정 무시: {item}")
+
+    return deadlines
+
+
+JOB_DEADLINES = _load_job_deadlines()
+
+
+class Job:
+    """
+    스케줄러에 등록된 주기 작업과 실행 통계입니다.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], mode: str, interval: float = 0.0,
+                 at: Optional[Tuple[int, int]] = None, subsystem: Optional[str] = None,
+                 deadline: Optional[float] = None, initial_delay: Optional[float] = None,
+                 jitter: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.mode = mode
+        self.interval = interval
+        self.at = at
+        self.subsystem = subsystem
+        self.deadline = JOB_DEADLINES.get(name, deadline)
+        self.initial_delay = initial_delay
+        self.jitter = min(interval * JOB_JITTER_RATIO, JOB_MAX_JITTER) if jitter is None else jitter
+        self.lock = asyncio.Lock()
+        self.next_run: Optional[float] = None
+
+        # 통계
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.overlaps = 0        # 이전 실행이 끝나지 않아 건너뛴 실행 수
+        self.missed = 0          # 고정 간격 작업이 늦어져 건너뛴 예정 실행 수
+        self.last_started: Optional[float] = None
+        self.last_duration = 0.0
+        self.last_lag = 0.0      # 예정 시각 대비 실제 시작 지연(초, 의도한 무작위 지연 제외)
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.lock.locked()
+
+    def first_run(self, now: float, order: int) -> float:
+        if self.mode == DAILY:
+            return self.next_daily(now)
+        delay = JOB_STAGGER_SECONDS * order if self.initial_delay is None else self.initial_delay
+        return now + delay
+
+    def next_daily(self, now: float) -> float:
+        hour, minute = self.at
+        current = datetime.fromtimestamp(now)
+        target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if current >= target:
+            target += timedelta(days=1)
+        return target.timestamp()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "interval": self.interval,
+            "running": self.running,
+            "next_run": self.next_run,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "overlaps": self.overlaps,
+            "missed": self.missed,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": self.total_lag / self.runs if self.runs else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """
+    모든 주기 작업을 등록하고 실행하는 스케줄러입니다.
+    작업마다 고정 간격/고정 지연/매일 지정 시각 방식과 무작위 지연, 시작 시각 분산,
+    중복 실행 방지(수동 실행 포함), 제한 시간을 적용하고 예정 시각 대비 지연을 기록합니다.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.run_condition: Optional[Callable[[], bool]] = None  # False를 반환하면 예정된 실행을 건너뜀 (리더 확인 등)
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], interval: float = 0.0,
+                mode: str = FIXED_RATE, at: Optional[Tuple[int, int]] = None, subsystem: Optional[str] = None,
+                deadline: Optional[float] = None, initial_delay: Optional[float] = None,
+                jitter: Optional[float] = None) -> Job:
+        """
+        주기 작업을 등록합니다. start() 이후에 등록하면 바로 실행 루프가 시작됩니다.
+
+        Args:
+            name (str): 작업 이름 (/apistatus, JOB_DEADLINES 설정에 사용)
+            func (Callable[[], Awaitable[Any]]): 인자 없는 비동기 함수
+            interval (float, optional): 실행 간격(초). DAILY 방식에서는 무시
+            mode (str, optional): FIXED_RATE, FIXED_DELAY, DAILY 중 하나. 기본값은 FIXED_RATE
+            at (Tuple[int, int], optional): DAILY 방식의 실행 시각 (시, 분)
+            subsystem (str, optional): 이 작업의 API 요청을 집계할 예산 서브시스템
+            deadline (float, optional): 실행 제한 시간(초). 생략 시 실행 간격 (DAILY는 제한 없음)
+            initial_delay (float, optional): 첫 실행까지 대기(초). 생략 시 등록 순서에 따라 분산
+            jitter (float, optional): 매 실행에 더할 최대 무작위 지연(초)
+
+        Returns:
+            Job: 등록된 작업
+        """
+        if mode not in (FIXED_RATE, FIXED_DELAY, DAILY):
+            raise ValueError(f"알 수 없는 실행 방식: {mode}")
+        if mode == DAILY and at is None:
+            raise ValueError("DAILY 작업에는 실행 시각(at)이 필요합니다.")
+        if mode != DAILY and interval <= 0:
+            raise ValueError("주기 작업에는 0보다 큰 실행 간격이 필요합니다.")
+        if name in self.jobs:
+            raise ValueError(f"이미 등록된 작업: {name}")
+
+        if deadline is None and mode != DAILY:
+            deadline = interval
+
+        job = Job(name, func, mode, interval=interval, at=at, subsystem=subsystem,
+                  deadline=deadline, initial_delay=initial_delay, jitter=jitter)
+        self.jobs[name] = job
+
+        if self._tasks:
+            self._tasks.append(asyncio.create_task(self._loop(job, len(self.jobs) - 1)))
+        return job
+
+    def start(self):
+        """
+        등록된 모든 작업의 실행 루프를 시작합니다. 첫 실행 시각은 등록 순서대로 JOB_STAGGER_SECONDS씩 분산됩니다.
+        이미 실행 중이면 아무것도 하지 않습니다.
+        """
+        if self._tasks:
+            return
+        for order, job in enumerate(self.jobs.values()):
+            self._tasks.append(asyncio.create_task(self._loop(job, order)))
+        logger.info(f"작업 스케줄러 시작: {', '.join(self.jobs)}")
+
+    async def stop(self):
+        """
+        모든 실행 루프를 중지합니다. 실행 중인 작업은 취소됩니다.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job: Job, order: int):
+        job.next_run = job.first_run(time.time(), order)
+
+        while True:
+            scheduled = job.next_run
+            delay = scheduled - time.time() + random.uniform(0, job.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if self.run_condition is None or self.run_condition():
+                await self._execute(job, scheduled)
+            else:
+                # 리더 임대가 만료된 상태 등 실행 조건을 만족하지 않으면 이번 실행은 누락으로 집계
+                job.missed += 1
+            now = time.time()
+
+            if job.mode == FIXED_RATE:
+                next_run = scheduled + job.interval
+                if next_run <= now:
+                    # 실행이 한 주기 이상 길어지면 밀린 실행을 몰아서 하지 않고 다음 예정 시각으로 건너뜀
+                    skipped = int((now - next_run) // job.interval) + 1
+                    job.missed += skipped
+                    next_run += skipped * job.interval
+                job.next_run = next_run
+            elif job.mode == FIXED_DELAY:
+                job.next_run = now + job.interval
+            else:
+                job.next_run = job.next_daily(now)
+
+    async def _invoke(self, job: Job):
+        # _execute가 별도 태스크(컨텍스트 복사본)에서 실행하므로 예산 서브시스템 설정이 호출한 쪽에 영향을 주지 않음
+        if job.subsystem:
+            set_subsystem(job.subsystem)
+        return await job.func()
+
+    async def _execute(self, job: Job, scheduled: Optional[float] = None) -> Dict[str, Any]:
+        if job.running:
+            job.overlaps += 1
+            logger.warning(f"작업 {job.name}이 아직 실행 중이라 이번 실행을 건너뜀")
+            return {"success": False, "error": f"작업 {job.name}이 이미 실행 중입니다."}
+
+        async with job.lock:
+            started = time.time()
+            if scheduled is not None:
+                job.last_lag = max(started - scheduled - job.jitter, 0.0)
+                job.max_lag = max(job.max_lag, job.last_lag)
+                job.total_lag += job.last_lag
+            job.last_started = started
+            job.runs += 1
+
+            try:
+                # wait_for는 제한 시간이 없으면 코루틴을 호출한 태스크에서 그대로 실행하므로 직접 태스크를 만들어
+                # run_now를 호출한 명령어 핸들러의 컨텍스트(예산 서브시스템)가 바뀌지 않도록 함
+                task = asyncio.create_task(self._invoke(job))
+                result = await asyncio.wait_for(task, timeout=job.deadline or None)
+                job.last_error = None
+                return {"success": True, "result": result}
+            except asyncio.TimeoutError:
+                job.timeouts += 1
+                job.last_error = f"제한 시간 {job.deadline:.0f}초 초과"
+                logger.error(f"작업 {job.name} 제한 시간({job.deadline:.0f}초) 초과로 취소됨")
+                return {"success": False, "error": job.last_error}
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e)
+                logger.error(f"작업 {job.name} 실행 중 오류: {str(e)}")
+                return {"success": False, "error": str(e)}
+            finally:
+                job.last_duration = time.time() - started
+
+    async def run_now(self, name: str) -> Dict[str, Any]:
+        """
+        등록된 작업을 즉시 한 번 실행합니다 (관리자 명령어 등). 이미 실행 중이면 실행하지 않습니다.
+
+        Args:
+            name (str): 작업 이름
+
+        Returns:
+            Dict[str, Any]: {"success": bool, "result" 또는 "error"}
+        """
+        job = self.jobs.get(name)
+        if job is None:
+            return {"success": False, "error": f"등록되지 않은 작업: {name}"}
+        return await self._execute(job)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        작업별 통계를 반환합니다.
+
+        Returns:
+            List[Dict[str, Any]]: 작업별 실행 수, 실패/시간 초과/중복/누락 수, 지연(초)
+        """
+        return [job.stats() for job in self.jobs.values()]
+
+
+# 프로세스 전역 작업 스케줄러
+job_scheduler = JobScheduler()
+
+
+# 작업 스케줄러 상태 텍스트 생성 (텔레그램 메시지용)
+def format_scheduler_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 작업별 실행 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    text = "\n⏱ <b>주기 작업</b>\n"
+    now = time.time()
+
+    for stats in job_scheduler.stats():
+        if stats["running"]:
+            state = "실행 중"
+        elif stats["next_run"] is not None:
+            state = f"{max(stats['next_run'] - now, 0) / 60:.0f}분 후"
+        else:
+            state = "대기"
+
+        text += (
+            f"• {stats['name']}: {state}, {stats['runs']}회 (최근 {stats['last_duration']:.1f}초), "
+            f"지연 최근 {stats['last_lag']:.1f}초/최대 {stats['max_lag']:.1f}초"
+        )
+        problems = [
+            f"{label} {stats[key]}"
+            for key, label in (("failures", "실패"), ("timeouts", "시간 초과"), ("overlaps", "중복"), ("missed", "누락"))
+            if stats[key]
+        ]
+        text += (f" ({', '.join(problems)})" if problems else "") + "\n"
+
+    return text
@@ -0,0 +1,360 @@
+import os
+import time
+import uuid
+import signal
+import socket
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from db import DB_PATH, get_connection, run_db
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 리더 선출 설정 (환경 변수로 조정 가능)
+# 같은 DB로 복제본을 여러 개 실행할 때만 켬 (단일 인스턴스는 임대 관리 없이 바로 주기 작업 실행)
+LEADER_ELECTION = os.getenv("LEADER_ELECTION", "off").lower() in ("on", "1", "true")
+LEADER_LEASE_NAME = os.getenv("LEADER_LEASE_NAME", "scheduler")  # 같은 DB를 쓰는 복제본끼리 같은 이름 사용
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", 15))  # 리더가 갱신하지 않으면 이 시간 뒤 다른 복제본이 인계
+LEADER_RENEW_SECONDS = float(os.getenv("LEADER_RENEW_SECONDS", 5))  # 임대 갱신/획득 시도 간격(초)
+LEADER_LIVENESS_DIR = os.getenv("LEADER_LIVENESS_DIR", DB_PATH + ".leader")  # 보유자 생존 확인 파일 디렉터리 (복제본끼리 공유)
+
+# 임대 획득 또는 갱신 (비어 있거나, 만료되었거나, 이미 내 것일 때만 기록)
+LEASE_ACQUIRE_SQL = """
+INSERT INTO leader_lease (name, holder, expires_at, acquired_at, term)
+VALUES (?, ?, ?, ?, 1)
+ON CONFLICT (name) DO UPDATE SET
+    term = CASE WHEN leader_lease.holder = excluded.holder THEN leader_lease.term ELSE leader_lease.term + 1 END,
+    acquired_at = CASE WHEN leader_lease.holder = excluded.holder THEN leader_lease.acquired_at ELSE excluded.acquired_at END,
+    holder = excluded.holder,
+    expires_at = excluded.expires_at
+WHERE leader_lease.holder = excluded.holder OR leader_lease.expires_at < ?
+"""
+
+
+# 리더 임대 테이블 초기화
+def init_leader_db():
+    """
+    복제본 사이의 리더 임대를 기록하는 테이블을 초기화합니다.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS leader_lease (
+        name TEXT PRIMARY KEY,
+        holder TEXT,
+        expires_at REAL,
+        acquired_at REAL,
+        term INTEGER DEFAULT 0
+    )
+    ''')
+
+    conn.commit()
+    conn.close()
+
+
+# 임대 획득 시도
+def try_acquire_lease(name: str, holder: str, lease_seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    리더 임대를 획득하거나 갱신합니다. 다른 복제본이 유효한 임대를 가지고 있으면 아무것도 바꾸지 않습니다.
+
+    Args:
+        name (str): 임대 이름
+        holder (str): 이 복제본의 ID
+        lease_seconds (float): 임대 기간(초)
+        now (float, optional): 현재 시각 (time.time 기준, 모든 복제본이 같은 시계를 사용)
+
+    Returns:
+        Dict[str, Any]: {"leader": bool, "holder": 현재 리더 ID, "term": 리더가 바뀔 때마다 증가하는 번호, "expires_at": 만료 시각}
+    """
+    now = time.time() if now is None else now
+    conn = get_connection()
+
+    try:
+        conn.execute(LEASE_ACQUIRE_SQL, (name, holder, now + lease_seconds, now, now))
+        row = conn.execute("SELECT holder, term, expires_at FROM leader_lease WHERE name = ?", (name,)).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+
+    current_holder, term, expires_at = row
+    return {"leader": current_holder == holder, "holder": current_holder, "term": term, "expires_at": expires_at}
+
+
+# 임대 보유자 ID 만들기 (호스트:PID:무작위값)
+def make_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+# 보유자별 생존 확인 파일 경로 (DB 옆 디렉터리, 보유자가 살아 있는 동안 flock으로 잠가 둠)
+def liveness_path(holder: str) -> str:
+    return os.path.join(LEADER_LIVENESS_DIR, holder.rpartition(":")[2] + ".lock")
+
+
+# 종료된 프로세스의 임대인지 확인
+def is_stale_holder(holder: Optional[str], own_holder: str) -> bool:
+    """
+    임대 보유자가 이미 종료된 프로세스인지 확인합니다.
+    크래시나 SIGKILL 후 다시 시작한 봇이 이전 임대의 만료를 기다리지 않도록 할 때 사용합니다.
+    호스트 이름이나 PID는 컨테이너마다 겹칠 수 있으므로, 보유자가 살아 있는 동안 잠가 두는 생존 확인 파일의
+    잠금을 얻을 수 있을 때만 종료된 것으로 봅니다. 파일이 없거나 flock을 지원하지 않으면 만료를 기다립니다.
+
+    Args:
+        holder (str, optional): 현재 임대 보유자 ID
+        own_holder (str): 이 프로세스의 보유자 ID
+
+    Returns:
+        bool: 종료된 프로세스의 임대이면 True
+    """
+    if fcntl is None or not holder or holder == own_holder:
+        return False
+
+    path = liveness_path(holder)
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return False
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # 보유자가 아직 잠금을 가지고 있음 (살아 있음)
+        os.close(fd)
+        return False
+
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    os.close(fd)
+    return True
+
+
+# 임대 반납
+def release_lease(name: str, holder: str) -> bool:
+    """
+    내가 가진 임대를 반납합니다. 정상 종료 시 호출하면 다른 복제본이 만료를 기다리지 않고 바로 인계합니다.
+
+    Returns:
+        bool: 반납한 임대가 있으면 True
+    """
+    conn = get_connection()
+
+    try:
+        # 행을 지우지 않고 만료시켜 임기 번호가 계속 증가하도록 함
+        cursor = conn.execute("UPDATE leader_lease SET expires_at = 0 WHERE name = ? AND holder = ?", (name, holder))
+        conn.commit()
+    finally:
+        conn.close()
+
+    return cursor.rowcount > 0
+
+
+class LeaderElector:
+    """
+    공유 SQLite DB의 임대로 여러 봇 복제본 중 하나를 리더로 선출합니다.
+    리더만 주기 작업을 실행하고, 모든 복제본은 명령어를 처리합니다.
+    리더는 LEADER_RENEW_SECONDS마다 임대를 갱신하며, 갱신이 끊기면 LEADER_LEASE_SECONDS 뒤 다른 복제본이 인계합니다.
+
+    리더 자신은 로컬 단조 시계(time.monotonic)로 임대가 남았는지 판단하고, 인계 여부는 DB에 기록된 벽시계(time.time)
+    만료 시각으로 판단합니다. 같은 SQLite 파일을 공유하는 복제본은 보통 한 호스트에서 실행되어 시계가 같지만,
+    다른 호스트에서 실행한다면 시계가 어긋난 만큼 두 복제본이 동시에 리더로 동작할 수 있으므로 시계를 동기화하고
+    어긋남보다 충분히 긴 LEADER_LEASE_SECONDS를 사용해야 합니다.
+    """
+
+    def __init__(self, name: str, lease_seconds: float, renew_seconds: float):
+        self.name = name
+        self.lease_seconds = max(lease_seconds, 1.0)
+        self.renew_seconds = min(max(renew_seconds, 0.1), self.lease_seconds / 2)
+        self.holder_id = make_holder_id()
+
+        self.leader = False
+        self.current_holder: Optional[str] = None
+        self.term = 0
+        self._lease_until = 0.0  # 로컬 기준 임대 만료 시각 (time.monotonic)
+        self._task: Optional[asyncio.Task] = None
+        self._liveness_fd: Optional[int] = None
+
+        # 통계
+        self.elections_won = 0
+        self.demotions = 0
+        self.renew_failures = 0
+        self.last_renewed: Optional[float] = None
+
+    @property
+    def is_leader(self) -> bool:
+        # 갱신 직전에 잰 시각 기준으로 임대가 남아 있을 때만 리더로 봄 (프로세스가 멈췄다 깨어난 경우 대비)
+        return self.leader and time.monotonic() < self._lease_until
+
+    async def _renew(self) -> bool:
+        started = time.monotonic()
+        try:
+            result = await run_db(try_acquire_lease, self.name, self.holder_id, self.lease_seconds)
+            if not result["leader"] and await run_db(is_stale_holder, result["holder"], self.holder_id):
+                # 크래시 후 다시 시작한 경우 이전 실행의 임대가 만료될 때까지 기다리지 않고 바로 인계
+                logger.info(f"종료된 이전 프로세스의 임대 회수: {result['holder']}")
+                await run_db(release_lease, self.name, result["holder"])
+                result = await run_db(try_acquire_lease, self.name, self.holder_id, self.lease_seconds)
+        except Exception as e:
+            self.renew_failures += 1
+            logger.error(f"리더 임대 갱신 실패: {str(e)}")
+            return self.is_leader
+
+        self.current_holder = result["holder"]
+        self.term = result["term"]
+        if result["leader"]:
+            self._lease_until = started + self.lease_seconds
+            self.last_renewed = time.time()
+        return result["leader"]
+
+    async def _loop(self, on_elected: Callable[[], Awaitable[Any]], on_demoted: Callable[[], Awaitable[Any]]):
+        while True:
+            leader = await self._renew()
+
+            if leader and not self.leader:
+                self.leader = True
+                self.elections_won += 1
+                logger.info(f"리더로 선출됨 ({self.holder_id}, 임기 {self.term}): 주기 작업 시작")
+                await on_elected()
+            elif not leader and self.leader:
+                self.leader = False
+                self.demotions += 1
+                logger.warning(f"리더 자격 상실 (현재 리더 {self.current_holder}): 주기 작업 중지")
+                await on_demoted()
+
+            await asyncio.sleep(self.renew_seconds)
+
+    def start(self, on_elected: Callable[[], Awaitable[Any]], on_demoted: Callable[[], Awaitable[Any]]):
+        """
+        선출 루프를 시작합니다.
+
+        Args:
+            on_elected (Callable[[], Awaitable[Any]]): 리더가 되었을 때 호출 (주기 작업 시작)
+            on_demoted (Callable[[], Awaitable[Any]]): 리더 자격을 잃었을 때 호출 (주기 작업 중지)
+        """
+        self._lock_liveness()
+        self._task = asyncio.create_task(self._loop(on_elected, on_demoted))
+
+    def _lock_liveness(self):
+        # 살아 있는 동안 생존 확인 파일을 잠가 둠 (프로세스가 어떻게 끝나든 OS가 잠금을 풀어 다른 복제본이 바로 회수)
+        if fcntl is None or self._liveness_fd is not None:
+            return
+        try:
+            os.makedirs(LEADER_LIVENESS_DIR, exist_ok=True)
+            fd = os.open(liveness_path(self.holder_id), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._liveness_fd = fd
+        except OSError as e:
+            # 잠그지 못하면 다른 복제본은 이 임대의 만료를 기다림
+            logger.warning(f"리더 생존 확인 파일 생성 실패: {str(e)}")
+
+    def _unlock_liveness(self):
+        if self._liveness_fd is None:
+            return
+        try:
+            os.unlink(liveness_path(self.holder_id))
+        except OSError:
+            pass
+        os.close(self._liveness_fd)
+        self._liveness_fd = None
+
+    async def stop(self):
+        """
+        선출 루프를 멈추고, 리더였다면 임대를 반납합니다.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self.leader:
+            self.leader = False
+            await run_db(release_lease, self.name, self.holder_id)
+            logger.info("리더 임대 반납")
+
+        self._unlock_liveness()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        선출 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 리더 여부, 현재 리더, 임기, 선출/상실/갱신 실패 횟수, 남은 임대 시간(초)
+        """
+        return {
+            "holder_id": self.holder_id,
+            "leader": self.is_leader,
+            "current_holder": self.current_holder,
+            "term": self.term,
+            "elections_won": self.elections_won,
+            "demotions": self.demotions,
+            "renew_failures": self.renew_failures,
+            "lease_remaining": max(self._lease_until - time.monotonic(), 0.0) if self.leader else 0.0,
+        }
+
+
+# 프로세스 전역 리더 선출기
+leader_elector = LeaderElector(LEADER_LEASE_NAME, LEADER_LEASE_SECONDS, LEADER_RENEW_SECONDS)
+
+
+# 리더 선출 상태 텍스트 생성 (텔레그램 메시지용)
+def format_leader_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 리더 선출 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열 (리더 선출을 끈 경우 빈 문자열)
+    """
+    if not LEADER_ELECTION:
+        return ""
+
+    stats = leader_elector.stats()
+    role = f"리더 (임대 {stats['lease_remaining']:.0f}초 남음)" if stats["leader"] else f"대기 (리더: {stats['current_holder'] or '없음'})"
+
+    return (
+        f"\n👑 <b>리더 선출</b>\n"
+        f"이 복제본: <code>{stats['holder_id']}</code> - {role}\n"
+        f"임기 {stats['term']}, 선출 {stats['elections_won']}회, 상실 {stats['demotions']}회"
+        + (f", 갱신 실패 {stats['renew_failures']}회" if stats["renew_failures"] else "") + "\n"
+    )
+
+
+# 메인 함수 (테스트용: 터미널 두 개에서 실행하고 한쪽을 종료하면 다른 쪽이 인계하는지 확인)
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    init_leader_db()
+
+    async def on_elected():
+        print(f"[{leader_elector.holder_id}] 리더가 되었습니다 (임기 {leader_elector.term})")
+
+    async def on_demoted():
+        print(f"[{leader_elector.holder_id}] 리더 자격을 잃었습니다")
+
+    # SIGTERM으로 정상 종료하면 임대를 반납하여 다른 프로세스가 바로 인계
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+
+    leader_elector.start(on_elected, on_demoted)
+    try:
+        while not stop.is_set():
+            print(f"[{leader_elector.holder_id}] {'리더: 주기 작업 실행' if leader_elector.is_leader else '대기'}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await leader_elector.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
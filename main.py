@@ -1,9 +1,9 @@
 import os
 import logging
 import sqlite3
-import requests
 import schedule
 import time
+import signal
 import asyncio
 from datetime import datetime
 from aiogram import Bot, Dispatcher, types
@@ -12,24 +12,45 @@ import csv
 import io
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+# 공유 GeckoTerminal HTTP 클라이언트
+from gecko_client import api_get, close_session, format_client_status, GECKO_API_BASE
+from rate_limiter import format_budget_status
+from response_cache import format_cache_status
+from market_data import get_price_snapshot, market_data_service, format_market_data_status
+from circuit_breaker import format_circuit_status
+from models import parse_token, parse_pools, parse_ohlcv
+from db import close_connection, migrate, check_query_plans, run_db, db_executor, format_db_status
+from write_behind import write_queue, format_write_queue_status
+from maintenance import schedule_maintenance_job, format_maintenance_status
+from job_scheduler import job_scheduler, format_scheduler_status
+from sliced_polling import PRICE_POLL_MODE, create_poller, format_polling_status
+from adaptive_polling import ADAPTIVE_POLLING, adaptive_policy, asset_key
+from workers import WORKER_PROCESSES, WORKER_HEARTBEAT_SECONDS, init_worker_db, shard_filter, worker_pool, format_worker_status
+from leader_lock import LEADER_ELECTION, init_leader_db, leader_elector, format_leader_status
+from subscriptions import (
+    init_subscription_db, add_subscription, find_subscription, remove_subscription,
+    get_user_subscriptions, get_subscribed_assets, UPDATE_ASSET_PRICE_SQL, UPDATE_ASSET_INFO_SQL
+)
+
 # 스캠 체크 및 분석 모듈 임포트 추가
 from scam_checker_all import check_token_scam, check_user_tokens_scam, check_all_tokens_scam
 from analyze_checker_all import analyze_token, analyze_user_tokens
 
 # 시장 스캐너 모듈 임포트 추가
 from market_scanner import (
-    market_scanner_scheduler, 
+    schedule_market_scanner_jobs, 
     enable_breakout_alerts, 
     disable_breakout_alerts, 
     get_breakout_alerts_status,
     get_recent_breakout_tokens,
+    get_potential_tokens,
     init_db as init_market_scanner_db
 )
 
 # price_tracker 모듈 임포트
 from price_tracker import (
     init_ohlc_db, 
-    ohlc_scheduler, 
+    schedule_ohlc_job, 
     add_ohlc_alert, 
     remove_ohlc_alert, 
     get_user_ohlc_alerts,
@@ -39,7 +60,7 @@ from price_tracker import (
     generate_price_summary,
     # 일일 요약 알림 관련 함수 추가
     init_daily_summary_db,
-    daily_summary_scheduler,
+    schedule_daily_summary_job,
     enable_daily_summary_alerts,
     disable_daily_summary_alerts,
     get_daily_summary_alerts_status
@@ -48,7 +69,7 @@ from price_tracker import (
 # 페어 트래커 모듈 임포트
 from pair_tracker import (
     init_pair_db,
-    pair_tracker_scheduler,
+    schedule_pair_tracker_job,
     add_token_pair,
     remove_token_pair,
     get_user_pairs,
@@ -103,20 +124,7 @@ dp = Dispatcher(bot)
 
 # 데이터베이스 초기화
 def init_db():
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS tokens (
-        user_id INTEGER,
-        token TEXT,
-        network TEXT,
-        last_price REAL DEFAULT 0,
-        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (user_id, token, network)
-    )
-    ''')
-    conn.commit()
-    conn.close()
+    init_subscription_db()
     logger.info("데이터베이스 초기화 완료")
 
 # GeckoTerminal API를 통한 토큰 가격 조회 (수정)
@@ -129,22 +137,20 @@ async def get_token_price(token_address, network="ethereum"):
         logger.info(f"토큰 가격 조회: 네트워크={network} (API={api_network}), 주소={token_address}")
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
+            token = parse_token(data)
+            if token is not None:
                 return {
                     "success": True,
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???'),
-                    "price": float(attrs.get('price_usd') or 0),
+                    "name": token.name,
+                    "symbol": token.symbol,
+                    "price": token.price_usd,
                     "address": token_address
                 }
             else:
@@ -167,12 +173,7 @@ async def get_token_price(token_address, network="ethereum"):
 
 # 사용자별 토큰 목록 조회
 def get_user_tokens(user_id):
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT token, network FROM tokens WHERE user_id = ?", (user_id,))
-    tokens = cursor.fetchall()
-    conn.close()
-    return tokens
+    return get_user_subscriptions(user_id)
 
 # 인기 토큰 목록
 POPULAR_TOKENS = {
@@ -284,15 +285,9 @@ async def process_token_selection(callback_query: types.CallbackQuery):
         )
         return
     
-    # 데이터베이스에 토큰 추가
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
+    # 구독 추가 (자산 가격 상태는 tracked_assets에 한 번만 저장)
     try:
-        cursor.execute(
-            "INSERT OR REPLACE INTO tokens (user_id, token, network, last_price, last_updated) VALUES (?, ?, ?, ?, ?)",
-            (callback_query.from_user.id, token_address, network, price_info["price"], datetime.now())
-        )
-        conn.commit()
+        await run_db(add_subscription, callback_query.from_user.id, token_address, network, price_info)
         
         await bot.edit_message_text(
             f"✅ <b>토큰이 추가되었습니다!</b>\n\n"
@@ -313,8 +308,6 @@ async def process_token_selection(callback_query: types.CallbackQuery):
             callback_query.message.message_id,
             parse_mode="HTML"
         )
-    finally:
-        conn.close()
 
 # 콜백 쿼리 핸들러 - 네트워크 목록으로 돌아가기
 @dp.callback_query_handler(lambda c: c.data == 'back_to_networks')
@@ -365,15 +358,9 @@ async def add_token(message: types.Message):
         await loading_message.edit_text(f"❌ <b>오류</b>: {price_info['error']}", parse_mode="HTML")
         return
     
-    # 데이터베이스에 토큰 추가
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
+    # 구독 추가 (자산 가격 상태는 tracked_assets에 한 번만 저장)
     try:
-        cursor.execute(
-            "INSERT OR REPLACE INTO tokens (user_id, token, network, last_price, last_updated) VALUES (?, ?, ?, ?, ?)",
-            (message.from_user.id, token_address, network, price_info["price"], datetime.now())
-        )
-        conn.commit()
+        await run_db(add_subscription, message.from_user.id, token_address, network, price_info)
         await loading_message.edit_text(
             f"✅ <b>토큰이 추가되었습니다!</b>\n\n"
             f"<b>이름</b>: {price_info['name']} ({price_info['symbol']})\n"
@@ -386,8 +373,6 @@ async def add_token(message: types.Message):
         logger.info(f"사용자 {message.from_user.id}가 토큰 {price_info['symbol']} ({network})을 추가함")
     except Exception as e:
         await loading_message.edit_text(f"❌ <b>토큰 추가 중 오류가 발생했습니다</b>: {str(e)}", parse_mode="HTML")
-    finally:
-        conn.close()
 
 # 토큰 제거 명령어
 @dp.message_handler(commands=['remove'])
@@ -395,7 +380,7 @@ async def remove_token(message: types.Message):
     user_id = message.from_user.id
     
     # 사용자의 토큰 목록 가져오기
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         await message.reply(
@@ -449,25 +434,14 @@ async def process_remove_callback(callback_query: types.CallbackQuery):
     # 디버그 로그 추가
     logger.info(f"토큰 제거 시도: 사용자={user_id}, 네트워크={network}, 토큰={token_address}")
     
-    # 데이터베이스에서 토큰 제거
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
-    
+    # 데이터베이스에서 구독 제거
     try:
-        # 먼저 토큰이 존재하는지 확인
-        cursor.execute(
-            "SELECT * FROM tokens WHERE user_id = ? AND token = ? AND network = ?",
-            (user_id, token_address, network)
-        )
-        token_exists = cursor.fetchone()
+        # 먼저 구독이 존재하는지 확인
+        token_exists = await run_db(find_subscription, user_id, token_address, network)
         
         if token_exists:
-            # 토큰 제거
-            cursor.execute(
-                "DELETE FROM tokens WHERE user_id = ? AND token = ? AND network = ?",
-                (user_id, token_address, network)
-            )
-            conn.commit()
+            # 구독 제거 (구독자가 없어진 자산은 추적 대상에서도 제거됨)
+            await run_db(remove_subscription, user_id, token_address, network)
             
             await bot.edit_message_text(
                 f"✅ <b>토큰이 제거되었습니다!</b>\n\n"
@@ -480,22 +454,13 @@ async def process_remove_callback(callback_query: types.CallbackQuery):
             logger.info(f"사용자 {user_id}가 토큰 {token_address} ({network})을 제거함")
         else:
             # 대소문자 구분 없이 다시 시도
-            cursor.execute(
-                "SELECT * FROM tokens WHERE user_id = ? AND LOWER(token) = LOWER(?) AND LOWER(network) = LOWER(?)",
-                (user_id, token_address, network)
-            )
-            token_exists_case_insensitive = cursor.fetchone()
+            token_exists_case_insensitive = await run_db(find_subscription, user_id, token_address, network, case_insensitive=True)
             
             if token_exists_case_insensitive:
                 # 실제 저장된 값으로 제거
-                stored_token = token_exists_case_insensitive[1]  # token 컬럼
-                stored_network = token_exists_case_insensitive[2]  # network 컬럼
+                stored_token, stored_network = token_exists_case_insensitive
                 
-                cursor.execute(
-                    "DELETE FROM tokens WHERE user_id = ? AND token = ? AND network = ?",
-                    (user_id, stored_token, stored_network)
-                )
-                conn.commit()
+                await run_db(remove_subscription, user_id, stored_token, stored_network)
                 
                 await bot.edit_message_text(
                     f"✅ <b>토큰이 제거되었습니다!</b>\n\n"
@@ -525,8 +490,6 @@ async def process_remove_callback(callback_query: types.CallbackQuery):
             callback_query.message.message_id,
             parse_mode="HTML"
         )
-    finally:
-        conn.close()
 
 # 가격 조회 명령어 (개선)
 @dp.message_handler(commands=['price'])
@@ -535,7 +498,7 @@ async def get_price(message: types.Message):
     
     if not args:
         # 사용자의 모든 토큰 가격 조회
-        tokens = get_user_tokens(message.from_user.id)
+        tokens = await run_db(get_user_tokens, message.from_user.id)
         
         if not tokens:
             await message.reply(
@@ -692,63 +655,55 @@ async def get_token_additional_info(token_address, network="ethereum"):
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"추가 정보 API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
-            data = response.json()
+            token = parse_token(response.json())
             result = {"success": True}
             
-            if 'data' in data and 'attributes' in data['data']:
-                attributes = data['data']['attributes']
-                
+            if token is not None:
                 # 시가총액
-                if 'fdv_usd' in attributes and attributes['fdv_usd']:
-                    result["market_cap"] = float(attributes['fdv_usd'])
+                if token.fdv_usd:
+                    result["market_cap"] = token.fdv_usd
                 
                 # 총 공급량
-                if 'total_supply' in attributes and attributes['total_supply']:
-                    result["total_supply"] = float(attributes['total_supply'])
+                if token.total_supply:
+                    result["total_supply"] = token.total_supply
                 
                 # 가격 변동
-                if 'price_change_percentage' in attributes and attributes['price_change_percentage'] and 'h24' in attributes['price_change_percentage']:
-                    result["price_change_24h"] = float(attributes['price_change_percentage']['h24'])
+                if token.price_change_percentage.get('h24'):
+                    result["price_change_24h"] = token.price_change_24h
                 
                 # 풀 정보 조회를 위한 추가 요청
-                pools_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/pools"
-                pools_response = requests.get(pools_url, headers=headers)
+                pools_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/pools"
+                pools_response = await api_get(pools_url)
                 
                 if pools_response.status_code == 200:
-                    pools_data = pools_response.json()
+                    pools = parse_pools(pools_response.json())
                     
-                    if 'data' in pools_data and pools_data['data']:
+                    if pools:
                         # 총 유동성 계산
                         total_liquidity = 0
                         total_volume = 0
                         top_dex = None
                         top_liquidity = 0
                         
-                        for pool in pools_data['data']:
-                            if 'attributes' in pool:
-                                pool_attr = pool['attributes']
-                                
-                                # 유동성 합산
-                                if 'reserve_in_usd' in pool_attr and pool_attr['reserve_in_usd']:
-                                    pool_liquidity = float(pool_attr['reserve_in_usd'])
-                                    total_liquidity += pool_liquidity
-                                    
-                                    # 가장 큰 유동성을 가진 DEX 찾기
-                                    if pool_liquidity > top_liquidity:
-                                        top_liquidity = pool_liquidity
-                                        if 'dex_name' in pool_attr:
-                                            top_dex = pool_attr['dex_name']
+                        for pool in pools:
+                            # 유동성 합산
+                            if pool.reserve_in_usd:
+                                total_liquidity += pool.reserve_in_usd
                                 
-                                # 거래량 합산
-                                if 'volume_usd' in pool_attr and 'h24' in pool_attr['volume_usd'] and pool_attr['volume_usd']['h24']:
-                                    total_volume += float(pool_attr['volume_usd']['h24'])
+                                # 가장 큰 유동성을 가진 DEX 찾기
+                                if pool.reserve_in_usd > top_liquidity:
+                                    top_liquidity = pool.reserve_in_usd
+                                    if pool.dex_id:
+                                        top_dex = pool.dex_name
+                            
+                            # 거래량 합산
+                            total_volume += pool.volume_24h
                         
                         result["liquidity"] = total_liquidity
                         result["volume_24h"] = total_volume
@@ -818,28 +773,25 @@ async def get_token_price_change(token_address, network="ethereum"):
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/ohlcv/day"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/ohlcv/day"
         
         logger.info(f"가격 변동 API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'attributes' in data['data'] and 'ohlcv_list' in data['data']['attributes']:
-                ohlcv_list = data['data']['attributes']['ohlcv_list']
+            ohlcv_list = parse_ohlcv(response.json())
+            
+            if len(ohlcv_list) >= 2:
+                # 최신 종가와 이전 종가 비교
+                current_close = ohlcv_list[-1].close
+                previous_close = ohlcv_list[-2].close
                 
-                if len(ohlcv_list) >= 2:
-                    # 최신 종가와 이전 종가 비교
-                    current_close = float(ohlcv_list[-1][4])
-                    previous_close = float(ohlcv_list[-2][4])
-                    
-                    if previous_close > 0:
-                        change_percent = ((current_close - previous_close) / previous_close) * 100
-                        return {
-                            "success": True,
-                            "change_24h": change_percent
-                        }
+                if previous_close > 0:
+                    change_percent = ((current_close - previous_close) / previous_close) * 100
+                    return {
+                        "success": True,
+                        "change_24h": change_percent
+                    }
             
             # 데이터가 충분하지 않은 경우
             return {"success": True, "change_24h": 0}
@@ -870,42 +822,24 @@ async def get_token_pools(token_address, network="ethereum"):
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/pools"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/pools"
         
         logger.info(f"API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
             if 'data' in data:
-                pools_data = []
-                
-                for pool in data['data']:
-                    if 'attributes' in pool:
-                        attrs = pool['attributes']
-                        
-                        # 안전하게 값 추출
-                        try:
-                            reserve_in_usd = attrs.get('reserve_in_usd')
-                            liquidity = float(reserve_in_usd) if reserve_in_usd and reserve_in_usd != 'null' else 0
-                        except (ValueError, TypeError):
-                            liquidity = 0
-                        
-                        try:
-                            volume_usd = attrs.get('volume_usd')
-                            volume_24h = float(volume_usd) if volume_usd and volume_usd != 'null' else 0
-                        except (ValueError, TypeError):
-                            volume_24h = 0
-                        
-                        pool_info = {
-                            "address": attrs.get('address', '알 수 없음'),
-                            "name": attrs.get('name', '알 수 없음'),
-                            "dex": attrs.get('dex', '알 수 없음'),
-                            "liquidity": liquidity,
-                            "volume_24h": volume_24h
-                        }
-                        pools_data.append(pool_info)
+                pools_data = [
+                    {
+                        "address": pool.address,
+                        "name": pool.name,
+                        "dex": pool.dex_name,
+                        "liquidity": pool.reserve_in_usd,
+                        "volume_24h": pool.volume_24h
+                    }
+                    for pool in parse_pools(data)
+                ]
                 
                 # 유동성 기준으로 정렬
                 pools_data.sort(key=lambda x: x['liquidity'], reverse=True)
@@ -948,42 +882,29 @@ async def get_token_info(token_address, network="ethereum"):
         api_network = network_mapping.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                price_usd = float(attrs.get('price_usd') or 0)
-                token_name = attrs.get('name', '알 수 없음')
-                token_symbol = attrs.get('symbol', '???')
-                
-                # 시가총액 정보 추출
-                market_cap = None
-                if attrs.get('fdv_usd'):
-                    market_cap = float(attrs.get('fdv_usd'))
-                
-                # 총 공급량 정보 추출
-                total_supply = None
-                if attrs.get('total_supply'):
-                    total_supply = float(attrs.get('total_supply'))
-                
+            token = parse_token(data)
+            if token is not None:
                 result = {
-                    "price": price_usd,
-                    "name": token_name,
-                    "symbol": token_symbol,
+                    "price": token.price_usd,
+                    "name": token.name,
+                    "symbol": token.symbol,
                     "success": True
                 }
                 
-                if market_cap:
-                    result["market_cap"] = market_cap
+                # 시가총액 정보
+                if token.fdv_usd:
+                    result["market_cap"] = token.fdv_usd
                 
-                if total_supply:
-                    result["total_supply"] = total_supply
+                # 총 공급량 정보
+                if token.total_supply:
+                    result["total_supply"] = token.total_supply
                 
                 return result
             else:
@@ -1004,7 +925,7 @@ async def get_token_info(token_address, network="ethereum"):
 # 토큰 목록 조회 명령 처리
 @dp.message_handler(commands=['list'])
 async def list_tokens(message: types.Message):
-    tokens = get_user_tokens(message.from_user.id)
+    tokens = await run_db(get_user_tokens, message.from_user.id)
     
     if not tokens:
         await message.reply(
@@ -1172,31 +1093,50 @@ async def process_callback(callback_query: types.CallbackQuery):
         )
         await pair_dashboard_command(fake_message)
 
+# 알림 기준 가격을 새로 정할 때인지 확인
+def alert_baseline_expired(asset, now):
+    # 조회 간격이 짧은 자산도 PRICE_CHECK_INTERVAL 동안의 변동으로 알림을 판단하도록, 기준 가격은 주기마다 한 번만 갱신
+    # (예약 실행 시각의 오차를 감안해 주기의 90%가 지나면 갱신)
+    last_updated = asset.get("last_updated")
+    return last_updated is None or (now - last_updated).total_seconds() >= PRICE_CHECK_INTERVAL * 0.9
+
 # 가격 모니터링 및 알림 전송 함수 수정
-async def check_price_changes():
+async def check_price_changes(assets=None, max_age=None):
+    refreshed = []
+    checked_at = datetime.now()
     try:
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id, token, network, last_price FROM tokens")
-        tokens = cursor.fetchall()
-        conn.close()
+        # 자산당 한 번만 가격을 확인하고, 알림은 구독자에게 나눠 보냄 (생략 시 추적 중인 모든 자산)
+        if assets is None:
+            assets = shard_filter(
+                await run_db(get_subscribed_assets, with_subscribers=True),
+                lambda asset: asset["network"], lambda asset: asset["token_address"]
+            )
         
-        logger.info(f"가격 모니터링 시작: {len(tokens)}개 토큰 확인 중...")
+        logger.info(f"가격 모니터링 시작: {len(assets)}개 토큰 확인 중...")
         alert_count = 0
         
-        for user_id, token_address, network, last_price in tokens:
+        # 추적 중인 토큰 가격을 시장 데이터 서비스에서 조회 (오래된 가격만 tokens/multi로 갱신)
+        snapshot = await get_price_snapshot(
+            "price_alert", [(asset["token_address"], asset["network"]) for asset in assets], max_age
+        )
+        
+        for asset in assets:
+            token_address = asset["token_address"]
+            network = asset["network"]
+            last_price = asset["last_price"]  # 알림 기준 가격 (마지막 알림 또는 마지막 주기 경계의 가격)
+            alerted = False
+            
             try:
-                # API 요청 사이에 지연 시간 추가
-                await asyncio.sleep(1)
-                
-                # 토큰 가격 조회
-                price_info = await get_token_price(token_address, network)
+                # 스냅샷에서 토큰 가격 조회
+                price_info = snapshot.get(token_address, network)
                 
                 if not price_info["success"]:
-                    logger.error(f"토큰 {token_address} 가격 조회 실패: {price_info['error']}")
+                    if not snapshot.is_unavailable(network):
+                        logger.error(f"토큰 {token_address} 가격 조회 실패: {price_info['error']}")
                     continue
                 
                 current_price = price_info["price"]
+                refreshed.append((token_address, network))
                 
                 # 가격 변동 계산
                 if last_price > 0:
@@ -1205,9 +1145,9 @@ async def check_price_changes():
                     
                     logger.info(f"토큰 {price_info['symbol']} ({network}): {price_change_percent:.2f}% {price_change_direction}")
                     
-                    # 가격 변동이 임계값을 초과하면 알림 전송
+                    # 가격 변동이 임계값을 초과하면 구독자 전원에게 알림 전송
                     if price_change_percent >= PRICE_CHANGE_THRESHOLD:
-                        alert_count += 1
+                        alerted = True
                         
                         # 이모지 선택 (상승 시 🚀, 하락 시 📉)
                         change_emoji = "🚀" if current_price > last_price else "📉"
@@ -1219,47 +1159,119 @@ async def check_price_changes():
                             market_cap_formatted = f"${market_cap:,.0f}"
                             market_cap_text = f"시가총액: <b>{market_cap_formatted}</b>\n"
                         
-                        try:
-                            await bot.send_message(
-                                user_id,
-                                f"{change_emoji} <b>가격 변동 알림!</b>\n\n"
-                                f"<b>{price_info['name']} ({price_info['symbol']})</b>\n"
-                                f"네트워크: <code>{network}</code>\n"
-                                f"이전 가격: <b>${last_price:.8f}</b>\n"
-                                f"현재 가격: <b>${current_price:.8f}</b>\n"
-                                f"변동: <b>{price_change_percent:.2f}% {price_change_direction}</b>\n"
-                                f"{market_cap_text}"
-                                f"🕒 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                                parse_mode="HTML"
-                            )
-                            logger.info(f"알림 전송 성공 (사용자 ID: {user_id}, 토큰: {price_info['symbol']})")
-                        except Exception as e:
-                            logger.error(f"알림 전송 실패 (사용자 ID: {user_id}): {str(e)}")
+                        alert_text = (
+                            f"{change_emoji} <b>가격 변동 알림!</b>\n\n"
+                            f"<b>{price_info['name']} ({price_info['symbol']})</b>\n"
+                            f"네트워크: <code>{network}</code>\n"
+                            f"이전 가격: <b>${last_price:.8f}</b>\n"
+                            f"현재 가격: <b>${current_price:.8f}</b>\n"
+                            f"변동: <b>{price_change_percent:.2f}% {price_change_direction}</b>\n"
+                            f"{market_cap_text}"
+                            f"🕒 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                        )
+                        
+                        for user_id in asset["subscribers"]:
+                            alert_count += 1
+                            try:
+                                await bot.send_message(user_id, alert_text, parse_mode="HTML")
+                                logger.info(f"알림 전송 성공 (사용자 ID: {user_id}, 토큰: {price_info['symbol']})")
+                            except Exception as e:
+                                logger.error(f"알림 전송 실패 (사용자 ID: {user_id}): {str(e)}")
                 
-                # 데이터베이스 업데이트
-                conn = sqlite3.connect('tokens.db')
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE tokens SET last_price = ?, last_updated = ? WHERE user_id = ? AND token = ? AND network = ?",
-                    (current_price, datetime.now(), user_id, token_address, network)
-                )
-                conn.commit()
-                conn.close()
+                # 알림을 보냈거나 기준 가격이 한 주기보다 오래되었을 때만 기준 가격 갱신 (쓰기 큐에 모아 주기 끝에 한 번에 기록)
+                if alerted or last_price <= 0 or alert_baseline_expired(asset, checked_at):
+                    write_queue.enqueue(
+                        UPDATE_ASSET_PRICE_SQL,
+                        (current_price, price_info["name"], price_info["symbol"], checked_at, token_address, network)
+                    )
                 
             except Exception as e:
                 logger.error(f"토큰 {token_address} ({network}) 모니터링 중 오류: {str(e)}")
                 continue
         
+        await write_queue.flush_async()
         logger.info(f"가격 모니터링 완료: {alert_count}개 알림 전송됨")
         
     except Exception as e:
         logger.error(f"가격 체크 중 오류: {str(e)}")
-
-# 주기적 가격 체크 스케줄러
-async def scheduler():
-    while True:
-        await check_price_changes()
-        await asyncio.sleep(PRICE_CHECK_INTERVAL)
+    
+    return refreshed
+
+# 가격 알림 분할 수집기 (PRICE_POLL_MODE=sliced일 때 자산을 PRICE_CHECK_INTERVAL 안의 슬롯에 나눠 조회)
+price_poller = create_poller("price_alert", PRICE_CHECK_INTERVAL, "price_alert") if PRICE_POLL_MODE == "sliced" else None
+
+# 가격 변동 알림 조건까지의 거리(%) 계산 (알림 기준 가격 대비 최근 관측 가격의 변동)
+def price_alert_distances(assets):
+    distances = {}
+    for asset in assets:
+        last_price = asset["last_price"]
+        current_price = adaptive_policy.last_price(asset["token_address"], asset["network"])
+        if last_price > 0 and current_price:
+            change_percent = abs(current_price - last_price) / last_price * 100
+            distances[asset_key(asset["token_address"], asset["network"])] = max(PRICE_CHANGE_THRESHOLD - change_percent, 0.0)
+    return distances
+
+# 가격 알림 슬롯 실행
+async def check_price_slice():
+    # 매 슬롯마다 구독 상태를 다시 읽어 구독 해제된 사용자에게 알림을 보내지 않음 (다중 프로세스 모드에서는 담당 자산만)
+    assets = shard_filter(
+        await run_db(get_subscribed_assets, with_subscribers=True),
+        lambda asset: asset["network"], lambda asset: asset["token_address"]
+    )
+    
+    # 적응형 조회: 변동성, 구독자 수, 알림 임계값 근접도에 따라 자산별 조회 간격 결정
+    intervals = None
+    if ADAPTIVE_POLLING:
+        intervals = adaptive_policy.intervals(
+            assets, PRICE_CHECK_INTERVAL, price_alert_distances(assets), consumer=price_poller.name,
+            batch_size=price_poller.batch_size
+        )
+    
+    due_assets = price_poller.due(assets, intervals=intervals)
+    
+    if due_assets:
+        # 적응형 간격이 신선도보다 짧은 자산은 캐시된 가격 대신 새로 조회
+        max_age = price_poller.max_age(due_assets, intervals, market_data_service.max_age_for("price_alert"))
+        price_poller.mark_refreshed(await check_price_changes(due_assets, max_age))
+
+# 수집 작업 등록
+def register_jobs(global_jobs: bool = True):
+    """
+    가격 알림, 시장 스캔, OHLC, 페어 트래커 수집 작업을 등록합니다.
+    다중 프로세스 모드에서는 각 워커가 자기 담당 범위에 대해 호출합니다.
+    
+    Args:
+        global_jobs (bool, optional): 네트워크와 관계없는 일일 요약 알림과 DB 유지보수도 등록할지 여부
+    """
+    # 주기 작업 등록 (등록 순서대로 첫 실행 시각이 분산됨)
+    if price_poller:
+        # 가격 알림: 슬롯마다 자기 몫의 자산만 조회하여 요청 부하를 주기 전체에 고르게 분산
+        job_scheduler.add_job(
+            "price_alert", check_price_slice, price_poller.slot_seconds, subsystem="price_alert",
+            deadline=PRICE_CHECK_INTERVAL, jitter=0
+        )
+    else:
+        job_scheduler.add_job("price_alert", check_price_changes, PRICE_CHECK_INTERVAL, subsystem="price_alert")  # 가격 알림
+    schedule_market_scanner_jobs()  # 시장 스캔, 돌파 토큰 추적
+    schedule_ohlc_job(bot)  # OHLC 수집
+    schedule_pair_tracker_job(bot)  # 페어 트래커
+    
+    if global_jobs:
+        schedule_daily_summary_job(bot)  # 일일 요약 알림
+        schedule_maintenance_job()  # DB 보관 기간 정리/압축
+
+# 주기 작업 시작 (리더 선출 시 리더가 된 복제본에서만 실행)
+async def start_periodic_work():
+    if WORKER_PROCESSES > 0:
+        # 다중 프로세스 모드: 수집은 네트워크(또는 자산 해시)별 워커 프로세스가 맡고, 이 프로세스는 봇 업데이트만 처리
+        worker_pool.start(SUPPORTED_NETWORKS)
+    job_scheduler.start()
+
+# 주기 작업 중지 (리더 자격을 잃은 경우 및 종료 시)
+async def stop_periodic_work():
+    await job_scheduler.stop()
+    if WORKER_PROCESSES > 0:
+        await worker_pool.stop()
 
 # 메인 함수 수정
 async def main():
@@ -1269,16 +1281,47 @@ async def main():
     init_ohlc_db()
     init_daily_summary_db()  # 일일 요약 알림 데이터베이스 초기화
     init_pair_db()  # 페어 트래커 데이터베이스 초기화
+    init_worker_db()  # 수집 워커 상태 테이블 초기화
+    init_leader_db()  # 복제본 리더 임대 테이블 초기화
+    migrate()  # 스키마 마이그레이션 (인덱스 등)
+    check_query_plans()  # 자주 쓰는 조회가 인덱스를 사용하는지 확인
+    
+    if WORKER_PROCESSES > 0:
+        job_scheduler.add_job("worker_supervisor", worker_pool.supervise, WORKER_HEARTBEAT_SECONDS)
+    else:
+        register_jobs()
+    
+    if LEADER_ELECTION:
+        # 여러 복제본을 실행해도 임대를 가진 리더만 주기 작업을 실행하고, 모든 복제본은 명령어를 처리
+        job_scheduler.run_condition = lambda: leader_elector.is_leader
+        leader_elector.start(start_periodic_work, stop_periodic_work)
+    else:
+        await start_periodic_work()
+    
+    # DB 지연 쓰기 flush 루프 (주기가 아니라 큐 크기에 따라 깨어나므로 스케줄러와 별도로 실행)
+    asyncio.create_task(write_queue.run())
     
-    # 스케줄러 시작
-    asyncio.create_task(scheduler())  # 가격 알림 스케줄러
-    asyncio.create_task(market_scanner_scheduler())  # 시장 스캔 스케줄러
-    asyncio.create_task(ohlc_scheduler(bot))  # OHLC 스케줄러 시작
-    asyncio.create_task(daily_summary_scheduler(bot))  # 일일 요약 알림 스케줄러 시작
-    asyncio.create_task(pair_tracker_scheduler(bot))  # 페어 트래커 스케줄러 시작
+    # SIGTERM(systemd, docker stop)을 받아도 아래 정리 단계를 거쳐 리더 임대를 반납하도록 폴링을 취소
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        # Windows 이벤트 루프는 시그널 핸들러를 지원하지 않음 (Ctrl+C 종료는 그대로 정리 단계를 거침)
+        pass
     
     # 봇 시작
-    await dp.start_polling()
+    try:
+        await dp.start_polling()
+    except asyncio.CancelledError:
+        logger.info("종료 신호를 받아 봇을 종료합니다.")
+    finally:
+        # 주기 작업 중지, 리더 임대 반납 (다른 복제본이 바로 인계), 공유 HTTP 세션 및 데이터베이스 연결 정리
+        await stop_periodic_work()
+        if LEADER_ELECTION:
+            await leader_elector.stop()
+        await close_session()
+        await write_queue.flush_async()
+        db_executor.shutdown()
+        close_connection()
 
 # DEX 검색 명령어 (수정)
 @dp.message_handler(commands=['dex'])
@@ -1374,15 +1417,9 @@ async def process_token_address(message: types.Message):
         )
         return
     
-    # 데이터베이스에 토큰 추가
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
+    # 구독 추가 (자산 가격 상태는 tracked_assets에 한 번만 저장)
     try:
-        cursor.execute(
-            "INSERT OR REPLACE INTO tokens (user_id, token, network, last_price, last_updated) VALUES (?, ?, ?, ?, ?)",
-            (user_id, token_address, network, price_info["price"], datetime.now())
-        )
-        conn.commit()
+        await run_db(add_subscription, user_id, token_address, network, price_info)
         
         # 사용자 상태 초기화
         if user_id in user_data:
@@ -1403,8 +1440,6 @@ async def process_token_address(message: types.Message):
             f"❌ <b>토큰 추가 중 오류가 발생했습니다</b>: {str(e)}",
             parse_mode="HTML"
         )
-    finally:
-        conn.close()
 
 # 시가총액 조회 명령어
 @dp.message_handler(commands=['marketcap'])
@@ -1413,7 +1448,7 @@ async def get_market_cap(message: types.Message):
     
     if not args:
         # 사용자의 토큰 목록에서 시가총액 조회
-        tokens = get_user_tokens(message.from_user.id)
+        tokens = await run_db(get_user_tokens, message.from_user.id)
         
         if not tokens:
             await message.reply(
@@ -1540,7 +1575,7 @@ async def scamcheck_token(message: types.Message):
     user_id = message.from_user.id
     
     # 사용자의 토큰 목록 가져오기
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         await message.reply(
@@ -1792,7 +1827,7 @@ async def analyze_token(message: types.Message):
 @dp.message_handler(commands=['update'])
 async def update_tokens_info(message: types.Message):
     user_id = message.from_user.id
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         await message.reply(
@@ -1805,24 +1840,22 @@ async def update_tokens_info(message: types.Message):
     loading_message = await message.reply("🔄 토큰 정보를 업데이트 중입니다...", parse_mode="HTML")
     
     updated_count = 0
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
     
     for token_address, network in tokens:
         try:
             price_info = await get_token_price(token_address, network)
             
             if price_info["success"]:
-                cursor.execute(
-                    "UPDATE tokens SET last_price = ?, last_updated = ? WHERE user_id = ? AND token = ? AND network = ?",
-                    (price_info["price"], datetime.now(), user_id, token_address, network)
+                # 이름/심볼만 갱신 (알림 기준 가격을 바꾸면 구독자 전원의 진행 중인 변동이 초기화됨)
+                write_queue.enqueue(
+                    UPDATE_ASSET_INFO_SQL,
+                    (price_info["name"], price_info["symbol"], token_address, network)
                 )
                 updated_count += 1
         except Exception as e:
             logger.error(f"토큰 {token_address} 업데이트 중 오류: {str(e)}")
     
-    conn.commit()
-    conn.close()
+    await write_queue.flush_async()
     
     if updated_count > 0:
         await loading_message.edit_text(
@@ -1841,7 +1874,7 @@ async def update_tokens_info(message: types.Message):
 @dp.message_handler(commands=['analyzeall'])
 async def analyze_all_tokens(message: types.Message):
     user_id = message.from_user.id
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         await message.reply(
@@ -1987,7 +2020,7 @@ async def analyze_all_tokens_command(message: types.Message):
     user_id = message.from_user.id
     
     # 사용자의 토큰 목록 가져오기
-    tokens = get_user_tokens(user_id)
+    tokens = await run_db(get_user_tokens, user_id)
     
     if not tokens:
         await message.reply(
@@ -2165,7 +2198,7 @@ async def breakout_alerts_command(message: types.Message):
     
     if args == "on":
         # 알림 활성화
-        if enable_breakout_alerts(user_id):
+        if await run_db(enable_breakout_alerts, user_id):
             await message.reply(
                 "✅ <b>1백만 달러 시가총액 돌파 알림이 활성화되었습니다!</b>\n\n"
                 "새로운 토큰이 1백만 달러 시가총액을 돌파하면 알림을 받게 됩니다.",
@@ -2180,7 +2213,7 @@ async def breakout_alerts_command(message: types.Message):
     
     elif args == "off":
         # 알림 비활성화
-        if disable_breakout_alerts(user_id):
+        if await run_db(disable_breakout_alerts, user_id):
             await message.reply(
                 "✅ <b>1백만 달러 시가총액 돌파 알림이 비활성화되었습니다.</b>",
                 parse_mode="HTML"
@@ -2194,7 +2227,7 @@ async def breakout_alerts_command(message: types.Message):
     
     else:
         # 현재 상태 확인
-        is_enabled = get_breakout_alerts_status(user_id)
+        is_enabled = await run_db(get_breakout_alerts_status, user_id)
         status = "활성화" if is_enabled else "비활성화"
         
         await message.reply(
@@ -2209,7 +2242,7 @@ async def breakout_alerts_command(message: types.Message):
 @dp.message_handler(commands=['breakouts'])
 async def recent_breakouts_command(message: types.Message):
     # 최근 돌파 토큰 목록 가져오기
-    breakout_tokens = get_recent_breakout_tokens(limit=10)
+    breakout_tokens = await run_db(get_recent_breakout_tokens, limit=10)
     
     if not breakout_tokens:
         await message.reply(
@@ -2246,15 +2279,16 @@ async def scan_market_command(message: types.Message):
     
     loading_message = await message.reply("🔍 시장 스캔을 시작합니다. 이 작업은 몇 분 정도 소요될 수 있습니다...")
     
-    try:
-        # 시장 스캔 함수 임포트 및 실행
-        from market_scanner import scan_market_for_new_tokens
-        await scan_market_for_new_tokens()
-        
+    # 주기 실행과 겹치지 않도록 스케줄러를 통해 실행 (다중 프로세스 모드에서는 작업을 가진 워커에 요청)
+    if WORKER_PROCESSES > 0:
+        result = await worker_pool.run_now("market_scan")
+    else:
+        result = await job_scheduler.run_now("market_scan")
+    
+    if result["success"]:
         await loading_message.edit_text("✅ 시장 스캔이 완료되었습니다.")
-    except Exception as e:
-        logger.error(f"시장 스캔 중 오류: {str(e)}")
-        await loading_message.edit_text(f"❌ 시장 스캔 중 오류가 발생했습니다: {str(e)}")
+    else:
+        await loading_message.edit_text(f"❌ 시장 스캔 중 오류가 발생했습니다: {result['error']}")
 
 # 잠재적 돌파 토큰 추적 수동 실행 명령어 (관리자 전용)
 @dp.message_handler(commands=['track_breakouts'])
@@ -2268,35 +2302,22 @@ async def track_breakouts_command(message: types.Message):
     
     loading_message = await message.reply("🔍 잠재적 돌파 토큰을 추적합니다...")
     
-    try:
-        # 토큰 추적 함수 임포트 및 실행
-        from market_scanner import track_potential_breakout_tokens
-        await track_potential_breakout_tokens()
-        
+    # 주기 실행과 겹치지 않도록 스케줄러를 통해 실행 (다중 프로세스 모드에서는 작업을 가진 워커에 요청)
+    if WORKER_PROCESSES > 0:
+        result = await worker_pool.run_now("breakout_tracking")
+    else:
+        result = await job_scheduler.run_now("breakout_tracking")
+    
+    if result["success"]:
         await loading_message.edit_text("✅ 토큰 추적이 완료되었습니다.")
-    except Exception as e:
-        logger.error(f"토큰 추적 중 오류: {str(e)}")
-        await loading_message.edit_text(f"❌ 토큰 추적 중 오류가 발생했습니다: {str(e)}")
+    else:
+        await loading_message.edit_text(f"❌ 토큰 추적 중 오류가 발생했습니다: {result['error']}")
 
 # 잠재적 토큰 목록 조회 명령어
 @dp.message_handler(commands=['potential'])
 async def potential_tokens_command(message: types.Message):
     try:
-        conn = sqlite3.connect('tokens.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """
-            SELECT * FROM potential_tokens 
-            WHERE breakout_detected = 0
-            ORDER BY market_cap DESC
-            LIMIT 10
-            """
-        )
-        
-        tokens = cursor.fetchall()
-        conn.close()
+        tokens = await run_db(get_potential_tokens, 10)
         
         if not tokens:
             await message.reply(
@@ -2325,6 +2346,36 @@ async def potential_tokens_command(message: types.Message):
         logger.error(f"잠재적 토큰 목록 조회 중 오류: {str(e)}")
         await message.reply(f"❌ <b>오류가 발생했습니다</b>: {str(e)}", parse_mode="HTML")
 
+# API 예산 상태 조회 명령어
+@dp.message_handler(commands=['apistatus'])
+async def api_status_command(message: types.Message):
+    # 관리자 ID 확인 (API 사용량, DB, 워커 등 내부 상태를 보여주므로 관리자 전용)
+    admin_ids = [123456789]  # 예시 ID, 실제 관리자 ID로 변경 필요
+    
+    if message.from_user.id not in admin_ids:
+        await message.reply("⛔ 이 명령어는 관리자만 사용할 수 있습니다.")
+        return
+    
+    sections = [
+        format_budget_status(), format_client_status(), format_cache_status(), format_market_data_status(),
+        format_circuit_status(), format_write_queue_status(), format_db_status(), format_maintenance_status(),
+        format_scheduler_status(), format_polling_status(), await format_worker_status(), format_leader_status(),
+    ]
+    
+    # 텔레그램 메시지 길이 제한(4096자)에 맞춰 항목 단위로 묶어 전송 (HTML 태그가 잘리지 않도록 항목 중간에서 나누지 않음)
+    chunks = [""]
+    for section in filter(None, sections):
+        if len(section) > 4096:
+            # 한 항목이 제한보다 길면 줄 단위로 잘라 제한 안의 부분만 표시
+            section = section[:section.rfind("\n", 0, 4096 - 20) + 1] + "…(이하 생략)\n"
+        if len(chunks[-1]) + len(section) > 4096:
+            chunks.append("")
+        chunks[-1] += section
+    
+    for chunk in chunks:
+        if chunk.strip():
+            await message.reply(chunk, parse_mode="HTML")
+
 # 도움말 명령어 업데이트
 @dp.message_handler(commands=['help'])
 async def help_command(message: types.Message):
@@ -2395,7 +2446,7 @@ async def ohlc_alert_command(message: types.Message):
     
     # 알림 설정 목록 조회
     if args[0].lower() == "list":
-        alerts = get_user_ohlc_alerts(user_id)
+        alerts = await run_db(get_user_ohlc_alerts, user_id)
         
         if not alerts:
             await message.reply("ℹ️ <b>설정된 OHLC 알림이 없습니다.</b>", parse_mode="HTML")
@@ -2436,7 +2487,7 @@ async def ohlc_alert_command(message: types.Message):
             await message.reply("❌ <b>지원하지 않는 알림 유형입니다.</b>\n유효한 알림 유형: price_above, price_below, daily_change", parse_mode="HTML")
             return
         
-        if remove_ohlc_alert(user_id, token_address, network, alert_type):
+        if await run_db(remove_ohlc_alert, user_id, token_address, network, alert_type):
             await message.reply(f"✅ <b>OHLC 알림 설정이 제거되었습니다.</b>", parse_mode="HTML")
         else:
             await message.reply("❌ <b>알림 설정 제거 중 오류가 발생했습니다.</b>", parse_mode="HTML")
@@ -2473,7 +2524,7 @@ async def ohlc_alert_command(message: types.Message):
         return
     
     # 알림 설정 추가
-    if add_ohlc_alert(user_id, token_address, network, alert_type, threshold):
+    if await run_db(add_ohlc_alert, user_id, token_address, network, alert_type, threshold):
         alert_type_name = {
             "price_above": "가격 상승",
             "price_below": "가격 하락",
@@ -2528,7 +2579,7 @@ async def ohlc_chart_command(message: types.Message):
         return
     
     # OHLC 데이터 조회
-    ohlc_data = get_ohlc_data(token_address, network, interval, limit)
+    ohlc_data = await run_db(get_ohlc_data, token_address, network, interval, limit)
     
     if not ohlc_data["success"] or not ohlc_data["data"]:
         await loading_message.edit_text(
@@ -2539,7 +2590,7 @@ async def ohlc_chart_command(message: types.Message):
         return
     
     # 가격 요약 정보 생성
-    price_summary = generate_price_summary(token_address, network)
+    price_summary = await run_db(generate_price_summary, token_address, network)
     
     interval_name = "시간별" if interval == "1h" else "일별"
     
@@ -2583,7 +2634,7 @@ async def daily_summary_command(message: types.Message):
     
     if not args:
         # 현재 상태 확인
-        status = get_daily_summary_alerts_status(user_id)
+        status = await run_db(get_daily_summary_alerts_status, user_id)
         status_text = "활성화" if status else "비활성화"
         
         await message.reply(
@@ -2598,7 +2649,7 @@ async def daily_summary_command(message: types.Message):
     command = args[0].lower()
     
     if command == "on":
-        if enable_daily_summary_alerts(user_id):
+        if await run_db(enable_daily_summary_alerts, user_id):
             await message.reply(
                 "✅ <b>일일 요약 알림이 활성화되었습니다.</b>\n"
                 "매일 오전 6시에 추적 중인 모든 토큰의 요약 정보를 받게 됩니다.",
@@ -2608,7 +2659,7 @@ async def daily_summary_command(message: types.Message):
             await message.reply("❌ <b>일일 요약 알림 활성화 중 오류가 발생했습니다.</b>", parse_mode="HTML")
     
     elif command == "off":
-        if disable_daily_summary_alerts(user_id):
+        if await run_db(disable_daily_summary_alerts, user_id):
             await message.reply("✅ <b>일일 요약 알림이 비활성화되었습니다.</b>", parse_mode="HTML")
         else:
             await message.reply("❌ <b>일일 요약 알림 비활성화 중 오류가 발생했습니다.</b>", parse_mode="HTML")
@@ -2667,11 +2718,11 @@ async def add_pair_command(message: types.Message):
             return
         
         # 페어 추가
-        result = add_token_pair(user_id, pair_name, token_a, token_b, network, threshold)
+        result = await run_db(add_token_pair, user_id, pair_name, token_a, token_b, network, threshold)
         
         if result["success"]:
             # 토큰 심볼 업데이트
-            update_pair_symbols(user_id, pair_name, token_a_info['symbol'], token_b_info['symbol'])
+            await run_db(update_pair_symbols, user_id, pair_name, token_a_info['symbol'], token_b_info['symbol'])
             
             ratio = token_a_info["price"] / token_b_info["price"]
             
@@ -2713,7 +2764,7 @@ async def remove_pair_command(message: types.Message):
     
     pair_name = args[0].upper()
     
-    result = remove_token_pair(user_id, pair_name)
+    result = await run_db(remove_token_pair, user_id, pair_name)
     
     if result["success"]:
         await message.reply(f"✅ <b>{result['message']}</b>", parse_mode="HTML")
@@ -2725,7 +2776,7 @@ async def remove_pair_command(message: types.Message):
 async def list_pairs_command(message: types.Message):
     user_id = message.from_user.id
     
-    pairs = get_user_pairs(user_id)
+    pairs = await run_db(get_user_pairs, user_id)
     
     if not pairs:
         await message.reply(
@@ -2782,7 +2833,7 @@ async def toggle_pair_command(message: types.Message):
     
     pair_name = args[0].upper()
     
-    result = toggle_pair_alert(user_id, pair_name)
+    result = await run_db(toggle_pair_alert, user_id, pair_name)
     
     if result["success"]:
         await message.reply(f"✅ <b>{result['message']}</b>", parse_mode="HTML")
@@ -2812,7 +2863,7 @@ async def pair_history_command(message: types.Message):
     
     loading_message = await message.reply("🔍 <b>페어 기록을 조회 중입니다...</b>", parse_mode="HTML")
     
-    history = get_pair_history(user_id, pair_name, hours)
+    history = await run_db(get_pair_history, user_id, pair_name, hours)
     
     if not history:
         await loading_message.edit_text(
@@ -2857,7 +2908,7 @@ async def toggle_periodic_pair_command(message: types.Message):
         return
     
     pair_name = args[0]
-    result = toggle_periodic_alert(user_id, pair_name)
+    result = await run_db(toggle_periodic_alert, user_id, pair_name)
     
     if result["success"]:
         await message.reply(f"✅ {result['message']}")
@@ -2868,7 +2919,7 @@ async def toggle_periodic_pair_command(message: types.Message):
 @dp.message_handler(commands=['dashboard', 'dash'])
 async def pair_dashboard_command(message: types.Message):
     user_id = message.from_user.id
-    pairs = get_user_pairs(user_id)
+    pairs = await run_db(get_user_pairs, user_id)
     
     # 대시보드 헤더
     dashboard_text = "🎛️ <b>페어 모니터링 대시보드</b>\n\n"
@@ -2956,7 +3007,7 @@ async def process_dashboard_callback(callback_query: types.CallbackQuery):
                                              reply_markup=get_back_to_dashboard_keyboard())
     
     elif action == "list_pairs":
-        pairs = get_user_pairs(user_id)
+        pairs = await run_db(get_user_pairs, user_id)
         if not pairs:
             await callback_query.message.edit_text(
                 "📭 등록된 페어가 없습니다.\n\n➕ 페어를 추가해보세요!",
@@ -2967,7 +3018,7 @@ async def process_dashboard_callback(callback_query: types.CallbackQuery):
             await show_pairs_page(callback_query.message, pairs, 0)
     
     elif action == "quick_toggle":
-        pairs = get_user_pairs(user_id)
+        pairs = await run_db(get_user_pairs, user_id)
         if not pairs:
             await callback_query.message.edit_text(
                 "📭 설정할 페어가 없습니다.",
@@ -3096,7 +3147,7 @@ async def show_dashboard_help(message):
 async def process_pairs_page_callback(callback_query: types.CallbackQuery):
     await callback_query.answer()
     page = int(callback_query.data.replace('pairs_page_', ''))
-    pairs = get_user_pairs(callback_query.from_user.id)
+    pairs = await run_db(get_user_pairs, callback_query.from_user.id)
     await show_pairs_page(callback_query.message, pairs, page)
 
 # 빠른 토글 콜백
@@ -3139,9 +3190,9 @@ async def process_actual_toggle_callback(callback_query: types.CallbackQuery):
     user_id = callback_query.from_user.id
     
     if toggle_type == "change":
-        result = toggle_pair_alert(user_id, pair_name)
+        result = await run_db(toggle_pair_alert, user_id, pair_name)
     else:  # periodic
-        result = toggle_periodic_alert(user_id, pair_name)
+        result = await run_db(toggle_periodic_alert, user_id, pair_name)
     
     if result["success"]:
         await callback_query.answer(f"✅ {result['message']}", show_alert=True)
@@ -3149,7 +3200,7 @@ async def process_actual_toggle_callback(callback_query: types.CallbackQuery):
         await callback_query.answer(f"❌ {result['message']}", show_alert=True)
     
     # 빠른 설정 메뉴로 돌아가기
-    pairs = get_user_pairs(user_id)
+    pairs = await run_db(get_user_pairs, user_id)
     await show_quick_toggle_menu(callback_query.message, pairs)
 
 if __name__ == '__main__':
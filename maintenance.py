@@ -0,0 +1,390 @@
+import os
+import time
+import logging
+import sqlite3
+from typing import Any, Dict, Optional
+
+from db import get_connection, run_db
+from job_scheduler import job_scheduler, FIXED_DELAY
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 유지보수 실행 간격(초)
+MAINTENANCE_INTERVAL = int(os.getenv("DB_MAINTENANCE_INTERVAL", 6 * 3600))
+MAINTENANCE_INITIAL_DELAY = int(os.getenv("DB_MAINTENANCE_INITIAL_DELAY", 300))  # 봇 시작 후 첫 실행까지 대기(초)
+
+# 한 번에 삭제할 행 수 (쓰기 잠금을 짧게 유지)
+MAINTENANCE_BATCH_SIZE = int(os.getenv("DB_MAINTENANCE_BATCH_SIZE", 5000))
+
+# 한 번에 반환할 빈 페이지 수 (incremental_vacuum)
+VACUUM_PAGES = int(os.getenv("DB_VACUUM_PAGES", 2000))
+
+# ANALYZE 시 인덱스당 확인할 행 수 (0이면 전체)
+ANALYZE_LIMIT = int(os.getenv("DB_ANALYZE_LIMIT", 1000))
+
+# 간격별 OHLC 보관 기간(일). 0이면 삭제하지 않음
+DEFAULT_OHLC_RETENTION_DAYS = {
+    "1h": 30,
+    "1d": 0,
+}
+
+# 삭제 전에 더 큰 간격으로 합칠 대상 (1시간봉 → 일봉)
+OHLC_ROLLUP_TARGETS = {
+    "1h": ("1d", 86400),
+}
+
+# 페어 비율 보관 기간(일). 원본(1분 단위)은 시간별로 합친 뒤 삭제
+PAIR_RATIO_RETENTION_DAYS = float(os.getenv("PAIR_RATIO_RETENTION_DAYS", 7))
+PAIR_RATIO_HOURLY_RETENTION_DAYS = float(os.getenv("PAIR_RATIO_HOURLY_RETENTION_DAYS", 365))
+
+# 마지막 실행 결과
+maintenance_stats: Dict[str, Any] = {
+    "last_run": None,       # 마지막 실행 시각 (epoch)
+    "duration_ms": 0.0,     # 마지막 실행 소요 시간
+    "rolled_up": {},        # 테이블별 합쳐서 만든 행 수
+    "deleted": {},          # 테이블별 삭제한 행 수
+    "freed_pages": 0,       # 반환한 빈 페이지 수
+    "tables": {},           # 테이블별 행 수/크기
+    "file_size": 0,         # 데이터베이스 파일 크기(바이트)
+}
+
+
+# 환경 변수에서 OHLC 보관 기간 읽기 (예: "1h=14,1d=730")
+def _load_ohlc_retention() -> Dict[str, float]:
+    retention = {name: float(days) for name, days in DEFAULT_OHLC_RETENTION_DAYS.items()}
+    raw = os.getenv("OHLC_RETENTION_DAYS", "")
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            retention[name.strip()] = max(float(value), 0.0)
+        except ValueError:
+            logger.warning(f"잘못된 OHLC 보관 기간 설정 무시: {item}")
+
+    return retention
+
+
+OHLC_RETENTION_DAYS = _load_ohlc_retention()
+
+
+# 구간 경계에 맞춘 기준 시각 (이 시각 이전 구간만 정리)
+def _cutoff(days: float, bucket_seconds: int, now: float) -> int:
+    cutoff = int(now - days * 86400)
+    return cutoff - cutoff % bucket_seconds
+
+
+# 조건에 맞는 행을 나누어 삭제
+def _delete_in_batches(conn, table: str, where: str, params: tuple) -> int:
+    deleted = 0
+    while True:
+        cursor = conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)",
+            params + (MAINTENANCE_BATCH_SIZE,)
+        )
+        conn.commit()
+        if cursor.rowcount <= 0:
+            return deleted
+        deleted += cursor.rowcount
+
+
+# 오래된 OHLC 캔들을 큰 간격으로 합친 뒤 삭제
+def compact_ohlc(now: Optional[float] = None) -> Dict[str, int]:
+    """
+    보관 기간이 지난 OHLC 캔들을 정리합니다.
+    합칠 대상이 있는 간격(1시간봉)은 먼저 일봉으로 합쳐 빠진 일봉을 채운 뒤 삭제합니다.
+    실시간으로 수집된 일봉이 이미 있으면 그대로 둡니다.
+
+    Args:
+        now (float, optional): 기준 시각 (epoch 초). 생략 시 현재 시각
+
+    Returns:
+        Dict[str, int]: {"rolled_up": 새로 만든 캔들 수, "deleted": 삭제한 캔들 수}
+    """
+    now = time.time() if now is None else now
+    conn = get_connection()
+    rolled_up = deleted = 0
+
+    for interval, days in OHLC_RETENTION_DAYS.items():
+        if days <= 0:
+            continue
+
+        target = OHLC_ROLLUP_TARGETS.get(interval)
+        cutoff = _cutoff(days, target[1] if target else 3600, now)
+
+        if target:
+            target_interval, target_seconds = target
+            changes = conn.total_changes
+            conn.execute(
+                f"""
+                WITH grouped AS (
+                    SELECT token_address, network, timestamp - timestamp % {target_seconds} AS bucket,
+                           MIN(timestamp) AS first_ts, MAX(timestamp) AS last_ts,
+                           MAX(high) AS high, MIN(low) AS low
+                    FROM token_ohlc
+                    WHERE interval = ? AND timestamp < ?
+                    GROUP BY token_address, network, bucket
+                )
+                INSERT OR IGNORE INTO token_ohlc (token_address, network, timestamp, open, high, low, close, volume, interval)
+                SELECT g.token_address, g.network, g.bucket, f.open, g.high, g.low, l.close, l.volume, ?
+                FROM grouped g
+                JOIN token_ohlc f ON f.token_address = g.token_address AND f.network = g.network
+                    AND f.interval = ? AND f.timestamp = g.first_ts
+                JOIN token_ohlc l ON l.token_address = g.token_address AND l.network = g.network
+                    AND l.interval = ? AND l.timestamp = g.last_ts
+                """,
+                (interval, cutoff, target_interval, interval, interval)
+            )
+            conn.commit()
+            rolled_up += conn.total_changes - changes  # WITH … INSERT는 rowcount를 제공하지 않음
+
+        deleted += _delete_in_batches(conn, "token_ohlc", "interval = ? AND timestamp < ?", (interval, cutoff))
+
+    conn.close()
+    return {"rolled_up": rolled_up, "deleted": deleted}
+
+
+# 오래된 페어 비율을 시간별로 합친 뒤 삭제
+def compact_pair_ratios(now: Optional[float] = None) -> Dict[str, int]:
+    """
+    보관 기간이 지난 페어 비율(1분 단위)을 시간별 요약(pair_ratio_hourly)으로 합친 뒤 삭제합니다.
+    시간별 요약도 보관 기간이 지나면 삭제합니다.
+
+    Args:
+        now (float, optional): 기준 시각 (epoch 초). 생략 시 현재 시각
+
+    Returns:
+        Dict[str, int]: {"rolled_up": 새로 만든 요약 수, "deleted": 삭제한 원본 수, "deleted_hourly": 삭제한 요약 수}
+    """
+    now = time.time() if now is None else now
+    conn = get_connection()
+    rolled_up = deleted = deleted_hourly = 0
+
+    if PAIR_RATIO_RETENTION_DAYS > 0:
+        cutoff = _cutoff(PAIR_RATIO_RETENTION_DAYS, 3600, now)
+        changes = conn.total_changes
+        conn.execute(
+            """
+            WITH grouped AS (
+                SELECT network, token_a_address, token_b_address, timestamp - timestamp % 3600 AS bucket,
+                       MIN(timestamp) AS first_ts, MAX(timestamp) AS last_ts,
+                       MAX(ratio) AS high, MIN(ratio) AS low, COUNT(*) AS samples
+                FROM pair_ratios
+                WHERE timestamp < ?
+                GROUP BY network, token_a_address, token_b_address, bucket
+            )
+            INSERT OR IGNORE INTO pair_ratio_hourly
+            (network, token_a_address, token_b_address, timestamp, open, high, low, close, samples)
+            SELECT g.network, g.token_a_address, g.token_b_address, g.bucket,
+                   (SELECT ratio FROM pair_ratios f WHERE f.network = g.network AND f.token_a_address = g.token_a_address
+                    AND f.token_b_address = g.token_b_address AND f.timestamp = g.first_ts),
+                   g.high, g.low,
+                   (SELECT ratio FROM pair_ratios l WHERE l.network = g.network AND l.token_a_address = g.token_a_address
+                    AND l.token_b_address = g.token_b_address AND l.timestamp = g.last_ts),
+                   g.samples
+            FROM grouped g
+            """,
+            (cutoff,)
+        )
+        conn.commit()
+        rolled_up = conn.total_changes - changes
+        deleted = _delete_in_batches(conn, "pair_ratios", "timestamp < ?", (cutoff,))
+
+    if PAIR_RATIO_HOURLY_RETENTION_DAYS > 0:
+        cutoff = _cutoff(PAIR_RATIO_HOURLY_RETENTION_DAYS, 3600, now)
+        deleted_hourly = _delete_in_batches(conn, "pair_ratio_hourly", "timestamp < ?", (cutoff,))
+
+    conn.close()
+    return {"rolled_up": rolled_up, "deleted": deleted, "deleted_hourly": deleted_hourly}
+
+
+# auto_vacuum을 INCREMENTAL로 전환 (일회성 작업)
+def enable_incremental_vacuum() -> bool:
+    """
+    auto_vacuum을 INCREMENTAL로 전환합니다. 전환에는 DB 전체를 다시 쓰는 VACUUM이 필요하므로
+    봇의 DB 실행기에서 실행하지 않고, 봇을 멈춘 상태에서 `python maintenance.py`로 한 번 실행합니다.
+
+    Returns:
+        bool: 이번에 전환했으면 True (이미 INCREMENTAL이면 False)
+    """
+    conn = get_connection()
+
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        logger.info("auto_vacuum을 INCREMENTAL로 전환합니다 (VACUUM 실행)")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+# 빈 페이지 반환 및 통계 갱신
+def compact_database() -> int:
+    """
+    삭제로 생긴 빈 페이지를 조금씩 파일 시스템에 반환하고(incremental_vacuum), 쿼리 플래너 통계를 갱신합니다.
+    auto_vacuum이 INCREMENTAL이 아니면 빈 페이지는 반환하지 않고 재사용만 합니다 (enable_incremental_vacuum 참고).
+
+    Returns:
+        int: 반환한 페이지 수
+    """
+    conn = get_connection()
+
+    before = after = 0
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+        after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    elif maintenance_stats["last_run"] is None:
+        # VACUUM은 실행하는 동안 모든 DB 작업(쓰기 큐, 리더 임대 갱신 포함)을 막으므로 자동으로 실행하지 않음
+        logger.warning("auto_vacuum이 INCREMENTAL이 아니어서 빈 페이지를 반환하지 않습니다. 봇을 멈추고 `python maintenance.py`를 한 번 실행하세요.")
+
+    conn.execute(f"PRAGMA analysis_limit = {ANALYZE_LIMIT}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    return max(before - after, 0)
+
+
+# 테이블별 행 수/크기
+def table_sizes() -> Dict[str, Dict[str, int]]:
+    """
+    테이블별 행 수와 차지하는 크기(바이트)를 반환합니다.
+    행 수는 COUNT(*)로 큰 테이블을 전부 읽지 않도록 ANALYZE가 기록한 sqlite_stat1의 추정치를 사용합니다.
+    dbstat 가상 테이블을 지원하지 않는 SQLite에서는 크기를 0으로 표시합니다.
+
+    Returns:
+        Dict[str, Dict[str, int]]: 테이블 이름 → {"rows": 추정 행 수 (통계가 없으면 -1), "bytes": 크기(인덱스 포함)}
+    """
+    conn = get_connection()
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    ).fetchall()]
+
+    sizes: Dict[str, int] = {}
+    try:
+        for name, table, size in conn.execute(
+            "SELECT d.name, m.tbl_name, SUM(d.pgsize) FROM dbstat d JOIN sqlite_master m ON m.name = d.name GROUP BY d.name"
+        ).fetchall():
+            sizes[table] = sizes.get(table, 0) + (size or 0)
+    except sqlite3.OperationalError:
+        pass
+
+    # sqlite_stat1의 stat 첫 번째 값이 행 수 (인덱스마다 기록되므로 가장 큰 값 사용, ANALYZE는 빈 테이블을 기록하지 않음)
+    rows: Optional[Dict[str, int]] = {}
+    try:
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1").fetchall():
+            rows[table] = max(rows.get(table, 0), int((stat or "0").split()[0]))
+    except (sqlite3.OperationalError, ValueError):
+        rows = None
+
+    result = {
+        table: {"rows": rows.get(table, 0) if rows is not None else -1, "bytes": sizes.get(table, 0)}
+        for table in tables
+    }
+    conn.close()
+    return result
+
+
+# 유지보수 작업 전체 실행
+def run_maintenance() -> Dict[str, Any]:
+    """
+    OHLC/페어 비율 정리, 빈 페이지 반환, 통계 갱신을 차례로 실행하고 결과를 기록합니다.
+
+    Returns:
+        Dict[str, Any]: 실행 결과 (maintenance_stats)
+    """
+    started = time.perf_counter()
+    now = time.time()
+
+    ohlc = compact_ohlc(now)
+    pairs = compact_pair_ratios(now)
+    freed_pages = compact_database()
+
+    conn = get_connection()
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    conn.close()
+
+    maintenance_stats.update({
+        "last_run": now,
+        "duration_ms": (time.perf_counter() - started) * 1000,
+        "rolled_up": {"token_ohlc": ohlc["rolled_up"], "pair_ratio_hourly": pairs["rolled_up"]},
+        "deleted": {
+            "token_ohlc": ohlc["deleted"],
+            "pair_ratios": pairs["deleted"],
+            "pair_ratio_hourly": pairs["deleted_hourly"],
+        },
+        "freed_pages": freed_pages,
+        "tables": table_sizes(),
+        "file_size": page_size * page_count,
+    })
+
+    logger.info(
+        f"DB 유지보수 완료 ({maintenance_stats['duration_ms']:.0f}ms): "
+        f"OHLC 합침 {ohlc['rolled_up']}/삭제 {ohlc['deleted']}, "
+        f"페어 비율 합침 {pairs['rolled_up']}/삭제 {pairs['deleted']}, 빈 페이지 {freed_pages}개 반환"
+    )
+    return maintenance_stats
+
+
+# 유지보수 작업
+async def maintenance_job():
+    """
+    DB 실행기 스레드에서 유지보수를 실행합니다.
+    """
+    await run_db(run_maintenance)
+
+
+# 유지보수 작업 등록
+def schedule_maintenance_job():
+    """
+    시작 후 DB_MAINTENANCE_INITIAL_DELAY초 뒤부터, 이전 실행이 끝난 뒤 DB_MAINTENANCE_INTERVAL마다
+    데이터베이스 유지보수를 실행하는 작업을 등록합니다.
+    """
+    # 시작 직후의 수집 작업과 겹치지 않도록 첫 실행을 늦춤
+    job_scheduler.add_job(
+        "db_maintenance", maintenance_job, MAINTENANCE_INTERVAL,
+        mode=FIXED_DELAY, initial_delay=MAINTENANCE_INITIAL_DELAY
+    )
+
+
+# 유지보수 상태 텍스트 생성 (텔레그램 메시지용)
+def format_maintenance_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 데이터베이스 크기와 유지보수 결과 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    stats = maintenance_stats
+
+    text = "\n🧹 <b>DB 유지보수</b>\n"
+    if stats["last_run"] is None:
+        return text + "아직 실행되지 않음\n"
+
+    minutes_ago = (time.time() - stats["last_run"]) / 60
+    text += (
+        f"파일 크기: <b>{stats['file_size'] / 1024 / 1024:.1f}MB</b>, "
+        f"{minutes_ago:.0f}분 전 실행 ({stats['duration_ms']:.0f}ms)\n"
+    )
+
+    for table, item in stats["tables"].items():
+        size = f", {item['bytes'] / 1024:.0f}KB" if item["bytes"] else ""
+        deleted = stats["deleted"].get(table, 0)
+        rows = f"약 {item['rows']:,}행" if item["rows"] >= 0 else "행 수 통계 없음"
+        text += f"• {table}: {rows}{size}" + (f" (삭제 {deleted:,})" if deleted else "") + "\n"
+
+    return text
+
+
+if __name__ == "__main__":
+    # 일회성: auto_vacuum 전환(VACUUM) 후 유지보수 1회 실행. 봇을 멈춘 상태에서 실행
+    logging.basicConfig(level=logging.INFO)
+    print(f"auto_vacuum 전환: {'완료' if enable_incremental_vacuum() else '이미 INCREMENTAL'}")
+    stats = run_maintenance()
+    print(f"유지보수 완료 ({stats['duration_ms']:.0f}ms), 파일 크기 {stats['file_size'] / 1024 / 1024:.1f}MB")
@@ -0,0 +1,390 @@
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from gecko_client import api_get, cache_response, GECKO_API_BASE
+from circuit_breaker import is_circuit_open, CircuitOpenError
+from models import Token
+from db import get_connection, run_db
+from adaptive_polling import adaptive_policy
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 네트워크 ID 매핑
+NETWORK_MAPPING = {
+    "ethereum": "eth",
+    "bsc": "bsc",
+    "polygon": "polygon_pos",
+    "arbitrum": "arbitrum",
+    "avalanche": "avax",
+    "optimism": "optimism",
+    "base": "base",
+    "solana": "solana"
+}
+
+# tokens/multi 요청 한 번에 조회할 최대 토큰 수
+MULTI_BATCH_SIZE = int(os.getenv("GECKO_MULTI_BATCH_SIZE", 30))
+
+# 신선도를 선언하지 않은 소비자의 가격 재사용 시간(초)
+SNAPSHOT_MAX_AGE = float(os.getenv("PRICE_SNAPSHOT_MAX_AGE", 45))
+
+
+# 토큰 모델을 가격 정보로 변환
+def token_price_info(token_address: str, token: Token) -> Dict[str, Any]:
+    """
+    Token 모델을 가격 정보 딕셔너리로 변환합니다.
+
+    Args:
+        token_address (str): 토큰 주소
+        token (Token): 파싱된 토큰
+
+    Returns:
+        Dict[str, Any]: 가격 정보 (price_tracker.get_token_price와 같은 형식)
+    """
+    return {
+        "success": True,
+        "name": token.name,
+        "symbol": token.symbol,
+        "price": token.price_usd,
+        "address": token_address,
+        "market_cap": token.market_cap,
+        "fdv": token.fdv,
+        "volume_24h": token.volume_usd_24h,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# 여러 토큰 가격 일괄 조회
+async def fetch_prices(assets: Iterable[Tuple[str, str]], unavailable: Optional[Set[str]] = None,
+                       max_age: Optional[float] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    (토큰 주소, 네트워크) 목록을 네트워크별로 묶어 tokens/multi 요청으로 한꺼번에 조회합니다.
+    조회된 토큰은 개별 토큰 URL의 응답으로도 캐시되어 /price 등의 명령어가 재사용합니다.
+    회로가 열린(장애 중인) 네트워크는 요청하지 않고 건너뜁니다.
+
+    Args:
+        assets (Iterable[Tuple[str, str]]): (토큰 주소, 네트워크) 목록
+        unavailable (Set[str], optional): 건너뛴 네트워크 ID를 기록할 집합
+        max_age (float, optional): 재사용할 tokens/multi 응답 캐시의 최대 경과 시간(초). 생략 시 엔드포인트 TTL
+
+    Returns:
+        Dict[Tuple[str, str], Dict[str, Any]]: (토큰 주소, 네트워크) → 가격 정보.
+            응답에 없는 토큰은 결과에서 빠집니다.
+    """
+    # 네트워크별로 주소 묶기 (중복 제거)
+    by_network: Dict[str, Dict[str, Tuple[str, str]]] = {}
+    for token_address, network in assets:
+        api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
+        by_network.setdefault(api_network, {})[token_address.lower()] = (token_address, network)
+
+    results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for api_network, tokens in by_network.items():
+        if is_circuit_open(api_network, "multi"):
+            logger.warning(f"{api_network} 네트워크 회로 차단 중: 가격 수집 건너뜀 ({len(tokens)}개 토큰)")
+            if unavailable is not None:
+                unavailable.add(api_network)
+            continue
+
+        addresses = list(tokens)
+
+        for start in range(0, len(addresses), MULTI_BATCH_SIZE):
+            chunk = addresses[start:start + MULTI_BATCH_SIZE]
+            originals = [tokens[address][0] for address in chunk]
+            url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/multi/{','.join(originals)}"
+
+            try:
+                response = await api_get(url, max_age=max_age)
+
+                if response.status_code != 200:
+                    logger.error(f"다중 토큰 가격 조회 실패 ({api_network}, {len(chunk)}개): 상태 코드 {response.status_code}")
+                    continue
+
+                for resource in response.json().get('data') or []:
+                    token = Token(resource.get('attributes') or {})
+                    address = token.address.lower()
+
+                    if address not in tokens:
+                        continue
+
+                    token_address, network = tokens[address]
+                    results[(token_address, network)] = token_price_info(token_address, token)
+
+                    # 개별 토큰 조회 응답으로도 캐시
+                    cache_response(f"/networks/{api_network}/tokens/{token_address}", {"data": resource})
+
+            except CircuitOpenError as e:
+                # 수집 도중 회로가 열리면 이 네트워크의 남은 묶음은 건너뜀
+                logger.warning(f"다중 토큰 가격 조회 중단: {str(e)}")
+                if unavailable is not None:
+                    unavailable.add(api_network)
+                break
+            except Exception as e:
+                logger.error(f"다중 토큰 가격 조회 오류 ({api_network}): {str(e)}")
+
+    return results
+
+
+# 가격을 추적 중인 모든 자산 목록 가져오기
+def get_tracked_assets() -> List[Tuple[str, str]]:
+    """
+    가격 알림, OHLC, 페어, 돌파 추적에서 사용하는 모든 (토큰 주소, 네트워크) 목록을 가져옵니다.
+
+    Returns:
+        List[Tuple[str, str]]: 중복이 제거된 (토큰 주소, 네트워크) 목록
+    """
+    queries = [
+        "SELECT token_address, network FROM tracked_assets",
+        "SELECT token_a_address, network FROM token_pairs",
+        "SELECT token_b_address, network FROM token_pairs",
+        "SELECT token_address, network FROM potential_tokens WHERE breakout_detected = 0",
+    ]
+
+    assets = set()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    for query in queries:
+        try:
+            cursor.execute(query)
+            assets.update((token, network) for token, network in cursor.fetchall() if token and network)
+        except sqlite3.OperationalError:
+            # 아직 생성되지 않은 테이블은 건너뜀
+            continue
+
+    conn.close()
+    return sorted(assets)
+
+
+class PriceSnapshot:
+    """
+    한 번의 수집 주기에서 조회한 가격 정보 묶음입니다.
+    """
+
+    def __init__(self, prices: Dict[Tuple[str, str], Dict[str, Any]], requested: int,
+                 unavailable: Optional[Set[str]] = None, stale: Optional[Dict[Tuple[str, str], float]] = None):
+        self.prices = prices
+        self.requested = requested
+        self.unavailable = unavailable or set()  # 회로 차단으로 건너뛴 네트워크 ID
+        self.stale = stale or {}  # 갱신에 실패해 신선도를 넘긴 자산 → 마지막 조회 후 경과 시간(초)
+        self.taken_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def get(self, token_address: str, network: str) -> Dict[str, Any]:
+        """
+        토큰의 가격 정보를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 가격 정보. 스냅샷에 없거나 오래된 가격만 남아 있으면 success=False
+        """
+        price_info = self.prices.get((token_address, network))
+        if price_info is None:
+            if self.is_unavailable(network):
+                return {"success": False, "error": f"{network} 네트워크 API 장애로 일시적으로 조회를 건너뜁니다."}
+            if (token_address, network) in self.stale:
+                age = self.stale[(token_address, network)]
+                return {"success": False, "error": f"가격 갱신에 실패했습니다 (마지막 조회 {age:.0f}초 전 가격은 사용하지 않음)."}
+            return {"success": False, "error": "가격 스냅샷에 토큰 정보가 없습니다."}
+        return price_info
+
+    def is_unavailable(self, network: str) -> bool:
+        """
+        네트워크가 회로 차단으로 이번 주기에서 제외되었는지 확인합니다.
+        """
+        return NETWORK_MAPPING.get(network.lower(), network.lower()) in self.unavailable
+
+
+# 소비자별 필요한 가격 신선도(초). 이보다 오래된 가격만 새로 조회
+DEFAULT_CONSUMER_FRESHNESS = {
+    "price_alert": 60,    # 가격 변동 알림 (check_price_changes)
+    "ohlc": 120,          # OHLC 수집 및 알림 (collect_ohlc_data_and_check_alerts)
+    "pair_alert": 60,     # 페어 비율 알림 (check_pair_alerts)
+    "pair_summary": 120,  # 페어 주기적 알림 (send_periodic_alerts)
+    "breakout": 300,      # 돌파 후보 추적 (track_potential_breakout_tokens)
+}
+
+# 이 시간(초)보다 오래 조회되지 않은 자산은 메모리에서 제거
+MARKET_DATA_RETENTION = float(os.getenv("MARKET_DATA_RETENTION", 3600))
+
+
+# 환경 변수에서 소비자별 신선도 읽기 (예: "price_alert=30,ohlc=60")
+def _load_freshness() -> Dict[str, float]:
+    freshness = {name: float(value) for name, value in DEFAULT_CONSUMER_FRESHNESS.items()}
+    raw = os.getenv("MARKET_DATA_FRESHNESS", "")
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            freshness[name.strip()] = max(float(value), 0.0)
+        except ValueError:
+            logger.warning(f"잘못된 가격 신선도 설정 무시: {item}")
+
+    return freshness
+
+
+class MarketDataService:
+    """
+    (네트워크, 토큰 주소)별 최신 가격을 보관하는 중앙 시장 데이터 서비스입니다.
+    소비자마다 필요한 신선도를 선언하고, 요청한 자산 중 오래된 것만 tokens/multi로 다시 조회합니다.
+    """
+
+    def __init__(self, freshness: Dict[str, float], default_max_age: float):
+        self.freshness = freshness
+        self.default_max_age = default_max_age
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+        # 통계 (소비자별)
+        self.reused: Dict[str, int] = {}
+        self.refreshed: Dict[str, int] = {}
+
+    def max_age_for(self, consumer: str) -> float:
+        return self.freshness.get(consumer, self.default_max_age)
+
+    @staticmethod
+    def _key(token_address: str, network: str) -> Tuple[str, str]:
+        return NETWORK_MAPPING.get(network.lower(), network.lower()), token_address.lower()
+
+    def _is_stale(self, asset: Tuple[str, str], now: float, max_age: float) -> bool:
+        entry = self._entries.get(self._key(*asset))
+        return entry is None or now - entry[0] > max_age
+
+    def _prune(self, now: float):
+        expired = [key for key, (fetched_at, _) in self._entries.items() if now - fetched_at > MARKET_DATA_RETENTION]
+        for key in expired:
+            del self._entries[key]
+
+    async def snapshot(self, consumer: str, assets: Optional[Iterable[Tuple[str, str]]] = None,
+                       max_age: Optional[float] = None) -> PriceSnapshot:
+        """
+        소비자가 요청한 자산의 가격 스냅샷을 반환합니다.
+
+        Args:
+            consumer (str): 소비자 이름 (DEFAULT_CONSUMER_FRESHNESS 참고)
+            assets (Iterable[Tuple[str, str]], optional): (토큰 주소, 네트워크) 목록. 생략 시 추적 중인 모든 자산
+            max_age (float, optional): 허용할 최대 경과 시간(초). 생략 시 소비자 신선도 사용
+
+        Returns:
+            PriceSnapshot: 요청한 자산의 가격 스냅샷
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        max_age = self.max_age_for(consumer) if max_age is None else max_age
+        requested = sorted(set(await run_db(get_tracked_assets) if assets is None else assets))
+
+        # 동시에 호출한 소비자는 앞선 조회 결과를 재사용
+        async with self._lock:
+            now = time.monotonic()
+            stale = [asset for asset in requested if self._is_stale(asset, now, max_age)]
+
+            unavailable: Set[str] = set()
+            if stale:
+                # 자산별 신선도는 이 서비스가 판단하므로 응답 캐시는 쓰지 않음
+                # (캐시된 응답을 새 가격으로 기록하면 오래된 가격이 신선하게 보이고 변동성 표본이 중복됨)
+                prices = await fetch_prices(stale, unavailable, max_age=0)
+                fetched_at = time.monotonic()
+                for (token_address, network), price_info in prices.items():
+                    self._entries[self._key(token_address, network)] = (fetched_at, price_info)
+                    # 새로 조회한 가격만 변동성 추정에 반영
+                    adaptive_policy.observe(token_address, network, price_info.get("price"), fetched_at)
+                self._prune(fetched_at)
+
+            # 신선도 안의 가격만 반환 (조회 실패나 회로 차단으로 갱신하지 못한 오래된 가격은 현재 가격으로 쓰지 않음)
+            now = time.monotonic()
+            snapshot_prices = {}
+            stale_prices = {}
+            for token_address, network in requested:
+                entry = self._entries.get(self._key(token_address, network))
+                if entry is None:
+                    continue
+                if now - entry[0] <= max_age:
+                    snapshot_prices[(token_address, network)] = dict(entry[1], address=token_address)
+                else:
+                    stale_prices[(token_address, network)] = now - entry[0]
+
+        self.reused[consumer] = self.reused.get(consumer, 0) + len(requested) - len(stale)
+        self.refreshed[consumer] = self.refreshed.get(consumer, 0) + len(stale)
+
+        if stale:
+            logger.info(
+                f"가격 스냅샷 갱신 ({consumer}): {len(stale)}/{len(requested)}개 조회, "
+                f"{len(requested) - len(stale)}개 재사용"
+            )
+
+        if stale_prices:
+            logger.warning(f"가격 스냅샷 ({consumer}): {len(stale_prices)}개 자산은 갱신 실패로 오래된 가격을 제외")
+
+        return PriceSnapshot(snapshot_prices, len(requested), unavailable, stale_prices)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        서비스 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 보관 중인 자산 수, 소비자별 재사용/조회 수
+        """
+        consumers = {}
+        for name in sorted(set(self.reused) | set(self.refreshed)):
+            reused = self.reused.get(name, 0)
+            refreshed = self.refreshed.get(name, 0)
+            consumers[name] = {
+                "max_age": self.max_age_for(name),
+                "reused": reused,
+                "refreshed": refreshed,
+                "reuse_rate": reused / (reused + refreshed) if reused + refreshed else 0.0,
+            }
+
+        return {"assets": len(self._entries), "consumers": consumers}
+
+
+# 프로세스 전역 시장 데이터 서비스
+market_data_service = MarketDataService(freshness=_load_freshness(), default_max_age=SNAPSHOT_MAX_AGE)
+
+
+# 소비자별 가격 스냅샷 가져오기
+async def get_price_snapshot(consumer: str = "default", assets: Optional[Iterable[Tuple[str, str]]] = None,
+                             max_age: Optional[float] = None) -> PriceSnapshot:
+    """
+    시장 데이터 서비스에서 가격 스냅샷을 가져옵니다.
+    다른 소비자가 최근에 조회한 자산은 다시 요청하지 않고, 신선도가 지난 자산만 tokens/multi로 조회합니다.
+
+    Args:
+        consumer (str, optional): 소비자 이름 (신선도 결정)
+        assets (Iterable[Tuple[str, str]], optional): (토큰 주소, 네트워크) 목록. 생략 시 추적 중인 모든 자산
+        max_age (float, optional): 허용할 최대 경과 시간(초). 생략 시 소비자 신선도 사용
+
+    Returns:
+        PriceSnapshot: 가격 스냅샷
+    """
+    return await market_data_service.snapshot(consumer, assets, max_age)
+
+
+# 시장 데이터 서비스 상태 텍스트 생성 (텔레그램 메시지용)
+def format_market_data_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 시장 데이터 서비스 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    stats = market_data_service.stats()
+
+    text = f"\n💹 <b>시장 데이터</b>\n보관 중인 자산: <b>{stats['assets']}</b>개\n"
+    for name, item in stats["consumers"].items():
+        text += (
+            f"• {name} ({item['max_age']:.0f}초): 재사용 {item['reused']} / 조회 {item['refreshed']} "
+            f"({item['reuse_rate'] * 100:.0f}%)\n"
+        )
+
+    return text
@@ -1,10 +1,17 @@
+import os
 import logging
 import asyncio
 import sqlite3
-import requests
 from datetime import datetime, timedelta
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+from gecko_client import api_get, GECKO_API_BASE
+from market_data import get_price_snapshot
+from circuit_breaker import is_circuit_open
+from models import parse_token, parse_token_infos
+from db import get_connection, run_db
+from job_scheduler import job_scheduler
+from workers import owns, shard_filter
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +41,10 @@ SUPPORTED_NETWORKS = {
     "solana": "솔라나 (SOL)"
 }
 
+# 작업 실행 간격(초)
+MARKET_SCAN_INTERVAL = int(os.getenv("MARKET_SCAN_INTERVAL", 3 * 3600))  # 새 토큰 스캔
+BREAKOUT_TRACK_INTERVAL = int(os.getenv("BREAKOUT_TRACK_INTERVAL", 30 * 60))  # 잠재적 토큰 돌파 확인
+
 # 스캔할 주요 네트워크 목록
 SCAN_NETWORKS = [
     "solana",      # 솔라나 (현재 가장 활발)
@@ -45,7 +56,7 @@ def init_db():
     """
     시장 스캔 관련 데이터베이스 테이블을 초기화합니다.
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     # 잠재적 토큰 테이블 생성
@@ -76,32 +87,6 @@ def init_db():
     conn.close()
     logger.info("시장 스캔 데이터베이스 초기화 완료")
 
-# API 요청 사이에 지연 시간을 추가하는 함수
-async def rate_limited_request(url, headers=None, params=None):
-    max_retries = 5
-    retry_delay = 3
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            
-            # 성공적인 응답이면 바로 반환
-            if response.status_code != 429:
-                return response
-            
-            # 429 오류(Rate Limit)인 경우 지연 후 재시도
-            logger.warning(f"API 요청 제한 도달 (429). {retry_delay}초 후 재시도 ({attempt+1}/{max_retries})...")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2  # 지수 백오프 적용
-            
-        except Exception as e:
-            logger.error(f"API 요청 중 오류: {str(e)}")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2
-    
-    # 모든 재시도 실패 시 마지막 응답 반환
-    return response
-
 # 최근 업데이트된 토큰 목록 가져오기
 async def get_recently_updated_tokens(network: str) -> List[Dict[str, Any]]:
     """
@@ -115,42 +100,36 @@ async def get_recently_updated_tokens(network: str) -> List[Dict[str, Any]]:
     """
     try:
         # API 엔드포인트 구성
-        url = "https://api.geckoterminal.com/api/v2/tokens/info_recently_updated"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/tokens/info_recently_updated"
         params = {"network": network}
         
         logger.info(f"{network} 네트워크의 최근 업데이트된 토큰 목록 조회 중...")
         
         # 요청 보내기
-        response = await rate_limited_request(url, headers=headers, params=params)
+        response = await api_get(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
             
             if 'data' in data:
-                tokens = []
-                
-                for token_data in data['data']:
-                    if 'attributes' in token_data:
-                        attrs = token_data['attributes']
-                        
-                        token_info = {
-                            "address": attrs.get('address'),
-                            "name": attrs.get('name', '알 수 없음'),
-                            "symbol": attrs.get('symbol', '???'),
-                            "decimals": attrs.get('decimals', 0),
-                            "image_url": attrs.get('image_url'),
-                            "coingecko_coin_id": attrs.get('coingecko_coin_id'),
-                            "websites": attrs.get('websites', []),
-                            "discord_url": attrs.get('discord_url'),
-                            "telegram_handle": attrs.get('telegram_handle'),
-                            "twitter_handle": attrs.get('twitter_handle'),
-                            "description": attrs.get('description', ''),
-                            "gt_score": attrs.get('gt_score'),
-                            "network": network
-                        }
-                        
-                        tokens.append(token_info)
+                tokens = [
+                    {
+                        "address": info.address,
+                        "name": info.name,
+                        "symbol": info.symbol,
+                        "decimals": info.decimals,
+                        "image_url": info.image_url,
+                        "coingecko_coin_id": info.coingecko_coin_id,
+                        "websites": info.websites,
+                        "discord_url": info.discord_url,
+                        "telegram_handle": info.telegram_handle,
+                        "twitter_handle": info.twitter_handle,
+                        "description": info.description,
+                        "gt_score": info.gt_score,
+                        "network": network
+                    }
+                    for info in parse_token_infos(data)
+                ]
                 
                 logger.info(f"{network} 네트워크에서 {len(tokens)}개의 토큰을 찾았습니다.")
                 return tokens
@@ -182,30 +161,24 @@ async def get_token_market_cap(token_address: str, network: str) -> Dict[str, An
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"토큰 시가총액 조회: {token_address} ({network})")
         
         # 요청 보내기
-        response = await rate_limited_request(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
+            token = parse_token(data)
             
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
-                # 시가총액 정보 추출
-                market_cap = float(attrs.get('fdv_usd') or attrs.get('market_cap_usd') or 0)
-                price = float(attrs.get('price_usd') or 0)
-                
+            if token is not None:
                 return {
                     "success": True,
-                    "market_cap": market_cap,
-                    "price": price,
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???')
+                    "market_cap": token.fdv,
+                    "price": token.price_usd,
+                    "name": token.name,
+                    "symbol": token.symbol
                 }
             else:
                 logger.error(f"API 응답에 필요한 데이터가 없습니다: {data}")
@@ -227,24 +200,38 @@ async def scan_market_for_new_tokens():
     
     all_tokens = []
     
-    # 선별된 네트워크만 스캔
-    for network in SCAN_NETWORKS:
-        try:
-            tokens = await get_recently_updated_tokens(network)
-            all_tokens.extend(tokens)
-            
-            # API 요청 사이에 지연 시간 추가
-            await asyncio.sleep(2)
-            
-        except Exception as e:
-            logger.error(f"{network} 네트워크 스캔 중 오류: {str(e)}")
+    # 다중 프로세스 모드에서는 담당 네트워크만 스캔
+    scan_networks = [network for network in SCAN_NETWORKS if owns(network)]
+    
+    # 회로가 열린(장애 중인) 네트워크는 이번 스캔에서 제외
+    networks = [network for network in scan_networks if not is_circuit_open(network, "recently_updated")]
+    for network in set(scan_networks) - set(networks):
+        logger.warning(f"{network} 네트워크 회로 차단 중: 스캔 건너뜀")
+    
+    # 선별된 네트워크를 동시에 스캔 (동시 요청 수와 예산은 gecko_client가 조절)
+    scan_results = await asyncio.gather(
+        *(get_recently_updated_tokens(network) for network in networks),
+        return_exceptions=True
+    )
+    
+    for network, tokens in zip(networks, scan_results):
+        if isinstance(tokens, Exception):
+            logger.error(f"{network} 네트워크 스캔 중 오류: {str(tokens)}")
+            continue
+        all_tokens.extend(tokens)
     
     # 시가총액 필터링 및 저장 로직
     potential_tokens = []
     
-    for token in all_tokens:
+    market_caps = await asyncio.gather(
+        *(get_token_market_cap(token["address"], token["network"]) for token in all_tokens),
+        return_exceptions=True
+    )
+    
+    for token, market_cap in zip(all_tokens, market_caps):
         try:
-            market_cap = await get_token_market_cap(token["address"], token["network"])
+            if isinstance(market_cap, Exception):
+                raise market_cap
             
             # 80만~100만 달러 범위의 토큰만 선택
             if 800000 <= market_cap["market_cap"] <= 1000000:
@@ -265,6 +252,48 @@ async def scan_market_for_new_tokens():
     else:
         logger.info("조건에 맞는 새로운 토큰을 찾지 못했습니다.")
 
+# 돌파 여부를 확인할 잠재적 토큰 목록
+def get_breakout_candidates() -> List[Tuple[str, str, str, str]]:
+    """
+    아직 돌파가 감지되지 않은 잠재적 토큰 목록을 가져옵니다.
+    
+    Returns:
+        List[Tuple[str, str, str, str]]: (token_address, network, name, symbol) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT token_address, network, name, symbol FROM potential_tokens WHERE breakout_detected = 0"
+    )
+    candidates = cursor.fetchall()
+    conn.close()
+    return candidates
+
+# 잠재적 토큰의 시가총액/가격과 돌파 상태 기록
+def update_potential_tokens(updates: List[Tuple[float, float, bool, str, str]]):
+    """
+    추적 결과를 한 트랜잭션으로 기록합니다.
+    
+    Args:
+        updates (List[Tuple[float, float, bool, str, str]]): (market_cap, price, 돌파 여부, token_address, network) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    now = datetime.now()
+    
+    cursor.executemany(
+        """
+        UPDATE potential_tokens 
+        SET market_cap = ?, price = ?, last_updated = ?, breakout_detected = MAX(breakout_detected, ?)
+        WHERE token_address = ? AND network = ?
+        """,
+        [(market_cap, price, now, int(breakout), token_address, network)
+         for market_cap, price, breakout, token_address, network in updates]
+    )
+    
+    conn.commit()
+    conn.close()
+
 # 잠재적 돌파 토큰 추적 함수
 async def track_potential_breakout_tokens():
     """
@@ -272,59 +301,39 @@ async def track_potential_breakout_tokens():
     """
     logger.info("잠재적 돌파 토큰 추적 시작...")
     
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
-    
     # 아직 돌파가 감지되지 않은 토큰 가져오기
-    cursor.execute(
-        "SELECT token_address, network, name, symbol FROM potential_tokens WHERE breakout_detected = 0"
-    )
-    potential_tokens = cursor.fetchall()
+    potential_tokens = shard_filter(await run_db(get_breakout_candidates), lambda token: token[1], lambda token: token[0])
     
     if not potential_tokens:
         logger.info("추적할 잠재적 토큰이 없습니다.")
-        conn.close()
         return
     
     logger.info(f"{len(potential_tokens)}개의 잠재적 토큰을 추적합니다.")
     
     breakout_tokens = []
+    updates = []
+    
+    # 추적 중인 토큰 가격을 시장 데이터 서비스에서 조회 (오래된 가격만 tokens/multi로 갱신)
+    snapshot = await get_price_snapshot("breakout", [(token, network) for token, network, _, _ in potential_tokens])
     
     for token_address, network, name, symbol in potential_tokens:
         try:
-            # 토큰의 현재 시가총액 조회
-            market_cap_info = await get_token_market_cap(token_address, network)
+            # 스냅샷에서 토큰의 현재 시가총액 조회
+            market_cap_info = snapshot.get(token_address, network)
             
             if not market_cap_info.get('success', False):
                 continue
             
-            market_cap = market_cap_info.get('market_cap', 0)
+            market_cap = market_cap_info.get('fdv', 0)
             price = market_cap_info.get('price', 0)
             
-            # 데이터베이스 업데이트
-            cursor.execute(
-                """
-                UPDATE potential_tokens 
-                SET market_cap = ?, price = ?, last_updated = ?
-                WHERE token_address = ? AND network = ?
-                """,
-                (market_cap, price, datetime.now(), token_address, network)
-            )
-            
             # 1백만 달러 돌파 확인
-            if market_cap > 1000000:
+            breakout = market_cap > 1000000
+            updates.append((market_cap, price, breakout, token_address, network))
+            
+            if breakout:
                 logger.info(f"돌파 토큰 발견: {name} ({symbol}), 시가총액: ${market_cap:,.2f}")
                 
-                # 돌파 상태 업데이트
-                cursor.execute(
-                    """
-                    UPDATE potential_tokens 
-                    SET breakout_detected = 1
-                    WHERE token_address = ? AND network = ?
-                    """,
-                    (token_address, network)
-                )
-                
                 breakout_tokens.append({
                     "token_address": token_address,
                     "network": network,
@@ -334,14 +343,12 @@ async def track_potential_breakout_tokens():
                     "price": price
                 })
             
-            # 토큰 간 지연 시간 추가
-            await asyncio.sleep(1)
-            
         except Exception as e:
             logger.error(f"토큰 {token_address} ({network}) 추적 중 오류: {str(e)}")
     
-    conn.commit()
-    conn.close()
+    # 데이터베이스 업데이트 (돌파 상태 포함)
+    if updates:
+        await run_db(update_potential_tokens, updates)
     
     # 돌파 토큰이 있으면 알림 전송
     if breakout_tokens:
@@ -349,6 +356,21 @@ async def track_potential_breakout_tokens():
     
     logger.info("잠재적 돌파 토큰 추적 완료")
 
+# 돌파 알림을 받을 사용자 목록
+def get_breakout_alert_users() -> List[Tuple[int]]:
+    """
+    돌파 알림이 활성화된 사용자 목록을 가져옵니다.
+    
+    Returns:
+        List[Tuple[int]]: (user_id,) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id FROM breakout_alerts WHERE enabled = 1")
+    users = cursor.fetchall()
+    conn.close()
+    return users
+
 # 돌파 알림 전송 함수
 async def send_breakout_alerts(breakout_tokens: List[Dict[str, Any]]):
     """
@@ -359,12 +381,7 @@ async def send_breakout_alerts(breakout_tokens: List[Dict[str, Any]]):
     """
     try:
         # 알림 설정이 활성화된 사용자 가져오기
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT user_id FROM breakout_alerts WHERE enabled = 1")
-        users = cursor.fetchall()
-        conn.close()
+        users = await run_db(get_breakout_alert_users)
         
         if not users:
             logger.info("알림을 받을 사용자가 없습니다.")
@@ -412,7 +429,7 @@ def enable_breakout_alerts(user_id: int) -> bool:
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -442,7 +459,7 @@ def disable_breakout_alerts(user_id: int) -> bool:
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -472,7 +489,7 @@ def get_breakout_alerts_status(user_id: int) -> bool:
         bool: 활성화 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -504,7 +521,7 @@ def get_recent_breakout_tokens(limit: int = 10) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: 돌파 토큰 목록
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하도록 설정
         cursor = conn.cursor()
         
@@ -532,6 +549,35 @@ def get_recent_breakout_tokens(limit: int = 10) -> List[Dict[str, Any]]:
         logger.error(f"최근 돌파 토큰 목록 가져오기 중 오류: {str(e)}")
         return []
 
+# 추적 중인 잠재적 토큰 목록 가져오기
+def get_potential_tokens(limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    아직 돌파하지 않은 잠재적 토큰을 시가총액이 큰 순서로 가져옵니다.
+    
+    Args:
+        limit (int, optional): 가져올 토큰 수. 기본값은 10
+        
+    Returns:
+        List[Dict[str, Any]]: 잠재적 토큰 목록
+    """
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하도록 설정
+    cursor = conn.cursor()
+    
+    cursor.execute(
+        """
+        SELECT * FROM potential_tokens 
+        WHERE breakout_detected = 0
+        ORDER BY market_cap DESC
+        LIMIT ?
+        """,
+        (limit,)
+    )
+    
+    tokens = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return tokens
+
 # 잠재적 토큰 저장 함수 추가
 async def save_potential_tokens(tokens: List[Dict[str, Any]]):
     """
@@ -543,7 +589,17 @@ async def save_potential_tokens(tokens: List[Dict[str, Any]]):
     if not tokens:
         return
     
-    conn = sqlite3.connect('tokens.db')
+    await run_db(store_potential_tokens, tokens)
+
+# 잠재적 토큰 목록 기록 (DB 실행기 스레드에서 실행)
+def store_potential_tokens(tokens: List[Dict[str, Any]]):
+    """
+    잠재적 토큰을 추가하거나, 이미 있으면 시가총액과 가격을 갱신합니다.
+    
+    Args:
+        tokens (List[Dict[str, Any]]): 저장할 토큰 목록
+    """
+    conn = get_connection()
     cursor = conn.cursor()
     current_time = datetime.now()
     
@@ -599,27 +655,16 @@ async def save_potential_tokens(tokens: List[Dict[str, Any]]):
     conn.close()
     logger.info(f"{len(tokens)}개의 잠재적 토큰을 데이터베이스에 저장했습니다.")
 
-# 스케줄러 함수
-async def market_scanner_scheduler():
+# 스케줄러 작업 등록
+def schedule_market_scanner_jobs():
     """
-    시장 스캔 및 토큰 추적 스케줄러
+    시장 스캔(MARKET_SCAN_INTERVAL)과 잠재적 돌파 토큰 추적(BREAKOUT_TRACK_INTERVAL) 작업을 등록합니다.
+    두 작업의 API 요청은 시장 스캔 예산으로 집계됩니다.
     """
-    # 데이터베이스 초기화
-    init_db()
-    
-    while True:
-        try:
-            # 3시간마다 시장 스캔
-            await scan_market_for_new_tokens()
-            
-            # 30분마다 잠재적 돌파 토큰 추적 (6번 반복)
-            for _ in range(6):
-                await track_potential_breakout_tokens()
-                await asyncio.sleep(30 * 60)  # 30분 대기
-            
-        except Exception as e:
-            logger.error(f"스케줄러 실행 중 오류: {str(e)}")
-            await asyncio.sleep(5 * 60)  # 오류 발생 시 5분 대기 후 재시도
+    job_scheduler.add_job("market_scan", scan_market_for_new_tokens, MARKET_SCAN_INTERVAL, subsystem="market_scanner")
+    job_scheduler.add_job(
+        "breakout_tracking", track_potential_breakout_tokens, BREAKOUT_TRACK_INTERVAL, subsystem="market_scanner"
+    )
 
 # 메인 함수 (테스트용)
 async def main():
@@ -0,0 +1,289 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+# 선택적 고속 JSON 파서 (설치되어 있지 않으면 표준 json 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+# JSON 디코딩
+def loads(content: bytes) -> Any:
+    """
+    응답 본문을 디코딩합니다. orjson이 설치되어 있으면 orjson을 사용합니다.
+
+    Args:
+        content (bytes): JSON 바이트열
+
+    Returns:
+        Any: 디코딩된 객체
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+# 숫자 변환 (None, "null", 잘못된 값은 기본값)
+def to_float(value: Any, default: float = 0.0) -> float:
+    if value is None or value == "null" or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_int(value: Any, default: int = 0) -> int:
+    if value is None or value == "null" or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# 응답의 data 항목 꺼내기
+def _resources(payload: Any) -> List[Dict[str, Any]]:
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)]
+    if isinstance(data, dict):
+        return [data]
+    return []
+
+
+def _attributes(resource: Dict[str, Any]) -> Dict[str, Any]:
+    return resource.get("attributes") or {}
+
+
+class Token:
+    """
+    /tokens/{addr}, /tokens/multi 응답의 토큰 하나입니다.
+    """
+
+    __slots__ = (
+        "address", "name", "symbol", "decimals", "price_usd", "fdv_usd", "market_cap_usd",
+        "total_supply", "circulating_supply", "total_reserve_in_usd", "volume_usd_24h",
+        "price_change_percentage", "coingecko_coin_id", "created_at",
+    )
+
+    def __init__(self, attrs: Dict[str, Any]):
+        volume = attrs.get("volume_usd")
+
+        self.address = attrs.get("address") or ""
+        self.name = attrs.get("name") or "알 수 없음"
+        self.symbol = attrs.get("symbol") or "???"
+        self.decimals = to_int(attrs.get("decimals"))
+        self.price_usd = to_float(attrs.get("price_usd"))
+        self.fdv_usd = to_float(attrs.get("fdv_usd"))
+        self.market_cap_usd = to_float(attrs.get("market_cap_usd"))
+        self.total_supply = to_float(attrs.get("total_supply"))
+        self.circulating_supply = to_float(attrs.get("circulating_supply"))
+        self.total_reserve_in_usd = to_float(attrs.get("total_reserve_in_usd"))
+        self.volume_usd_24h = to_float(volume.get("h24") if isinstance(volume, dict) else attrs.get("volume_usd_24h"))
+        self.price_change_percentage = attrs.get("price_change_percentage") or {}
+        self.coingecko_coin_id = attrs.get("coingecko_coin_id")
+        self.created_at = attrs.get("pool_created_at") or attrs.get("created_at")
+
+    @property
+    def market_cap(self) -> float:
+        # 시가총액이 없으면 완전 희석 가치로 대체
+        return self.market_cap_usd or self.fdv_usd
+
+    @property
+    def fdv(self) -> float:
+        # 완전 희석 가치가 없으면 시가총액으로 대체
+        return self.fdv_usd or self.market_cap_usd
+
+    @property
+    def price_change_24h(self) -> float:
+        return to_float(self.price_change_percentage.get("h24"))
+
+
+class TokenInfo:
+    """
+    /tokens/{addr}/info, /tokens/info_recently_updated 응답의 토큰 메타데이터입니다.
+    """
+
+    __slots__ = (
+        "address", "name", "symbol", "decimals", "image_url", "coingecko_coin_id", "websites",
+        "description", "discord_url", "telegram_handle", "twitter_handle", "categories", "gt_score",
+    )
+
+    def __init__(self, attrs: Dict[str, Any]):
+        self.address = attrs.get("address")
+        self.name = attrs.get("name") or "알 수 없음"
+        self.symbol = attrs.get("symbol") or "???"
+        self.decimals = to_int(attrs.get("decimals"))
+        self.image_url = attrs.get("image_url")
+        self.coingecko_coin_id = attrs.get("coingecko_coin_id")
+        self.websites = attrs.get("websites") or []
+        self.description = attrs.get("description") or ""
+        self.discord_url = attrs.get("discord_url")
+        self.telegram_handle = attrs.get("telegram_handle")
+        self.twitter_handle = attrs.get("twitter_handle")
+        self.categories = attrs.get("categories") or []
+        self.gt_score = to_float(attrs.get("gt_score"))
+
+
+class Pool:
+    """
+    /tokens/{addr}/pools 응답의 유동성 풀 하나입니다.
+    """
+
+    __slots__ = (
+        "address", "name", "dex_id", "reserve_in_usd", "volume_usd", "transactions",
+        "price_change_24h", "created_at",
+    )
+
+    def __init__(self, resource: Dict[str, Any]):
+        attrs = _attributes(resource)
+        dex = ((resource.get("relationships") or {}).get("dex") or {}).get("data") or {}
+        price_change = attrs.get("price_change_percentage")
+
+        self.address = attrs.get("address") or "알 수 없음"
+        self.name = attrs.get("name") or "알 수 없음"
+        self.dex_id = attrs.get("dex_id") or dex.get("id") or attrs.get("dex_name")
+        self.reserve_in_usd = to_float(attrs.get("reserve_in_usd"))
+        self.volume_usd = attrs.get("volume_usd") if isinstance(attrs.get("volume_usd"), dict) else {}
+        self.transactions = attrs.get("transactions") or {}
+        self.price_change_24h = to_float(
+            price_change.get("h24") if isinstance(price_change, dict) else attrs.get("price_change_percentage_24h")
+        )
+        self.created_at = attrs.get("pool_created_at")
+
+        # 구버전 평면 필드 지원
+        if not self.volume_usd and attrs.get("volume_usd_24h") is not None:
+            self.volume_usd = {"h24": attrs.get("volume_usd_24h")}
+
+    @property
+    def dex_name(self) -> str:
+        return self.dex_id.replace("_", " ").title() if self.dex_id else "알 수 없음"
+
+    @property
+    def volume_24h(self) -> float:
+        return to_float(self.volume_usd.get("h24"))
+
+    @property
+    def transactions_24h(self) -> int:
+        h24 = self.transactions.get("h24") if isinstance(self.transactions, dict) else None
+        if isinstance(h24, dict):
+            return to_int(h24.get("buys")) + to_int(h24.get("sells"))
+        return to_int(h24)
+
+
+class Trade:
+    """
+    /tokens/{addr}/trades 응답의 거래 하나입니다.
+    """
+
+    __slots__ = ("timestamp", "kind", "amount_usd", "tx_hash", "pool_name")
+
+    def __init__(self, attrs: Dict[str, Any]):
+        self.timestamp = attrs.get("timestamp") or attrs.get("block_timestamp")
+        self.kind = attrs.get("type") or attrs.get("kind") or "알 수 없음"
+        self.amount_usd = to_float(attrs.get("amount_usd") or attrs.get("volume_in_usd"))
+        self.tx_hash = attrs.get("tx_hash") or "알 수 없음"
+        self.pool_name = attrs.get("pool_name") or "알 수 없음"
+
+
+class Holder:
+    """
+    /tokens/{addr}/holders 응답의 보유자 하나입니다.
+    """
+
+    __slots__ = ("address", "balance", "percentage", "is_contract")
+
+    def __init__(self, attrs: Dict[str, Any]):
+        self.address = attrs.get("address") or "알 수 없음"
+        self.balance = to_float(attrs.get("balance"))
+        self.percentage = to_float(attrs.get("percentage"))
+        self.is_contract = bool(attrs.get("is_contract", False))
+
+
+class OHLCVRow:
+    """
+    /ohlcv 응답의 캔들 하나입니다. ([timestamp, open, high, low, close, volume])
+    """
+
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, row: List[Any]):
+        self.timestamp = to_int(row[0]) if len(row) > 0 else 0
+        self.open = to_float(row[1]) if len(row) > 1 else 0.0
+        self.high = to_float(row[2]) if len(row) > 2 else 0.0
+        self.low = to_float(row[3]) if len(row) > 3 else 0.0
+        self.close = to_float(row[4]) if len(row) > 4 else 0.0
+        self.volume = to_float(row[5]) if len(row) > 5 else 0.0
+
+
+# 응답 파싱 함수
+def parse_token(payload: Any) -> Optional[Token]:
+    """
+    단일 토큰 응답을 Token으로 변환합니다. attributes가 없으면 None을 반환합니다.
+    """
+    resources = _resources(payload)
+    if not resources or "attributes" not in resources[0]:
+        return None
+    return Token(_attributes(resources[0]))
+
+
+def parse_tokens(payload: Any) -> List[Token]:
+    """
+    tokens/multi 응답을 Token 목록으로 변환합니다.
+    """
+    return [Token(_attributes(resource)) for resource in _resources(payload) if "attributes" in resource]
+
+
+def parse_token_info(payload: Any) -> Optional[TokenInfo]:
+    """
+    /info 응답을 TokenInfo로 변환합니다. attributes가 없으면 None을 반환합니다.
+    """
+    resources = _resources(payload)
+    if not resources or "attributes" not in resources[0]:
+        return None
+    return TokenInfo(_attributes(resources[0]))
+
+
+def parse_token_infos(payload: Any) -> List[TokenInfo]:
+    """
+    info_recently_updated 응답을 TokenInfo 목록으로 변환합니다.
+    """
+    return [TokenInfo(_attributes(resource)) for resource in _resources(payload) if "attributes" in resource]
+
+
+def parse_pools(payload: Any) -> List[Pool]:
+    """
+    /pools 응답을 Pool 목록으로 변환합니다.
+    """
+    return [Pool(resource) for resource in _resources(payload) if "attributes" in resource]
+
+
+def parse_holders(payload: Any) -> List[Holder]:
+    """
+    /holders 응답을 Holder 목록으로 변환합니다.
+    """
+    return [Holder(_attributes(resource)) for resource in _resources(payload) if "attributes" in resource]
+
+
+def parse_trades(payload: Any) -> List[Trade]:
+    """
+    /trades 응답을 Trade 목록으로 변환합니다.
+    """
+    return [Trade(_attributes(resource)) for resource in _resources(payload) if "attributes" in resource]
+
+
+def parse_ohlcv(payload: Any) -> List[OHLCVRow]:
+    """
+    /ohlcv 응답을 OHLCVRow 목록으로 변환합니다.
+    """
+    resources = _resources(payload)
+    if not resources:
+        return []
+    rows = _attributes(resources[0]).get("ohlcv_list") or []
+    return [OHLCVRow(row) for row in rows if isinstance(row, (list, tuple))]
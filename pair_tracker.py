@@ -1,15 +1,34 @@
+import os
+import time
+import functools
 import sqlite3
 import asyncio
 import logging
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
+from gecko_client import api_get, GECKO_API_BASE
+from market_data import get_price_snapshot, PriceSnapshot
+from models import parse_token
+from db import get_connection, run_db
+from write_behind import write_queue
+from job_scheduler import job_scheduler, FIXED_DELAY
+from workers import shard_filter
 
 logger = logging.getLogger(__name__)
 
+# 페어 알림 확인 간격(초)
+PAIR_TRACKER_INTERVAL = int(os.getenv("PAIR_TRACKER_INTERVAL", 60))
+
+# 공유 페어 비율 기록 (같은 초에 다시 계산되면 마지막 값으로 교체)
+PAIR_RATIO_INSERT_SQL = """
+INSERT OR REPLACE INTO pair_ratios
+(network, token_a_address, token_b_address, timestamp, ratio, token_a_price, token_b_price, change_percent)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 def init_pair_db():
     """페어 트래킹을 위한 데이터베이스 테이블 초기화"""
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     # 토큰 페어 테이블 생성
@@ -38,6 +57,8 @@ def init_pair_db():
         pass
     
     # 페어 비율 기록 테이블 생성
+    # 마이그레이션 1이 이 스키마에 인덱스를 만들므로 출시 당시의 사용자별 스키마로 만들고,
+    # 마이그레이션 4가 (네트워크, 토큰 A, 토큰 B)별 공유 기록으로 변환 (새 데이터베이스는 빈 테이블만 교체)
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS pair_ratios (
         user_id INTEGER,
@@ -46,11 +67,27 @@ def init_pair_db():
         token_a_price REAL,
         token_b_price REAL,
         change_percent REAL DEFAULT 0,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
         FOREIGN KEY (user_id, pair_name) REFERENCES token_pairs(user_id, pair_name)
     )
     ''')
     
+    # 보관 기간이 지난 페어 비율의 시간별 요약 (maintenance.compact_pair_ratios)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS pair_ratio_hourly (
+        network TEXT,
+        token_a_address TEXT,
+        token_b_address TEXT,
+        timestamp INTEGER,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        samples INTEGER,
+        PRIMARY KEY (network, token_a_address, token_b_address, timestamp)
+    )
+    ''')
+    
     conn.commit()
     conn.close()
     logger.info("페어 트래킹 데이터베이스 초기화 완료")
@@ -67,20 +104,18 @@ async def get_token_info_for_pair(token_address: str, network: str = "ethereum")
         }
         
         api_network = network_mapping.get(network.lower(), network.lower())
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = await api_get(url)
         
         if response.status_code == 200:
-            data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
+            token = parse_token(response.json())
+            if token is not None:
                 return {
                     "success": True,
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???'),
-                    "price": float(attrs.get('price_usd') or 0),
+                    "name": token.name,
+                    "symbol": token.symbol,
+                    "price": token.price_usd,
                     "address": token_address
                 }
         
@@ -102,7 +137,7 @@ def add_token_pair(user_id: int, pair_name: str, token_a: str, token_b: str,
                    network: str = "ethereum", threshold: float = 5.0) -> Dict:
     """새로운 토큰 페어 추가"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         # 기존 페어 확인
@@ -135,7 +170,7 @@ def add_token_pair(user_id: int, pair_name: str, token_a: str, token_b: str,
 def update_pair_symbols(user_id: int, pair_name: str, symbol_a: str, symbol_b: str):
     """페어의 토큰 심볼 업데이트"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -152,23 +187,34 @@ def update_pair_symbols(user_id: int, pair_name: str, symbol_a: str, symbol_b: s
 def remove_token_pair(user_id: int, pair_name: str) -> Dict:
     """토큰 페어 제거"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         # 페어 존재 확인
         cursor.execute(
-            "SELECT pair_name FROM token_pairs WHERE user_id = ? AND pair_name = ?",
+            "SELECT network, token_a_address, token_b_address FROM token_pairs WHERE user_id = ? AND pair_name = ?",
             (user_id, pair_name)
         )
         
-        if not cursor.fetchone():
+        key = cursor.fetchone()
+        if not key:
             conn.close()
             return {"success": False, "message": f"페어 '{pair_name}'을 찾을 수 없습니다."}
         
-        # 페어 및 관련 기록 삭제
-        cursor.execute("DELETE FROM pair_ratios WHERE user_id = ? AND pair_name = ?", (user_id, pair_name))
         cursor.execute("DELETE FROM token_pairs WHERE user_id = ? AND pair_name = ?", (user_id, pair_name))
         
+        # 같은 페어를 추적하는 사용자가 더 없으면 공유 비율 기록도 삭제
+        cursor.execute(
+            "SELECT 1 FROM token_pairs WHERE network = ? AND token_a_address = ? AND token_b_address = ? LIMIT 1",
+            tuple(key)
+        )
+        if not cursor.fetchone():
+            for table in ("pair_ratios", "pair_ratio_hourly"):
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE network = ? AND token_a_address = ? AND token_b_address = ?",
+                    tuple(key)
+                )
+        
         conn.commit()
         conn.close()
         
@@ -182,7 +228,7 @@ def remove_token_pair(user_id: int, pair_name: str) -> Dict:
 def get_user_pairs(user_id: int) -> List[Dict]:
     """사용자의 페어 목록 조회"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         # periodic_alert_enabled 컬럼이 있는지 확인하고 쿼리 실행
@@ -243,7 +289,7 @@ def get_user_pairs(user_id: int) -> List[Dict]:
 def toggle_pair_alert(user_id: int, pair_name: str) -> Dict:
     """페어 알림 ON/OFF 토글"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         # 현재 상태 확인
@@ -279,7 +325,7 @@ def toggle_pair_alert(user_id: int, pair_name: str) -> Dict:
 def toggle_periodic_alert(user_id: int, pair_name: str) -> Dict:
     """페어 주기적 알림 ON/OFF 토글"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         # 현재 상태 확인
@@ -317,43 +363,60 @@ def toggle_periodic_alert(user_id: int, pair_name: str) -> Dict:
         logger.error(f"주기적 알림 토글 오류: {e}")
         return {"success": False, "message": f"주기적 알림 설정 변경 중 오류 발생: {str(e)}"}
 
-async def calculate_pair_ratio(user_id: int, pair_name: str, token_a_addr: str, token_b_addr: str, network: str) -> Optional[Dict]:
-    """페어 비율 계산"""
+def pair_assets(pairs: List[tuple]) -> List[Tuple[str, str]]:
+    """페어 행(user_id, pair_name, token_a_address, token_a_symbol, token_b_address, ..., network)의 (토큰 주소, 네트워크) 목록"""
+    assets = set()
+    for pair in pairs:
+        assets.add((pair[2], pair[6]))
+        assets.add((pair[4], pair[6]))
+    return sorted(assets)
+
+def latest_pair_ratio(network: str, token_a_addr: str, token_b_addr: str) -> Optional[float]:
+    """페어의 가장 최근 공유 비율 (기록이 없으면 None)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+    SELECT ratio FROM pair_ratios 
+    WHERE network = ? AND token_a_address = ? AND token_b_address = ? 
+    ORDER BY timestamp DESC LIMIT 1
+    ''', (network, token_a_addr, token_b_addr))
+    
+    prev_result = cursor.fetchone()
+    conn.close()
+    return prev_result[0] if prev_result else None
+
+async def calculate_pair_ratio(token_a_addr: str, token_b_addr: str, network: str,
+                               snapshot: Optional[PriceSnapshot] = None) -> Optional[Dict]:
+    """페어 비율 계산 후 공유 기록에 추가 (snapshot이 주어지면 스냅샷 가격 사용)"""
+    pair_label = f"{token_a_addr}/{token_b_addr} ({network})"
     try:
-        # 두 토큰의 가격을 동시에 조회
-        price_a = await get_token_price_for_pair(token_a_addr, network)
-        price_b = await get_token_price_for_pair(token_b_addr, network)
+        if snapshot is not None:
+            price_a = snapshot.get(token_a_addr, network).get("price", 0.0)
+            price_b = snapshot.get(token_b_addr, network).get("price", 0.0)
+        else:
+            # 두 토큰의 가격을 개별 조회
+            price_a = await get_token_price_for_pair(token_a_addr, network)
+            price_b = await get_token_price_for_pair(token_b_addr, network)
         
         if price_a == 0 or price_b == 0:
-            logger.warning(f"가격 조회 실패: {pair_name} (A: {price_a}, B: {price_b})")
+            logger.warning(f"가격 조회 실패: {pair_label} (A: {price_a}, B: {price_b})")
             return None
         
         ratio = price_a / price_b
         
         # 이전 비율과 비교
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT ratio FROM pair_ratios 
-        WHERE user_id = ? AND pair_name = ? 
-        ORDER BY timestamp DESC LIMIT 1
-        ''', (user_id, pair_name))
-        
-        prev_result = cursor.fetchone()
-        prev_ratio = prev_result[0] if prev_result else ratio
+        prev_ratio = await run_db(latest_pair_ratio, network, token_a_addr, token_b_addr)
+        if prev_ratio is None:
+            prev_ratio = ratio
         
         # 변화율 계산
         change_percent = ((ratio - prev_ratio) / prev_ratio) * 100 if prev_ratio != 0 else 0
         
-        # 새 비율 기록
-        cursor.execute('''
-        INSERT INTO pair_ratios (user_id, pair_name, ratio, token_a_price, token_b_price, change_percent)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, pair_name, ratio, price_a, price_b, change_percent))
-        
-        conn.commit()
-        conn.close()
+        # 새 비율 기록 (쓰기 큐에 모아 주기 끝에 한 번에 기록)
+        write_queue.enqueue(PAIR_RATIO_INSERT_SQL, (
+            network, token_a_addr, token_b_addr, int(time.time()), ratio, price_a, price_b, change_percent
+        ))
         
         return {
             "ratio": ratio,
@@ -364,31 +427,48 @@ async def calculate_pair_ratio(user_id: int, pair_name: str, token_a_addr: str,
         }
         
     except Exception as e:
-        logger.error(f"페어 비율 계산 오류 ({pair_name}): {e}")
+        logger.error(f"페어 비율 계산 오류 ({pair_label}): {e}")
         return None
 
+def get_alert_pairs() -> List[tuple]:
+    """알림이 활성화된 모든 페어 조회"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+    SELECT user_id, pair_name, token_a_address, token_a_symbol, 
+           token_b_address, token_b_symbol, network, change_threshold
+    FROM token_pairs 
+    WHERE alert_enabled = 1
+    ''')
+    
+    pairs = cursor.fetchall()
+    conn.close()
+    return pairs
+
 async def check_pair_alerts(bot) -> None:
     """페어 알림 확인 및 전송"""
     try:
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
         # 알림이 활성화된 모든 페어 조회
-        cursor.execute('''
-        SELECT user_id, pair_name, token_a_address, token_a_symbol, 
-               token_b_address, token_b_symbol, network, change_threshold
-        FROM token_pairs 
-        WHERE alert_enabled = 1
-        ''')
+        pairs = shard_filter(await run_db(get_alert_pairs), lambda pair: pair[6], lambda pair: pair[2])
         
-        pairs = cursor.fetchall()
-        conn.close()
+        if not pairs:
+            return
+        
+        # 페어 토큰 가격을 시장 데이터 서비스에서 조회 (오래된 가격만 tokens/multi로 갱신)
+        snapshot = await get_price_snapshot("pair_alert", pair_assets(pairs))
+        
+        # 같은 (네트워크, 토큰 A, 토큰 B) 페어는 한 번만 계산하고 기록
+        ratios: Dict[Tuple[str, str, str], Optional[Dict]] = {}
         
         for pair in pairs:
             user_id, pair_name, token_a_addr, token_a_symbol, token_b_addr, token_b_symbol, network, threshold = pair
             
             # 비율 계산
-            ratio_data = await calculate_pair_ratio(user_id, pair_name, token_a_addr, token_b_addr, network)
+            key = (network, token_a_addr, token_b_addr)
+            if key not in ratios:
+                ratios[key] = await calculate_pair_ratio(token_a_addr, token_b_addr, network, snapshot)
+            ratio_data = ratios[key]
             
             if ratio_data and abs(ratio_data['change_percent']) >= threshold:
                 # 알림 전송
@@ -411,42 +491,54 @@ async def check_pair_alerts(bot) -> None:
                     logger.info(f"페어 알림 전송 완료: {user_id} - {pair_name}")
                 except Exception as e:
                     logger.error(f"페어 알림 전송 실패: {user_id} - {e}")
+        
+        await write_queue.flush_async()
                 
     except Exception as e:
         logger.error(f"페어 알림 확인 중 오류: {e}")
 
-async def pair_tracker_scheduler(bot) -> None:
-    """페어 트래커 스케줄러 (1분마다 실행)"""
-    logger.info("페어 트래커 스케줄러 시작")
+async def run_pair_tracker(bot) -> None:
+    """페어 트래커 한 주기 실행"""
+    # 변화율 기반 알림 확인
+    await check_pair_alerts(bot)
     
-    while True:
-        try:
-            # 변화율 기반 알림 확인
-            await check_pair_alerts(bot)
-            
-            # 주기적 상태 알림 전송
-            await send_periodic_alerts(bot)
-            
-            await asyncio.sleep(60)  # 1분 대기
-        except Exception as e:
-            logger.error(f"페어 트래커 스케줄러 오류: {e}")
-            await asyncio.sleep(60)
+    # 주기적 상태 알림 전송
+    await send_periodic_alerts(bot)
+
+def schedule_pair_tracker_job(bot) -> None:
+    """페어 트래커 작업 등록 (이전 실행이 끝난 뒤 PAIR_TRACKER_INTERVAL초마다, 페어 트래커 예산으로 집계)"""
+    job_scheduler.add_job(
+        "pair_tracker", functools.partial(run_pair_tracker, bot), PAIR_TRACKER_INTERVAL,
+        mode=FIXED_DELAY, subsystem="pair_tracker",
+        # 주기적 상태 알림은 메시지마다 1초씩 쉬므로 실행 간격보다 오래 걸릴 수 있음
+        deadline=PAIR_TRACKER_INTERVAL * 5
+    )
 
 def get_pair_history(user_id: int, pair_name: str, hours: int = 24) -> List[Dict]:
     """페어 비율 기록 조회"""
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
-        since_time = datetime.now() - timedelta(hours=hours)
+        since_time = int(time.time()) - hours * 3600
+        
+        # 사용자의 페어 이름을 공유 기록 키로 변환
+        cursor.execute(
+            "SELECT network, token_a_address, token_b_address FROM token_pairs WHERE user_id = ? AND pair_name = ?",
+            (user_id, pair_name)
+        )
+        key = cursor.fetchone()
+        if not key:
+            conn.close()
+            return []
         
         cursor.execute('''
         SELECT ratio, token_a_price, token_b_price, change_percent, timestamp
         FROM pair_ratios
-        WHERE user_id = ? AND pair_name = ? AND timestamp >= ?
+        WHERE network = ? AND token_a_address = ? AND token_b_address = ? AND timestamp >= ?
         ORDER BY timestamp DESC
         LIMIT 100
-        ''', (user_id, pair_name, since_time))
+        ''', (*key, since_time))
         
         history = []
         for row in cursor.fetchall():
@@ -455,7 +547,7 @@ def get_pair_history(user_id: int, pair_name: str, hours: int = 24) -> List[Dict
                 "token_a_price": row[1],
                 "token_b_price": row[2],
                 "change_percent": row[3],
-                "timestamp": row[4]
+                "timestamp": datetime.fromtimestamp(row[4]).isoformat()
             })
         
         conn.close()
@@ -465,55 +557,56 @@ def get_pair_history(user_id: int, pair_name: str, hours: int = 24) -> List[Dict
         logger.error(f"페어 기록 조회 오류: {e}")
         return []
 
+def get_periodic_alert_pairs() -> List[tuple]:
+    """주기적 알림이 활성화된 모든 페어 조회"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+        SELECT user_id, pair_name, token_a_address, token_a_symbol, 
+               token_b_address, token_b_symbol, network
+        FROM token_pairs 
+        WHERE periodic_alert_enabled = 1
+        ''')
+    except sqlite3.OperationalError:
+        # periodic_alert_enabled 컬럼이 없는 경우
+        conn.close()
+        return []
+    
+    pairs = cursor.fetchall()
+    conn.close()
+    return pairs
+
 async def send_periodic_alerts(bot) -> None:
     """주기적 알림 전송"""
     try:
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
         # 주기적 알림이 활성화된 모든 페어 조회
-        try:
-            cursor.execute('''
-            SELECT user_id, pair_name, token_a_address, token_a_symbol, 
-                   token_b_address, token_b_symbol, network
-            FROM token_pairs 
-            WHERE periodic_alert_enabled = 1
-            ''')
-        except sqlite3.OperationalError:
-            # periodic_alert_enabled 컬럼이 없는 경우 종료
-            conn.close()
+        pairs = shard_filter(await run_db(get_periodic_alert_pairs), lambda pair: pair[6], lambda pair: pair[2])
+        
+        if not pairs:
             return
         
-        pairs = cursor.fetchall()
-        conn.close()
+        # 페어 토큰 가격을 시장 데이터 서비스에서 조회 (오래된 가격만 tokens/multi로 갱신)
+        snapshot = await get_price_snapshot("pair_summary", pair_assets(pairs))
         
         for pair in pairs:
             user_id, pair_name, token_a_addr, token_a_symbol, token_b_addr, token_b_symbol, network = pair
             
             # 현재 비율 계산 (기록하지 않고 현재 상태만 조회)
             try:
-                price_a = await get_token_price_for_pair(token_a_addr, network)
-                price_b = await get_token_price_for_pair(token_b_addr, network)
+                price_a = snapshot.get(token_a_addr, network).get("price", 0.0)
+                price_b = snapshot.get(token_b_addr, network).get("price", 0.0)
                 
                 if price_a > 0 and price_b > 0:
                     ratio = price_a / price_b
                     
                     # 이전 비율과 비교 (변화율 계산)
-                    conn = sqlite3.connect('tokens.db')
-                    cursor = conn.cursor()
-                    
-                    cursor.execute('''
-                    SELECT ratio FROM pair_ratios 
-                    WHERE user_id = ? AND pair_name = ? 
-                    ORDER BY timestamp DESC LIMIT 1
-                    ''', (user_id, pair_name))
-                    
-                    prev_result = cursor.fetchone()
-                    prev_ratio = prev_result[0] if prev_result else ratio
+                    prev_ratio = await run_db(latest_pair_ratio, network, token_a_addr, token_b_addr)
+                    if prev_ratio is None:
+                        prev_ratio = ratio
                     change_percent = ((ratio - prev_ratio) / prev_ratio) * 100 if prev_ratio != 0 else 0
                     
-                    conn.close()
-                    
                     # 주기적 상태 알림 전송
                     change_emoji = "📈" if change_percent > 0 else "📉" if change_percent < 0 else "➖"
                     message = f"""
@@ -1,14 +1,29 @@
+import os
+import time
 import logging
+import functools
 import sqlite3
 import asyncio
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Tuple, Union
+from gecko_client import api_get, GECKO_API_BASE
+from market_data import get_price_snapshot, token_price_info, market_data_service
+from models import parse_token
+from db import get_connection, run_db
+from write_behind import write_queue
+from subscriptions import get_subscribed_assets, get_user_subscriptions
+from job_scheduler import job_scheduler, DAILY
+from sliced_polling import PRICE_POLL_MODE, SlicedPoller, create_poller
+from adaptive_polling import ADAPTIVE_POLLING, adaptive_policy, asset_key, distance_to_targets
+from workers import shard_filter
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OHLC 데이터 수집 간격(초)
+OHLC_COLLECT_INTERVAL = int(os.getenv("OHLC_COLLECT_INTERVAL", 300))
+
 # 네트워크 ID 매핑
 NETWORK_MAPPING = {
     "ethereum": "eth",
@@ -26,7 +41,7 @@ def init_ohlc_db():
     """
     OHLC 데이터를 저장할 데이터베이스 테이블을 초기화합니다.
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     # OHLC 데이터 테이블 생성
@@ -34,7 +49,7 @@ def init_ohlc_db():
     CREATE TABLE IF NOT EXISTS token_ohlc (
         token_address TEXT,
         network TEXT,
-        timestamp TEXT,
+        timestamp INTEGER,
         open REAL,
         high REAL,
         low REAL,
@@ -63,32 +78,6 @@ def init_ohlc_db():
     conn.close()
     logger.info("OHLC 데이터베이스 초기화 완료")
 
-# API 요청 사이에 지연 시간을 추가하는 함수
-async def rate_limited_request(url, headers=None):
-    max_retries = 5
-    retry_delay = 3
-    
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=headers)
-            
-            # 성공적인 응답이면 바로 반환
-            if response.status_code != 429:
-                return response
-            
-            # 429 오류(Rate Limit)인 경우 지연 후 재시도
-            logger.warning(f"API 요청 제한 도달 (429). {retry_delay}초 후 재시도 ({attempt+1}/{max_retries})...")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2  # 지수 백오프 적용
-            
-        except Exception as e:
-            logger.error(f"API 요청 중 오류: {str(e)}")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 2
-    
-    # 모든 재시도 실패 시 마지막 응답 반환
-    return response
-
 # 토큰 가격 정보 조회
 async def get_token_price(token_address: str, network: str = "ethereum") -> Dict[str, Any]:
     """
@@ -106,29 +95,18 @@ async def get_token_price(token_address: str, network: str = "ethereum") -> Dict
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"API 요청: {url}")
         
-        # 일반 requests.get 대신 rate_limited_request 사용
-        response = await rate_limited_request(url, headers=headers)
+        # 공유 HTTP 클라이언트 사용 (재시도/백오프 포함)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
-                return {
-                    "success": True,
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???'),
-                    "price": float(attrs.get('price_usd') or 0),
-                    "address": token_address,
-                    "market_cap": float(attrs.get('market_cap_usd') or attrs.get('fdv_usd') or 0),
-                    "volume_24h": float(attrs.get('volume_usd_24h') or 0),
-                    "timestamp": datetime.now().isoformat()
-                }
+            token = parse_token(data)
+            if token is not None:
+                return token_price_info(token_address, token)
             else:
                 logger.error(f"API 응답에 필요한 데이터가 없습니다: {data}")
                 return {"success": False, "error": "API 응답에 필요한 데이터가 없습니다."}
@@ -144,87 +122,74 @@ async def get_token_price(token_address: str, network: str = "ethereum") -> Dict
         logger.error(f"토큰 가격 조회 오류: {str(e)}")
         return {"success": False, "error": str(e)}
 
-# 데이터베이스에서 모든 사용자의 토큰 목록 가져오기
-def get_all_tokens() -> List[Tuple[int, str, str]]:
+# 기본 OHLC 간격
+OHLC_INTERVALS = ("1h", "1d")
+
+# 간격별 캔들 길이(초). 캔들 시각은 UTC epoch 기준 구간 시작 시각(정수)
+OHLC_INTERVAL_SECONDS = {"1h": 3600, "1d": 86400}
+
+
+# 캔들 구간 시작 시각 (UTC epoch 초)
+def ohlc_bucket(interval: str, now: float = None) -> int:
     """
-    데이터베이스에서 모든 사용자의 토큰 목록을 가져옵니다.
+    주어진 시각이 속한 캔들 구간의 시작 시각을 반환합니다.
     
+    Args:
+        interval (str): 시간 간격 ("1h", "1d")
+        now (float, optional): 기준 시각 (epoch 초). 생략 시 현재 시각
+        
     Returns:
-        List[Tuple[int, str, str]]: (user_id, token_address, network) 형태의 튜플 리스트
+        int: 구간 시작 시각 (UTC epoch 초). 알 수 없는 간격이면 기준 시각 그대로
     """
-    conn = sqlite3.connect('tokens.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_id, token, network FROM tokens")
-    tokens = cursor.fetchall()
-    conn.close()
-    return tokens
+    timestamp = int(time.time() if now is None else now)
+    seconds = OHLC_INTERVAL_SECONDS.get(interval)
+    return timestamp - timestamp % seconds if seconds else timestamp
+
+# 현재 캔들 갱신: 없으면 시가=고가=저가=종가로 생성, 있으면 고가/저가를 넓히고 종가/거래량 교체
+OHLC_UPSERT_SQL = """
+INSERT INTO token_ohlc (token_address, network, timestamp, open, high, low, close, volume, interval)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (token_address, network, timestamp, interval) DO UPDATE SET
+    high = max(high, excluded.high),
+    low = min(low, excluded.low),
+    close = excluded.close,
+    volume = excluded.volume
+"""
 
 # OHLC 데이터 저장
-async def save_ohlc_data(token_address: str, network: str, price_data: Dict[str, Any], interval: str = "1h"):
+async def save_ohlc_data(token_address: str, network: str, price_data: Dict[str, Any],
+                         intervals: Union[str, Iterable[str]] = OHLC_INTERVALS):
     """
     토큰의 OHLC 데이터를 저장합니다.
+    간격마다 현재 캔들을 INSERT … ON CONFLICT DO UPDATE 한 문장으로 갱신하므로 기존 캔들을 먼저 읽지 않습니다.
+    쓰기는 지연 쓰기 큐에 추가되어 같은 문장끼리 executemany로 묶여 기록됩니다.
     
     Args:
         token_address (str): 토큰 주소
         network (str): 네트워크 이름
         price_data (Dict[str, Any]): 가격 데이터
-        interval (str, optional): 시간 간격. 기본값은 "1h"
+        intervals (Union[str, Iterable[str]], optional): 시간 간격 또는 간격 목록. 기본값은 ("1h", "1d")
     """
     try:
         if not price_data["success"]:
             return
         
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
-        # 현재 시간을 간격에 맞게 조정 (예: 1시간 간격이면 분, 초를 0으로)
-        now = datetime.now()
-        if interval == "1h":
-            timestamp = datetime(now.year, now.month, now.day, now.hour).isoformat()
-        elif interval == "1d":
-            timestamp = datetime(now.year, now.month, now.day).isoformat()
-        else:
-            timestamp = now.isoformat()
-        
-        # 현재 간격의 기존 OHLC 데이터 확인
-        cursor.execute(
-            "SELECT open, high, low, close, volume FROM token_ohlc WHERE token_address = ? AND network = ? AND timestamp = ? AND interval = ?",
-            (token_address, network, timestamp, interval)
-        )
-        existing_data = cursor.fetchone()
+        if isinstance(intervals, str):
+            intervals = (intervals,)
         
+        now = time.time()
         current_price = price_data["price"]
         current_volume = price_data.get("volume_24h", 0)
         
-        if existing_data:
-            # 기존 데이터 업데이트
-            open_price, high_price, low_price, close_price, volume = existing_data
-            
-            # 고가와 저가 업데이트
-            high_price = max(high_price, current_price)
-            low_price = min(low_price, current_price)
+        for interval in intervals:
+            # 현재 시각이 속한 캔들 구간 (UTC epoch)
+            timestamp = ohlc_bucket(interval, now)
             
-            cursor.execute(
-                """
-                UPDATE token_ohlc 
-                SET high = ?, low = ?, close = ?, volume = ?
-                WHERE token_address = ? AND network = ? AND timestamp = ? AND interval = ?
-                """,
-                (high_price, low_price, current_price, current_volume, token_address, network, timestamp, interval)
-            )
-        else:
-            # 새 데이터 삽입
-            cursor.execute(
-                """
-                INSERT INTO token_ohlc (token_address, network, timestamp, open, high, low, close, volume, interval)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+            write_queue.enqueue(
+                OHLC_UPSERT_SQL,
                 (token_address, network, timestamp, current_price, current_price, current_price, current_price, current_volume, interval)
             )
         
-        conn.commit()
-        conn.close()
-        
     except Exception as e:
         logger.error(f"OHLC 데이터 저장 중 오류: {str(e)}")
 
@@ -243,7 +208,7 @@ def get_ohlc_data(token_address: str, network: str, interval: str = "1h", limit:
         Dict[str, Any]: OHLC 데이터
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -269,7 +234,7 @@ def get_ohlc_data(token_address: str, network: str, interval: str = "1h", limit:
         ohlc_data = []
         for row in rows:
             ohlc_data.append({
-                "timestamp": row["timestamp"],
+                "timestamp": datetime.fromtimestamp(row["timestamp"]).isoformat(),
                 "open": row["open"],
                 "high": row["high"],
                 "low": row["low"],
@@ -302,35 +267,35 @@ def calculate_daily_change(token_address: str, network: str) -> Dict[str, Any]:
         Dict[str, Any]: 일일 가격 변동률 정보
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
-        # 오늘의 OHLC 데이터 조회
-        today = datetime.now().strftime("%Y-%m-%d")
+        # 오늘의 OHLC 데이터 조회 (UTC 일봉 구간)
+        today = ohlc_bucket("1d")
+        day = OHLC_INTERVAL_SECONDS["1d"]
         cursor.execute(
             """
             SELECT open, close FROM token_ohlc 
             WHERE token_address = ? AND network = ? AND interval = '1d'
-            AND timestamp LIKE ?
+            AND timestamp >= ? AND timestamp < ?
             ORDER BY timestamp DESC
             LIMIT 1
             """,
-            (token_address, network, f"{today}%")
+            (token_address, network, today, today + day)
         )
         
         today_data = cursor.fetchone()
         
         # 어제의 OHLC 데이터 조회
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
         cursor.execute(
             """
             SELECT close FROM token_ohlc 
             WHERE token_address = ? AND network = ? AND interval = '1d'
-            AND timestamp LIKE ?
+            AND timestamp >= ? AND timestamp < ?
             ORDER BY timestamp DESC
             LIMIT 1
             """,
-            (token_address, network, f"{yesterday}%")
+            (token_address, network, today - day, today)
         )
         
         yesterday_data = cursor.fetchone()
@@ -383,7 +348,7 @@ def add_ohlc_alert(user_id: int, token_address: str, network: str, alert_type: s
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -420,7 +385,7 @@ def remove_ohlc_alert(user_id: int, token_address: str, network: str, alert_type
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -453,18 +418,14 @@ def get_user_ohlc_alerts(user_id: int) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: 알림 설정 목록
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute(
             """
             SELECT a.*, t.name, t.symbol FROM ohlc_alerts a
-            LEFT JOIN (
-                SELECT token as token_address, network, MAX(name) as name, MAX(symbol) as symbol
-                FROM tokens
-                GROUP BY token_address, network
-            ) t ON a.token_address = t.token_address AND a.network = t.network
+            LEFT JOIN tracked_assets t ON a.token_address = t.token_address AND a.network = t.network
             WHERE a.user_id = ? AND a.enabled = 1
             """,
             (user_id,)
@@ -592,55 +553,160 @@ def generate_price_summary(token_address: str, network: str) -> Dict[str, Any]:
         }
 
 # OHLC 데이터 수집 및 알림 처리
-async def collect_ohlc_data_and_check_alerts(bot=None):
+async def collect_ohlc_data_and_check_alerts(bot=None, assets: List[Dict[str, Any]] = None,
+                                             max_age: float = None) -> List[Tuple[str, str]]:
     """
-    모든 토큰의 OHLC 데이터를 수집하고 알림 조건을 확인합니다.
+    토큰의 OHLC 데이터를 수집하고 알림 조건을 확인합니다.
     
     Args:
         bot: 텔레그램 봇 객체 (알림 전송용)
+        assets (List[Dict[str, Any]], optional): 수집할 자산 목록. 생략 시 추적 중인 모든 자산
+        max_age (float, optional): 재사용할 가격의 최대 경과 시간(초). 생략 시 "ohlc" 소비자 신선도
+        
+    Returns:
+        List[Tuple[str, str]]: OHLC 데이터를 저장한 (토큰 주소, 네트워크) 목록
     """
+    collected = []
     try:
-        # 모든 토큰 목록 가져오기
-        tokens = get_all_tokens()
-        
-        # 토큰별로 중복 제거 (여러 사용자가 같은 토큰을 추적할 수 있음)
-        unique_tokens = {}
-        for user_id, token_address, network in tokens:
-            key = f"{token_address}_{network}"
-            if key not in unique_tokens:
-                unique_tokens[key] = (token_address, network)
+        # 추적 중인 자산 목록 가져오기 (여러 사용자가 구독해도 자산당 한 행)
+        if assets is None:
+            assets = shard_filter(
+                await run_db(get_subscribed_assets), lambda asset: asset["network"], lambda asset: asset["token_address"]
+            )
+        unique_tokens = {
+            f"{asset['token_address']}_{asset['network']}": (asset["token_address"], asset["network"])
+            for asset in assets
+        }
         
         logger.info(f"OHLC 데이터 수집 시작: {len(unique_tokens)}개 토큰")
         
-        # 각 토큰의 가격 정보 수집 및 OHLC 데이터 저장
+        # 추적 중인 토큰 가격을 시장 데이터 서비스에서 조회 (오래된 가격만 tokens/multi로 갱신)
+        snapshot = await get_price_snapshot("ohlc", unique_tokens.values(), max_age)
+        
+        
+        # 각 토큰의 가격 정보로 OHLC 데이터 저장 (쓰기 큐에 모음)
         for token_address, network in unique_tokens.values():
             try:
-                # API 요청 사이에 지연 시간 추가
-                await asyncio.sleep(1)
-                
-                # 토큰 가격 조회
-                price_info = await get_token_price(token_address, network)
+                # 스냅샷에서 토큰 가격 조회
+                price_info = snapshot.get(token_address, network)
                 
                 if not price_info["success"]:
-                    logger.error(f"토큰 {token_address} 가격 조회 실패: {price_info['error']}")
+                    if not snapshot.is_unavailable(network):
+                        logger.error(f"토큰 {token_address} 가격 조회 실패: {price_info['error']}")
                     continue
                 
                 # OHLC 데이터 저장 (1시간 및 1일 간격)
-                await save_ohlc_data(token_address, network, price_info, "1h")
-                await save_ohlc_data(token_address, network, price_info, "1d")
-                
-                # 알림 처리 (봇이 제공된 경우)
-                if bot:
-                    await check_ohlc_alerts(bot, token_address, network, price_info)
+                await save_ohlc_data(token_address, network, price_info)
+                collected.append((token_address, network, price_info))
                 
             except Exception as e:
                 logger.error(f"토큰 {token_address} ({network}) OHLC 데이터 수집 중 오류: {str(e)}")
                 continue
         
+        # 이번 주기의 OHLC 쓰기를 한 트랜잭션으로 기록 (일일 변동 알림이 최신 캔들을 읽도록 알림 전에 실행)
+        await write_queue.flush_async()
+        
+        # 알림 처리 (봇이 제공된 경우)
+        if bot:
+            for token_address, network, price_info in collected:
+                await check_ohlc_alerts(bot, token_address, network, price_info)
+            await write_queue.flush_async()
+        
         logger.info(f"OHLC 데이터 수집 완료")
         
     except Exception as e:
         logger.error(f"OHLC 데이터 수집 및 알림 처리 중 오류: {str(e)}")
+    
+    return [(token_address, network) for token_address, network, _ in collected]
+
+# 자산별 가격 알림 목표 가격 조회
+def get_price_alert_targets() -> Dict[Tuple[str, str], List[float]]:
+    """
+    활성화된 price_above/price_below 알림의 목표 가격을 자산별로 가져옵니다.
+    
+    Returns:
+        Dict[Tuple[str, str], List[float]]: asset_key별 목표 가격 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT token_address, network, threshold FROM ohlc_alerts "
+        "WHERE enabled = 1 AND alert_type IN ('price_above', 'price_below')"
+    )
+    
+    targets = {}
+    for token_address, network, threshold in cursor.fetchall():
+        targets.setdefault(asset_key(token_address, network), []).append(threshold)
+    
+    conn.close()
+    return targets
+
+# OHLC 데이터 슬롯 수집
+async def collect_ohlc_slice(bot, poller: SlicedPoller):
+    """
+    분할 수집기의 이번 슬롯에 배정된 자산만 OHLC 데이터를 수집합니다.
+    적응형 조회가 켜져 있으면 변동성, 구독자 수, 목표 가격 근접도에 따라 자산별 수집 간격을 정합니다.
+    
+    Args:
+        bot: 텔레그램 봇 객체 (알림 전송용)
+        poller (SlicedPoller): OHLC 분할 수집기
+    """
+    assets = shard_filter(
+        await run_db(get_subscribed_assets, with_subscribers=True),
+        lambda asset: asset["network"], lambda asset: asset["token_address"]
+    )
+    
+    intervals = None
+    if ADAPTIVE_POLLING:
+        targets = await run_db(get_price_alert_targets)
+        distances = {}
+        for key, prices in targets.items():
+            distance = distance_to_targets(adaptive_policy.last_price(key[1], key[0]), prices)
+            if distance is not None:
+                distances[key] = distance
+        intervals = adaptive_policy.intervals(
+            assets, poller.interval, distances, consumer=poller.name, batch_size=poller.batch_size
+        )
+    
+    due_assets = poller.due(assets, intervals=intervals)
+    if due_assets:
+        # 적응형 간격이 신선도(기본 120초)보다 짧은 자산은 캐시된 가격 대신 새로 조회
+        max_age = poller.max_age(due_assets, intervals, market_data_service.max_age_for("ohlc"))
+        poller.mark_refreshed(await collect_ohlc_data_and_check_alerts(bot, due_assets, max_age))
+
+# 알림 전송 시각 기록
+OHLC_ALERT_SENT_SQL = """
+UPDATE ohlc_alerts SET last_alert = ?
+WHERE user_id = ? AND token_address = ? AND network = ? AND alert_type = ?
+"""
+
+# 토큰의 활성화된 OHLC 알림 설정 조회
+def get_token_ohlc_alerts(token_address: str, network: str) -> List[Dict[str, Any]]:
+    """
+    토큰에 설정된 활성화된 OHLC 알림 목록을 가져옵니다.
+    
+    Args:
+        token_address (str): 토큰 주소
+        network (str): 네트워크 이름
+        
+    Returns:
+        List[Dict[str, Any]]: ohlc_alerts 행 목록
+    """
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    cursor.execute(
+        """
+        SELECT * FROM ohlc_alerts 
+        WHERE token_address = ? AND network = ? AND enabled = 1
+        """,
+        (token_address, network)
+    )
+    
+    alerts = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return alerts
 
 # OHLC 알림 조건 확인 및 알림 전송
 async def check_ohlc_alerts(bot, token_address: str, network: str, price_info: Dict[str, Any]):
@@ -654,20 +720,8 @@ async def check_ohlc_alerts(bot, token_address: str, network: str, price_info: D
         price_info (Dict[str, Any]): 현재 가격 정보
     """
     try:
-        conn = sqlite3.connect('tokens.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         # 해당 토큰에 대한 모든 알림 설정 가져오기
-        cursor.execute(
-            """
-            SELECT * FROM ohlc_alerts 
-            WHERE token_address = ? AND network = ? AND enabled = 1
-            """,
-            (token_address, network)
-        )
-        
-        alerts = cursor.fetchall()
+        alerts = await run_db(get_token_ohlc_alerts, token_address, network)
         
         # 현재 시간
         now = datetime.now()
@@ -730,7 +784,7 @@ async def check_ohlc_alerts(bot, token_address: str, network: str, price_info: D
             
             elif alert_type == "daily_change":
                 # 일일 가격 변동 계산
-                daily_change = calculate_daily_change(token_address, network)
+                daily_change = await run_db(calculate_daily_change, token_address, network)
                 
                 if daily_change["success"]:
                     change_percent = daily_change["daily_change"]
@@ -768,13 +822,9 @@ async def check_ohlc_alerts(bot, token_address: str, network: str, price_info: D
                         parse_mode="HTML"
                     )
                     
-                    # 마지막 알림 시간 업데이트
-                    cursor.execute(
-                        """
-                        UPDATE ohlc_alerts 
-                        SET last_alert = ?
-                        WHERE user_id = ? AND token_address = ? AND network = ? AND alert_type = ?
-                        """,
+                    # 마지막 알림 시간 업데이트 (쓰기 큐에 모아 기록)
+                    write_queue.enqueue(
+                        OHLC_ALERT_SENT_SQL,
                         (now.isoformat(), user_id, token_address, network, alert_type)
                     )
                     
@@ -782,36 +832,31 @@ async def check_ohlc_alerts(bot, token_address: str, network: str, price_info: D
                 
                 except Exception as e:
                     logger.error(f"OHLC 알림 전송 실패 (사용자 ID: {user_id}): {str(e)}")
-        
-        conn.commit()
-        conn.close()
     
     except Exception as e:
         logger.error(f"OHLC 알림 확인 중 오류: {str(e)}")
 
-# OHLC 데이터 수집 스케줄러
-async def ohlc_scheduler(bot=None, interval_seconds=300):
+# OHLC 데이터 수집 작업 등록
+def schedule_ohlc_job(bot=None, interval_seconds: int = OHLC_COLLECT_INTERVAL):
     """
-    OHLC 데이터 수집 및 알림 처리를 주기적으로 실행하는 스케줄러입니다.
+    OHLC 데이터 수집 및 알림 처리 작업을 등록합니다. API 요청은 OHLC 예산으로 집계됩니다.
+    PRICE_POLL_MODE=sliced이면 자산을 수집 주기 안의 슬롯에 나눠 수집합니다.
     
     Args:
         bot: 텔레그램 봇 객체 (알림 전송용)
-        interval_seconds (int, optional): 실행 간격(초). 기본값은 300초(5분)
+        interval_seconds (int, optional): 자산별 수집 주기(초). 기본값은 OHLC_COLLECT_INTERVAL(300초)
     """
-    # 데이터베이스 초기화
-    init_ohlc_db()
+    if PRICE_POLL_MODE == "sliced":
+        poller = create_poller("ohlc", interval_seconds, "ohlc")
+        job_scheduler.add_job(
+            "ohlc", functools.partial(collect_ohlc_slice, bot, poller), poller.slot_seconds, subsystem="ohlc",
+            deadline=interval_seconds, jitter=0
+        )
+        return
     
-    while True:
-        try:
-            # OHLC 데이터 수집 및 알림 처리
-            await collect_ohlc_data_and_check_alerts(bot)
-            
-            # 다음 실행까지 대기
-            await asyncio.sleep(interval_seconds)
-            
-        except Exception as e:
-            logger.error(f"OHLC 스케줄러 실행 중 오류: {str(e)}")
-            await asyncio.sleep(60)  # 오류 발생 시 1분 대기 후 재시도
+    job_scheduler.add_job(
+        "ohlc", functools.partial(collect_ohlc_data_and_check_alerts, bot), interval_seconds, subsystem="ohlc"
+    )
 
 # 메인 함수 (테스트용)
 async def main():
@@ -827,8 +872,8 @@ async def main():
     print(f"토큰 가격 정보: {price_info}")
     
     # OHLC 데이터 저장 테스트
-    await save_ohlc_data(token_address, network, price_info, "1h")
-    await save_ohlc_data(token_address, network, price_info, "1d")
+    await save_ohlc_data(token_address, network, price_info)
+    write_queue.flush()
     
     # OHLC 데이터 조회 테스트
     ohlc_data = get_ohlc_data(token_address, network, "1h", 5)
@@ -843,7 +888,7 @@ def init_daily_summary_db():
     """
     일일 요약 알림 설정을 저장할 데이터베이스 테이블을 초기화합니다.
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     # 일일 요약 알림 설정 테이블 생성
@@ -870,7 +915,7 @@ def enable_daily_summary_alerts(user_id: int) -> bool:
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -897,7 +942,7 @@ def disable_daily_summary_alerts(user_id: int) -> bool:
         bool: 성공 여부
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -924,7 +969,7 @@ def get_daily_summary_alerts_status(user_id: int) -> bool:
         bool: 활성화 상태 (True: 활성화, False: 비활성화)
     """
     try:
-        conn = sqlite3.connect('tokens.db')
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
@@ -943,6 +988,21 @@ def get_daily_summary_alerts_status(user_id: int) -> bool:
         logger.error(f"일일 요약 알림 상태 확인 중 오류: {str(e)}")
         return False
 
+# 일일 요약 알림을 받을 사용자 목록
+def get_daily_summary_users() -> List[Tuple[int]]:
+    """
+    일일 요약 알림이 활성화된 사용자 목록을 가져옵니다.
+    
+    Returns:
+        List[Tuple[int]]: (user_id,) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id FROM daily_summary_alerts WHERE enabled = 1")
+    users = cursor.fetchall()
+    conn.close()
+    return users
+
 # 일일 요약 알림 전송
 async def send_daily_summary_alerts(bot):
     """
@@ -952,33 +1012,16 @@ async def send_daily_summary_alerts(bot):
     try:
         logger.info("일일 요약 알림 전송 시작")
         
-        conn = sqlite3.connect('tokens.db')
-        cursor = conn.cursor()
-        
         # 알림을 받을 사용자 목록 조회
-        cursor.execute(
-            """
-            SELECT user_id FROM daily_summary_alerts 
-            WHERE enabled = 1
-            """
-        )
-        users = cursor.fetchall()
+        users = await run_db(get_daily_summary_users)
         
         if not users:
             logger.info("일일 요약 알림을 받을 사용자가 없습니다.")
-            conn.close()
             return
         
         for (user_id,) in users:
             # 사용자가 추적 중인 토큰 목록 조회
-            cursor.execute(
-                """
-                SELECT token, network FROM tokens 
-                WHERE user_id = ?
-                """,
-                (user_id,)
-            )
-            user_tokens = cursor.fetchall()
+            user_tokens = await run_db(get_user_subscriptions, user_id)
             
             if not user_tokens:
                 logger.info(f"사용자 {user_id}가 추적 중인 토큰이 없습니다.")
@@ -998,10 +1041,10 @@ async def send_daily_summary_alerts(bot):
                         continue
                     
                     # 일일 변동률 계산
-                    daily_change = calculate_daily_change(token_address, network)
+                    daily_change = await run_db(calculate_daily_change, token_address, network)
                     
                     # OHLC 데이터 조회 (최근 24시간)
-                    ohlc_data = get_ohlc_data(token_address, network, "1d", 1)
+                    ohlc_data = await run_db(get_ohlc_data, token_address, network, "1d", 1)
                     
                     # 토큰 요약 정보 추가
                     token_summary = (
@@ -1055,45 +1098,20 @@ async def send_daily_summary_alerts(bot):
             except Exception as e:
                 logger.error(f"사용자 {user_id}에게 일일 요약 알림 전송 실패: {str(e)}")
         
-        conn.close()
         logger.info("일일 요약 알림 전송 완료")
     
     except Exception as e:
         logger.error(f"일일 요약 알림 처리 중 오류: {str(e)}")
 
-# 일일 요약 알림 스케줄러
-async def daily_summary_scheduler(bot):
+# 일일 요약 알림 작업 등록
+def schedule_daily_summary_job(bot):
     """
-    매일 오전 6:00에 일일 요약 알림을 전송하는 스케줄러입니다.
+    매일 오전 6:00에 일일 요약 알림을 전송하는 작업을 등록합니다. API 요청은 일일 요약 예산으로 집계됩니다.
     """
-    # 데이터베이스 초기화
-    init_daily_summary_db()
-    
-    while True:
-        try:
-            # 현재 시간
-            now = datetime.now()
-            
-            # 다음 오전 6시 계산
-            target_time = now.replace(hour=6, minute=0, second=0, microsecond=0)
-            if now >= target_time:
-                # 이미 오늘의 오전 6시가 지났으면 내일 오전 6시로 설정
-                target_time = target_time + timedelta(days=1)
-            
-            # 다음 실행까지 대기 시간 계산 (초 단위)
-            wait_seconds = (target_time - now).total_seconds()
-            
-            logger.info(f"다음 일일 요약 알림 전송까지 {wait_seconds:.0f}초 대기 ({target_time.strftime('%Y-%m-%d %H:%M:%S')})")
-            
-            # 대기 후 실행
-            await asyncio.sleep(wait_seconds)
-            
-            # 일일 요약 알림 전송
-            await send_daily_summary_alerts(bot)
-            
-        except Exception as e:
-            logger.error(f"일일 요약 알림 스케줄러 실행 중 오류: {str(e)}")
-            await asyncio.sleep(60)  # 오류 발생 시 1분 대기 후 재시도
+    job_scheduler.add_job(
+        "daily_summary", functools.partial(send_daily_summary_alerts, bot),
+        mode=DAILY, at=(6, 0), subsystem="daily_summary", deadline=3600
+    )
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,495 @@
+import os
+import time
+import asyncio
+import logging
+import contextvars
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# GeckoTerminal 공개 API 분당 호출 한도 및 안전 여유율
+GECKO_RATE_LIMIT_PER_MIN = int(os.getenv("GECKO_RATE_LIMIT_PER_MIN", 30))
+RATE_LIMIT_SAFETY = float(os.getenv("GECKO_RATE_LIMIT_SAFETY", 0.9))  # 한도의 90%만 사용
+RATE_LIMIT_BURST = int(os.getenv("GECKO_RATE_LIMIT_BURST", 5))  # 순간 허용량
+
+# 서브시스템별 가중치 (경합 시 예산을 가중치 비율로 나눔)
+DEFAULT_SUBSYSTEM_WEIGHTS = {
+    "interactive": 4,      # 사용자 명령어
+    "price_alert": 3,      # 가격 변동 알림
+    "ohlc": 2,             # OHLC 수집 및 알림
+    "pair_tracker": 2,     # 페어 비율 모니터링
+    "market_scanner": 1,   # 시장 스캔 / 돌파 추적
+    "daily_summary": 1,    # 일일 요약 알림
+}
+
+# 우선순위 등급 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0  # 사용자 명령어
+PRIORITY_ALERT = 1        # 알림에 직접 쓰이는 데이터
+PRIORITY_BULK = 2         # 시장 스캔, 요약 등 백그라운드 작업
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_ALERT: "alert",
+    PRIORITY_BULK: "bulk",
+}
+
+# 서브시스템별 우선순위 등급
+SUBSYSTEM_PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "price_alert": PRIORITY_ALERT,
+    "ohlc": PRIORITY_ALERT,
+    "pair_tracker": PRIORITY_ALERT,
+    "market_scanner": PRIORITY_BULK,
+    "daily_summary": PRIORITY_BULK,
+}
+
+# 사용자 명령어용으로 남겨 두는 토큰 수 (백그라운드 작업은 이 아래로 버킷을 비우지 못함)
+INTERACTIVE_RESERVE = float(os.getenv("GECKO_INTERACTIVE_RESERVE", 1))
+
+# 낮은 등급이 이 시간(초)만큼 기다릴 때마다 한 등급씩 올려 굶주림 방지
+PRIORITY_AGING_SECONDS = float(os.getenv("GECKO_PRIORITY_AGING_SECONDS", 30))
+
+# 동시 요청 수(AIMD) 설정
+CONCURRENCY_INITIAL = float(os.getenv("GECKO_CONCURRENCY_INITIAL", 2))  # 시작 동시 요청 수
+CONCURRENCY_MIN = float(os.getenv("GECKO_CONCURRENCY_MIN", 1))  # 최소 동시 요청 수
+CONCURRENCY_MAX = float(os.getenv("GECKO_CONCURRENCY_MAX", 8))  # 최대 동시 요청 수
+CONCURRENCY_DECREASE = float(os.getenv("GECKO_CONCURRENCY_DECREASE", 0.5))  # 과부하 시 감소 배율
+LATENCY_TOLERANCE = float(os.getenv("GECKO_LATENCY_TOLERANCE", 2.0))  # 기준 지연 대비 허용 배수
+LATENCY_FLOOR = float(os.getenv("GECKO_LATENCY_FLOOR", 0.5))  # 이보다 빠른 응답은 지연 증가로 보지 않음(초)
+
+# 현재 실행 중인 작업의 서브시스템 (태스크마다 독립적으로 유지됨)
+current_subsystem: contextvars.ContextVar = contextvars.ContextVar("gecko_subsystem", default="interactive")
+
+
+# 환경 변수에서 가중치 읽기 (예: "price_alert=3,ohlc=2")
+def _load_weights() -> Dict[str, float]:
+    weights = {name: float(weight) for name, weight in DEFAULT_SUBSYSTEM_WEIGHTS.items()}
+    raw = os.getenv("GECKO_SUBSYSTEM_WEIGHTS", "")
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            weights[name.strip()] = max(float(value), 0.1)
+        except ValueError:
+            logger.warning(f"잘못된 서브시스템 가중치 설정 무시: {item}")
+
+    return weights
+
+
+# 현재 태스크의 서브시스템 설정
+def set_subsystem(name: str):
+    """
+    현재 태스크에서 보내는 API 요청이 어느 서브시스템 예산으로 집계될지 설정합니다.
+    각 스케줄러 루프 시작 시 한 번 호출합니다.
+
+    Args:
+        name (str): 서브시스템 이름 (DEFAULT_SUBSYSTEM_WEIGHTS 키)
+    """
+    return current_subsystem.set(name)
+
+
+class TokenBucketLimiter:
+    """
+    프로세스 전체가 공유하는 토큰 버킷 요청 제한기입니다.
+    토큰이 부족하면 우선순위 등급이 높은 요청부터 처리하고,
+    같은 등급 안에서는 대기 중인 서브시스템들 사이에서 가중치 비율로 차례를 배분합니다.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, weights: Dict[str, float],
+                 priorities: Dict[str, int], reserve: float = 0.0):
+        self.rate = rate_per_minute / 60.0  # 초당 토큰 충전량
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.weights = weights
+        self.priorities = priorities
+        self.reserve = min(max(reserve, 0.0), self.capacity - 1)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+        # 서브시스템별 대기열: (대기 시작 시각, future)
+        self._waiters: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {}
+        self._virtual_time: Dict[str, float] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # 통계
+        self._granted: Dict[str, Deque[float]] = {}
+        self.total_granted = 0
+        self.rate_limited_count = 0
+        self._wait_times: Dict[int, Deque[float]] = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _record(self, subsystem: str):
+        now = time.monotonic()
+        granted = self._granted.setdefault(subsystem, deque())
+        granted.append(now)
+        while granted and now - granted[0] > 60:
+            granted.popleft()
+        self.total_granted += 1
+
+        # 가중치가 낮을수록 한 번 사용할 때 가상 시간이 많이 증가
+        weight = self.weights.get(subsystem, 1.0)
+        self._virtual_time[subsystem] = self._virtual_time.get(subsystem, 0.0) + 1.0 / weight
+
+    def _priority(self, subsystem: str) -> int:
+        return self.priorities.get(subsystem, PRIORITY_BULK)
+
+    def _required_tokens(self, priority: int) -> float:
+        # 사용자 명령어가 아니면 예약분을 남겨 두어야 함
+        return 1.0 if priority == PRIORITY_INTERACTIVE else 1.0 + self.reserve
+
+    def _has_waiters(self, max_priority: Optional[int] = None) -> bool:
+        return any(
+            queue for name, queue in self._waiters.items()
+            if max_priority is None or self._priority(name) <= max_priority
+        )
+
+    def _record_wait(self, priority: int, waited: float):
+        self._wait_times.setdefault(priority, deque(maxlen=200)).append(waited)
+
+    def _next_subsystem(self) -> Optional[str]:
+        candidates = [name for name, queue in self._waiters.items() if queue]
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+
+        # 오래 기다린 요청은 등급을 올려 굶주림 방지
+        def effective_priority(name: str) -> int:
+            waited = now - self._waiters[name][0][0]
+            boost = int(waited // PRIORITY_AGING_SECONDS) if PRIORITY_AGING_SECONDS > 0 else 0
+            return max(self._priority(name) - boost, PRIORITY_INTERACTIVE)
+
+        best = min(effective_priority(name) for name in candidates)
+        candidates = [name for name in candidates if effective_priority(name) == best]
+        return min(candidates, key=lambda name: self._virtual_time.get(name, 0.0))
+
+    async def acquire(self, subsystem: Optional[str] = None):
+        """
+        요청 1회분의 토큰을 획득할 때까지 대기합니다.
+
+        Args:
+            subsystem (str, optional): 서브시스템 이름. 생략 시 현재 태스크의 서브시스템 사용
+        """
+        subsystem = subsystem or current_subsystem.get()
+        priority = self._priority(subsystem)
+        self._refill()
+
+        # 같거나 높은 등급의 대기 요청이 없고 토큰이 있으면 즉시 통과
+        if (not self._has_waiters(priority) and self.tokens >= self._required_tokens(priority)
+                and time.monotonic() >= self.paused_until):
+            self.tokens -= 1
+            self._record(subsystem)
+            self._record_wait(priority, 0.0)
+            return
+
+        # 새로 대기하는 서브시스템은 현재 최소 가상 시간부터 시작 (유휴 기간 동안 몰아쓰기 방지)
+        active = [self._virtual_time.get(name, 0.0) for name, queue in self._waiters.items() if queue]
+        if active:
+            self._virtual_time[subsystem] = max(self._virtual_time.get(subsystem, 0.0), min(active))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (time.monotonic(), future)
+        self._waiters.setdefault(subsystem, deque()).append(entry)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        elif priority == PRIORITY_INTERACTIVE:
+            # 낮은 등급을 위해 잠들어 있던 디스패처를 깨워 즉시 다시 판단
+            self._dispatcher.cancel()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            queue = self._waiters.get(subsystem)
+            if queue and entry in queue:
+                queue.remove(entry)
+            raise
+
+    async def _dispatch(self):
+        while self._has_waiters():
+            self._refill()
+            now = time.monotonic()
+
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            subsystem = self._next_subsystem()
+            required = self._required_tokens(self._priority(subsystem))
+
+            if self.tokens < required:
+                await asyncio.sleep((required - self.tokens) / self.rate)
+                continue
+
+            enqueued_at, future = self._waiters[subsystem].popleft()
+            if future.done():
+                continue
+
+            self.tokens -= 1
+            self._record(subsystem)
+            self._record_wait(self._priority(subsystem), now - enqueued_at)
+            future.set_result(None)
+
+    def penalize(self, seconds: float):
+        """
+        429 응답을 받았을 때 호출합니다. 버킷을 비우고 지정한 시간 동안 모든 요청을 멈춥니다.
+
+        Args:
+            seconds (float): 정지 시간(초)
+        """
+        self.rate_limited_count += 1
+        self.tokens = 0.0
+        self.updated_at = time.monotonic()
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"API 요청 제한(429) 감지: {seconds:.1f}초 동안 모든 요청 일시 정지")
+
+    def scale(self, fraction: float):
+        """
+        분당 한도와 순간 허용량을 비율만큼 줄입니다. 다중 프로세스 모드에서 프로세스마다 API 한도를 나눠 쓸 때 사용합니다.
+        순간 허용량도 나누어 모든 프로세스가 동시에 몰아 써도 합계가 설정한 순간 허용량을 넘지 않도록 합니다 (최소 1).
+
+        Args:
+            fraction (float): 이 프로세스가 사용할 한도 비율 (0~1)
+        """
+        fraction = min(max(fraction, 0.01), 1.0)
+        self._refill()
+        self.rate *= fraction
+        self.capacity = max(self.capacity * fraction, 1.0)
+        self.reserve = min(self.reserve, self.capacity - 1)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def guaranteed_rate(self, subsystem: str) -> float:
+        """
+        모든 서브시스템이 경합할 때도 이 서브시스템에 보장되는 초당 요청 수를 반환합니다.
+
+        Args:
+            subsystem (str): 서브시스템 이름
+
+        Returns:
+            float: 가중치 비율로 나눈 초당 요청 수
+        """
+        total = sum(self.weights.values()) or 1.0
+        return self.rate * self.weights.get(subsystem, 1.0) / total
+
+    def status(self) -> Dict[str, Any]:
+        """
+        현재 예산 상태를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 남은 토큰, 최근 1분 사용량, 서브시스템별 사용량 및 대기 수
+        """
+        self._refill()
+        now = time.monotonic()
+
+        subsystems = {}
+        for name in sorted(set(self.weights) | set(self._granted) | set(self._waiters)):
+            granted = self._granted.get(name, deque())
+            while granted and now - granted[0] > 60:
+                granted.popleft()
+            subsystems[name] = {
+                "weight": self.weights.get(name, 1.0),
+                "priority": PRIORITY_NAMES[self._priority(name)],
+                "used_last_minute": len(granted),
+                "waiting": len(self._waiters.get(name, ())),
+            }
+
+        priorities = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = self._wait_times.get(priority, ())
+            priorities[name] = {
+                "waiting": sum(len(queue) for sub, queue in self._waiters.items() if self._priority(sub) == priority),
+                "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait": max(waits) if waits else 0.0,
+            }
+
+        return {
+            "limit_per_minute": self.rate * 60,
+            "tokens_available": self.tokens,
+            "used_last_minute": sum(item["used_last_minute"] for item in subsystems.values()),
+            "paused_seconds": max(0.0, self.paused_until - now),
+            "total_granted": self.total_granted,
+            "rate_limited_count": self.rate_limited_count,
+            "subsystems": subsystems,
+            "priorities": priorities,
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD 방식으로 동시에 진행할 수 있는 요청 수(윈도우)를 조절합니다.
+    응답이 정상이면 윈도우를 조금씩 늘리고, 429/5xx/타임아웃 또는 지연 증가가 감지되면 절반으로 줄입니다.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, decrease: float):
+        self.minimum = max(minimum, 1.0)
+        self.maximum = max(maximum, self.minimum)
+        self.window = min(max(initial, self.minimum), self.maximum)
+        self.decrease = decrease
+        self.in_flight = 0
+
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+        # 지연 시간 (지수 이동 평균과 최근 최솟값)
+        self.latency_ewma = 0.0
+        self._recent_latencies: Deque[float] = deque(maxlen=50)
+
+        # 통계
+        self.increase_count = 0
+        self.decrease_count = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self.window)
+
+    async def acquire(self):
+        """
+        동시 요청 슬롯을 얻을 때까지 대기합니다.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            elif future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소된 경우 반납
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.limit:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False):
+        """
+        요청이 끝나면 호출합니다. 결과에 따라 윈도우를 조절하고 대기 중인 요청을 깨웁니다.
+
+        Args:
+            latency (float, optional): 응답 시간(초). 응답이 없으면 None (과부하가 아니면 윈도우 유지)
+            overloaded (bool, optional): 429/5xx/타임아웃 등 과부하 신호 여부
+        """
+        self.in_flight = max(self.in_flight - 1, 0)
+
+        if latency is not None:
+            self._recent_latencies.append(latency)
+            self.latency_ewma = latency if self.latency_ewma == 0 else 0.8 * self.latency_ewma + 0.2 * latency
+
+            baseline = min(self._recent_latencies)
+            if self.latency_ewma > LATENCY_FLOOR and self.latency_ewma > baseline * LATENCY_TOLERANCE:
+                overloaded = True
+
+        if overloaded:
+            self._on_overload()
+        elif latency is not None:
+            # 윈도우 하나만큼 성공하면 1 증가 (가산 증가)
+            previous = self.limit
+            self.window = min(self.window + 1.0 / self.window, self.maximum)
+            if self.limit > previous:
+                self.increase_count += 1
+
+        self._wake()
+
+    def _on_overload(self):
+        # 한 번의 과부하에 동시 진행 중인 요청들이 모두 실패해도 한 번만 줄임
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.latency_ewma, 1.0):
+            return
+
+        self._last_decrease = now
+        self.window = max(self.window * self.decrease, self.minimum)
+        self.decrease_count += 1
+        logger.info(f"API 과부하 감지: 동시 요청 수를 {self.limit}개로 축소")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        현재 동시성 상태를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 윈도우, 진행 중/대기 요청 수, 평균 지연, 증가/감소 횟수
+        """
+        return {
+            "window": self.window,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_ewma": self.latency_ewma,
+            "increase_count": self.increase_count,
+            "decrease_count": self.decrease_count,
+        }
+
+
+# 프로세스 전역 제한기
+limiter = TokenBucketLimiter(
+    rate_per_minute=GECKO_RATE_LIMIT_PER_MIN * RATE_LIMIT_SAFETY,
+    burst=RATE_LIMIT_BURST,
+    weights=_load_weights(),
+    priorities=SUBSYSTEM_PRIORITIES,
+    reserve=INTERACTIVE_RESERVE,
+)
+
+# 프로세스 전역 동시성 제한기
+concurrency = AdaptiveConcurrencyLimiter(
+    initial=CONCURRENCY_INITIAL,
+    minimum=CONCURRENCY_MIN,
+    maximum=CONCURRENCY_MAX,
+    decrease=CONCURRENCY_DECREASE,
+)
+
+
+# 예산 상태 텍스트 생성 (텔레그램 메시지용)
+def format_budget_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 예산 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    status = limiter.status()
+
+    text = (
+        f"📡 <b>GeckoTerminal API 예산</b>\n\n"
+        f"분당 한도: <b>{status['limit_per_minute']:.1f}</b>회\n"
+        f"최근 1분 사용: <b>{status['used_last_minute']}</b>회\n"
+        f"남은 토큰: <b>{status['tokens_available']:.1f}</b>\n"
+        f"429 발생: <b>{status['rate_limited_count']}</b>회\n"
+    )
+
+    if status["paused_seconds"] > 0:
+        text += f"⏸ 일시 정지: <b>{status['paused_seconds']:.0f}</b>초 남음\n"
+
+    window = concurrency.status()
+    text += (
+        f"동시 요청 윈도우: <b>{window['limit']}</b> (진행 {window['in_flight']}, 대기 {window['waiting']}, "
+        f"평균 지연 {window['latency_ewma']:.2f}초)\n"
+    )
+
+    text += "\n<b>우선순위별 대기</b>\n"
+    for name, item in status["priorities"].items():
+        text += f"• {name}: 대기 {item['waiting']}, 평균 {item['avg_wait']:.1f}초, 최대 {item['max_wait']:.1f}초\n"
+
+    text += "\n<b>서브시스템별 사용량</b>\n"
+    for name, item in status["subsystems"].items():
+        text += f"• {name} ({item['priority']}, 가중치 {item['weight']:g}): {item['used_last_minute']}회, 대기 {item['waiting']}\n"
+
+    return text
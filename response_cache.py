@@ -0,0 +1,160 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 캐시 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+CACHE_MAX_ENTRIES = int(os.getenv("GECKO_CACHE_MAX_ENTRIES", 2000))
+
+# 엔드포인트 유형별 기본 TTL(초). 0이면 캐시하지 않음
+DEFAULT_ENDPOINT_TTLS = {
+    "price": 30,            # /networks/{net}/tokens/{addr} (가격, 거래량)
+    "multi": 30,            # /networks/{net}/tokens/multi/{addrs}
+    "pools": 120,           # /tokens/{addr}/pools (유동성, 거래 수)
+    "trades": 60,           # /tokens/{addr}/trades
+    "ohlcv": 300,           # /tokens/{addr}/ohlcv/day
+    "holders": 600,         # /tokens/{addr}/holders
+    "info": 6 * 3600,       # /tokens/{addr}/info (소셜, 웹사이트, 설명)
+    "recently_updated": 0,  # 시장 스캔은 항상 최신 목록 필요
+    "other": 0,
+}
+
+
+# 환경 변수에서 TTL 읽기 (예: "price=15,info=3600")
+def _load_ttls() -> Dict[str, float]:
+    ttls = {name: float(ttl) for name, ttl in DEFAULT_ENDPOINT_TTLS.items()}
+    raw = os.getenv("GECKO_CACHE_TTLS", "")
+
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            ttls[name.strip()] = max(float(value), 0.0)
+        except ValueError:
+            logger.warning(f"잘못된 캐시 TTL 설정 무시: {item}")
+
+    return ttls
+
+
+class ResponseCache:
+    """
+    엔드포인트별 TTL과 LRU 제거를 지원하는 프로세스 내 응답 캐시입니다.
+    """
+
+    def __init__(self, max_entries: int, ttls: Dict[str, float]):
+        self.max_entries = max(max_entries, 1)
+        self.ttls = ttls
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+
+        # 통계 (엔드포인트 유형별)
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.ttls.get("other", 0.0))
+
+    def get(self, key: str, endpoint: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        캐시된 값을 반환합니다.
+
+        Args:
+            key (str): 요청 키 (URL + 쿼리)
+            endpoint (str): 엔드포인트 유형
+            max_age (float, optional): 허용할 최대 경과 시간(초). 생략 시 엔드포인트 TTL 사용
+
+        Returns:
+            Optional[Any]: 유효한 캐시 값, 없거나 만료되었으면 None
+        """
+        max_age = self.ttl_for(endpoint) if max_age is None else max_age
+        if max_age <= 0:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= max_age:
+            self._entries.move_to_end(key)
+            self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+            return entry[2]
+
+        self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+        return None
+
+    def set(self, key: str, endpoint: str, value: Any, stored_at: Optional[float] = None):
+        """
+        값을 캐시에 저장합니다. TTL이 0인 엔드포인트는 저장하지 않습니다.
+
+        Args:
+            key (str): 요청 키
+            endpoint (str): 엔드포인트 유형
+            value (Any): 저장할 값
+            stored_at (float, optional): 저장 시각(time.monotonic 기준). 생략 시 현재 시각
+        """
+        if self.ttl_for(endpoint) <= 0:
+            return
+
+        self._entries[key] = (stored_at or time.monotonic(), endpoint, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 항목 수, 제거 수, 엔드포인트별 적중/미스 수
+        """
+        endpoints = {}
+        for name in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(name, 0)
+            misses = self.misses.get(name, 0)
+            endpoints[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "endpoints": endpoints,
+        }
+
+
+# 프로세스 전역 응답 캐시
+response_cache = ResponseCache(max_entries=CACHE_MAX_ENTRIES, ttls=_load_ttls())
+
+
+# 캐시 상태 텍스트 생성 (텔레그램 메시지용)
+def format_cache_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 캐시 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    stats = response_cache.stats()
+
+    text = (
+        f"\n🗂 <b>응답 캐시</b>\n"
+        f"항목: <b>{stats['entries']}</b>/{stats['max_entries']}, 제거 {stats['evictions']}회\n"
+    )
+
+    for name, item in stats["endpoints"].items():
+        text += f"• {name}: 적중 {item['hits']} / 미스 {item['misses']} ({item['hit_rate'] * 100:.0f}%)\n"
+
+    return text
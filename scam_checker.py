@@ -1,6 +1,7 @@
 import logging
-import requests
 from datetime import datetime
+from gecko_client import api_get, GECKO_API_BASE
+from models import parse_token, parse_token_info, parse_pools, parse_holders, parse_trades
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -25,51 +26,47 @@ async def get_token_info(token_address, network="ethereum"):
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"토큰 정보 API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
-            if 'data' in data and 'attributes' in data['data']:
-                attrs = data['data']['attributes']
-                
+            token = parse_token(data)
+            if token is not None:
                 # 모든 가능한 데이터 추출
                 result = {
                     "success": True,
-                    "name": attrs.get('name', '알 수 없음'),
-                    "symbol": attrs.get('symbol', '???'),
-                    "price": float(attrs.get('price_usd') or 0),
+                    "name": token.name,
+                    "symbol": token.symbol,
+                    "price": token.price_usd,
                     "address": token_address,
-                    "decimals": int(attrs.get('decimals') or 0),
-                    "created_at": attrs.get('pool_created_at') or attrs.get('created_at'),
-                    "market_cap": float(attrs.get('market_cap_usd') or attrs.get('fdv_usd') or 0),
-                    "total_supply": float(attrs.get('total_supply') or 0),
-                    "circulating_supply": float(attrs.get('circulating_supply') or 0),
-                    "total_reserve_in_usd": float(attrs.get('total_reserve_in_usd') or 0),
-                    "coingecko_coin_id": attrs.get('coingecko_coin_id')
+                    "decimals": token.decimals,
+                    "created_at": token.created_at,
+                    "market_cap": token.market_cap,
+                    "total_supply": token.total_supply,
+                    "circulating_supply": token.circulating_supply,
+                    "total_reserve_in_usd": token.total_reserve_in_usd,
+                    "coingecko_coin_id": token.coingecko_coin_id
                 }
                 
                 # 추가 정보 조회 (token_info 엔드포인트)
-                token_info_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/info"
-                token_info_response = requests.get(token_info_url, headers=headers)
+                token_info_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/info"
+                token_info_response = await api_get(token_info_url)
                 
                 if token_info_response.status_code == 200:
-                    token_info_data = token_info_response.json()
-                    if 'data' in token_info_data and 'attributes' in token_info_data['data']:
-                        info_attrs = token_info_data['data']['attributes']
-                        
+                    info = parse_token_info(token_info_response.json())
+                    if info is not None:
                         # 소셜 미디어 정보 추가
-                        result["twitter_url"] = f"https://twitter.com/{info_attrs.get('twitter_handle')}" if info_attrs.get('twitter_handle') else None
-                        result["telegram_url"] = f"https://t.me/{info_attrs.get('telegram_handle')}" if info_attrs.get('telegram_handle') else None
-                        result["discord_url"] = info_attrs.get('discord_url')
-                        result["website_url"] = info_attrs.get('websites', [None])[0] if info_attrs.get('websites') else None
-                        result["description"] = info_attrs.get('description')
-                        result["image_url"] = info_attrs.get('image_url')
-                        result["gt_score"] = float(info_attrs.get('gt_score') or 0)
-                        result["categories"] = info_attrs.get('categories', [])
+                        result["twitter_url"] = f"https://twitter.com/{info.twitter_handle}" if info.twitter_handle else None
+                        result["telegram_url"] = f"https://t.me/{info.telegram_handle}" if info.telegram_handle else None
+                        result["discord_url"] = info.discord_url
+                        result["website_url"] = info.websites[0] if info.websites else None
+                        result["description"] = info.description
+                        result["image_url"] = info.image_url
+                        result["gt_score"] = info.gt_score
+                        result["categories"] = info.categories
                 
                 return result
             else:
@@ -94,30 +91,26 @@ async def get_token_pools(token_address, network="ethereum"):
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/pools"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/pools"
         
         logger.info(f"유동성 풀 API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
             if 'data' in data:
-                pools_data = []
-                
-                for pool in data['data']:
-                    if 'attributes' in pool:
-                        attrs = pool['attributes']
-                        pool_info = {
-                            "address": attrs.get('address', '알 수 없음'),
-                            "name": attrs.get('name', '알 수 없음'),
-                            "dex": attrs.get('dex_id', '알 수 없음').replace('_', ' ').title(),
-                            "liquidity": float(attrs.get('reserve_in_usd') or 0),
-                            "volume_24h": float(attrs.get('volume_usd_24h') or 0),
-                            "transactions_24h": int(attrs.get('transactions_24h') or 0),
-                            "price_change_24h": float(attrs.get('price_change_percentage_24h') or 0)
-                        }
-                        pools_data.append(pool_info)
+                pools_data = [
+                    {
+                        "address": pool.address,
+                        "name": pool.name,
+                        "dex": pool.dex_name,
+                        "liquidity": pool.reserve_in_usd,
+                        "volume_24h": pool.volume_24h,
+                        "transactions_24h": pool.transactions_24h,
+                        "price_change_24h": pool.price_change_24h
+                    }
+                    for pool in parse_pools(data)
+                ]
                 
                 return {
                     "success": True,
@@ -142,28 +135,24 @@ async def get_token_holders(token_address, network="ethereum", limit=10):
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/holders"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/holders"
         params = {"page": 1, "limit": limit}
         
         logger.info(f"홀더 정보 API 요청: {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = await api_get(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
             if 'data' in data:
-                holders_data = []
-                
-                for holder in data['data']:
-                    if 'attributes' in holder:
-                        attrs = holder['attributes']
-                        holder_info = {
-                            "address": attrs.get('address', '알 수 없음'),
-                            "balance": float(attrs.get('balance', 0) or 0),
-                            "percentage": float(attrs.get('percentage', 0) or 0),
-                            "is_contract": bool(attrs.get('is_contract', False))
-                        }
-                        holders_data.append(holder_info)
+                holders_data = [
+                    {
+                        "address": holder.address,
+                        "balance": holder.balance,
+                        "percentage": holder.percentage,
+                        "is_contract": holder.is_contract
+                    }
+                    for holder in parse_holders(data)
+                ]
                 
                 return {
                     "success": True,
@@ -188,29 +177,25 @@ async def get_token_trades(token_address, network="ethereum", limit=20):
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/trades"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/trades"
         params = {"page": 1, "limit": limit}
         
         logger.info(f"거래 내역 API 요청: {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = await api_get(url, params=params)
         
         if response.status_code == 200:
             data = response.json()
             if 'data' in data:
-                trades_data = []
-                
-                for trade in data['data']:
-                    if 'attributes' in trade:
-                        attrs = trade['attributes']
-                        trade_info = {
-                            "timestamp": attrs.get('timestamp'),
-                            "type": attrs.get('type', '알 수 없음'),
-                            "amount_usd": float(attrs.get('amount_usd', 0) or 0),
-                            "tx_hash": attrs.get('tx_hash', '알 수 없음'),
-                            "pool_name": attrs.get('pool_name', '알 수 없음')
-                        }
-                        trades_data.append(trade_info)
+                trades_data = [
+                    {
+                        "timestamp": trade.timestamp,
+                        "type": trade.kind,
+                        "amount_usd": trade.amount_usd,
+                        "tx_hash": trade.tx_hash,
+                        "pool_name": trade.pool_name
+                    }
+                    for trade in parse_trades(data)
+                ]
                 
                 return {
                     "success": True,
@@ -1,10 +1,11 @@
 import logging
 import asyncio
-import sqlite3
 from datetime import datetime, timedelta
-import requests
 import json
 from typing import Dict, List, Any, Tuple
+from gecko_client import api_get, GECKO_API_BASE
+from models import Token, parse_token, parse_token_info, parse_pools, parse_holders
+from db import get_connection, run_db
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -18,9 +19,9 @@ def get_all_tokens() -> List[Tuple[int, str, str]]:
     Returns:
         List[Tuple[int, str, str]]: (user_id, token_address, network) 형태의 튜플 리스트
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT user_id, token, network FROM tokens")
+    cursor.execute("SELECT user_id, token_address, network FROM subscriptions")
     tokens = cursor.fetchall()
     conn.close()
     return tokens
@@ -36,9 +37,9 @@ def get_user_tokens(user_id: int) -> List[Tuple[str, str]]:
     Returns:
         List[Tuple[str, str]]: (token_address, network) 형태의 튜플 리스트
     """
-    conn = sqlite3.connect('tokens.db')
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT token, network FROM tokens WHERE user_id = ?", (user_id,))
+    cursor.execute("SELECT token_address, network FROM subscriptions WHERE user_id = ?", (user_id,))
     tokens = cursor.fetchall()
     conn.close()
     return tokens
@@ -72,11 +73,10 @@ async def check_token_scam(token_address: str, network: str = "ethereum") -> Dic
         api_network = NETWORK_MAPPING.get(network.lower(), network.lower())
         
         # 토큰 기본 정보 조회
-        token_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}"
-        headers = {"Accept": "application/json"}
+        token_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}"
         
         logger.info(f"토큰 정보 API 요청: {token_url}")
-        token_response = requests.get(token_url, headers=headers)
+        token_response = await api_get(token_url)
         
         if token_response.status_code != 200:
             return {
@@ -84,46 +84,39 @@ async def check_token_scam(token_address: str, network: str = "ethereum") -> Dic
                 "error": f"토큰 정보를 찾을 수 없습니다. 상태 코드: {token_response.status_code}"
             }
         
-        token_data = token_response.json()
+        token = parse_token(token_response.json())
         
-        if 'data' not in token_data or 'attributes' not in token_data['data']:
+        if token is None:
             return {
                 "success": False,
                 "error": "API 응답에 필요한 데이터가 없습니다."
             }
         
-        token_attributes = token_data['data']['attributes']
-        token_name = token_attributes.get('name', '알 수 없음')
-        token_symbol = token_attributes.get('symbol', '???')
+        token_name = token.name
+        token_symbol = token.symbol
         
         # 토큰 추가 정보 조회 (token_info 엔드포인트)
-        token_info_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/info"
-        token_info_response = requests.get(token_info_url, headers=headers)
+        token_info_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/info"
+        token_info_response = await api_get(token_info_url)
         
         has_social_media = False
         has_website = False
         gt_score = 0
         
         if token_info_response.status_code == 200:
-            token_info_data = token_info_response.json()
-            if 'data' in token_info_data and 'attributes' in token_info_data['data']:
-                info_attrs = token_info_data['data']['attributes']
-                
+            info = parse_token_info(token_info_response.json())
+            if info is not None:
                 # 소셜 미디어 및 웹사이트 확인
-                has_twitter = bool(info_attrs.get('twitter_handle'))
-                has_telegram = bool(info_attrs.get('telegram_handle'))
-                has_discord = bool(info_attrs.get('discord_url'))
-                has_website = bool(info_attrs.get('websites'))
-                
-                has_social_media = has_twitter or has_telegram or has_discord
+                has_social_media = bool(info.twitter_handle or info.telegram_handle or info.discord_url)
+                has_website = bool(info.websites)
                 
                 # GeckoTerminal 점수 (신뢰도 지표)
-                gt_score = float(info_attrs.get('gt_score') or 0)
+                gt_score = info.gt_score
         
         # 풀 정보 조회
-        pools_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/pools"
+        pools_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/pools"
         logger.info(f"풀 정보 API 요청: {pools_url}")
-        pools_response = requests.get(pools_url, headers=headers)
+        pools_response = await api_get(pools_url)
         
         # 분석 데이터 초기화
         analysis = {
@@ -145,25 +138,21 @@ async def check_token_scam(token_address: str, network: str = "ethereum") -> Dic
         oldest_pool_date = None
         
         if pools_response.status_code == 200:
-            pools_data = pools_response.json()
+            pools = parse_pools(pools_response.json())
             
-            if 'data' in pools_data and pools_data['data']:
-                for pool in pools_data['data']:
-                    if 'attributes' in pool:
-                        attrs = pool['attributes']
-                        
-                        # 유동성 합산
-                        if attrs.get('reserve_in_usd'):
-                            total_liquidity += float(attrs.get('reserve_in_usd') or 0)
-                        
-                        # 풀 개수 카운트
-                        pool_count += 1
-                        
-                        # 가장 오래된 풀 날짜 확인
-                        if attrs.get('pool_created_at'):
-                            pool_date = datetime.fromisoformat(attrs.get('pool_created_at').replace("Z", "+00:00"))
-                            if oldest_pool_date is None or pool_date < oldest_pool_date:
-                                oldest_pool_date = pool_date
+            if pools:
+                for pool in pools:
+                    # 유동성 합산
+                    total_liquidity += pool.reserve_in_usd
+                    
+                    # 풀 개수 카운트
+                    pool_count += 1
+                    
+                    # 가장 오래된 풀 날짜 확인
+                    if pool.created_at:
+                        pool_date = datetime.fromisoformat(pool.created_at.replace("Z", "+00:00"))
+                        if oldest_pool_date is None or pool_date < oldest_pool_date:
+                            oldest_pool_date = pool_date
                 
                 analysis["liquidity"] = total_liquidity
                 
@@ -173,27 +162,19 @@ async def check_token_scam(token_address: str, network: str = "ethereum") -> Dic
                     analysis["days_since_creation"] = days_since_creation
         
         # 홀더 정보 조회
-        holders_url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/{token_address}/holders"
-        holders_response = requests.get(holders_url, headers=headers)
+        holders_url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/{token_address}/holders"
+        holders_response = await api_get(holders_url)
         
         if holders_response.status_code == 200:
-            holders_data = holders_response.json()
+            holders = parse_holders(holders_response.json())
             
-            if 'data' in holders_data and holders_data['data']:
+            if holders:
                 # 상위 홀더 비율 계산
-                if len(holders_data['data']) > 0 and 'attributes' in holders_data['data'][0]:
-                    top_holder = holders_data['data'][0]['attributes']
-                    if 'percentage' in top_holder:
-                        analysis["top_holder_percentage"] = float(top_holder['percentage'])
+                analysis["top_holder_percentage"] = holders[0].percentage
                 
                 # 상위 5개 홀더 비율 계산
-                if len(holders_data['data']) >= 5:
-                    top5_percentage = 0
-                    for i in range(min(5, len(holders_data['data']))):
-                        if 'attributes' in holders_data['data'][i] and 'percentage' in holders_data['data'][i]['attributes']:
-                            top5_percentage += float(holders_data['data'][i]['attributes']['percentage'])
-                    
-                    analysis["top5_percentage"] = top5_percentage
+                if len(holders) >= 5:
+                    analysis["top5_percentage"] = sum(holder.percentage for holder in holders[:5])
         
         # 스캠 지표 분석
         scam_indicators = []
@@ -301,11 +282,10 @@ async def get_multiple_tokens_info(token_addresses: List[str], network: str = "e
         addresses_str = ','.join(token_addresses)
         
         # API 엔드포인트 구성
-        url = f"https://api.geckoterminal.com/api/v2/networks/{api_network}/tokens/multi/{addresses_str}"
-        headers = {"Accept": "application/json"}
+        url = f"{GECKO_API_BASE}/networks/{api_network}/tokens/multi/{addresses_str}"
         
         logger.info(f"다중 토큰 정보 API 요청: {url}")
-        response = requests.get(url, headers=headers)
+        response = await api_get(url)
         
         if response.status_code == 200:
             data = response.json()
@@ -313,23 +293,23 @@ async def get_multiple_tokens_info(token_addresses: List[str], network: str = "e
             if 'data' in data:
                 tokens_data = {}
                 
-                for token in data['data']:
-                    if 'id' in token and 'attributes' in token:
-                        token_id = token['id'].split(':')[1] if ':' in token['id'] else token['id']  # 'eth:0x...' 형식에서 주소 부분만 추출
-                        attrs = token['attributes']
+                for resource in data['data']:
+                    if 'id' in resource and 'attributes' in resource:
+                        token_id = resource['id'].split(':')[1] if ':' in resource['id'] else resource['id']  # 'eth:0x...' 형식에서 주소 부분만 추출
+                        token = Token(resource['attributes'])
                         
                         tokens_data[token_id] = {
                             "success": True,
-                            "name": attrs.get('name', '알 수 없음'),
-                            "symbol": attrs.get('symbol', '???'),
-                            "price": float(attrs.get('price_usd') or 0),
+                            "name": token.name,
+                            "symbol": token.symbol,
+                            "price": token.price_usd,
                             "address": token_id,
-                            "decimals": int(attrs.get('decimals') or 0),
-                            "created_at": attrs.get('pool_created_at') or attrs.get('created_at'),
-                            "market_cap": float(attrs.get('market_cap_usd') or attrs.get('fdv_usd') or 0),
-                            "total_supply": float(attrs.get('total_supply') or 0),
-                            "total_reserve_in_usd": float(attrs.get('total_reserve_in_usd') or 0),
-                            "coingecko_coin_id": attrs.get('coingecko_coin_id')
+                            "decimals": token.decimals,
+                            "created_at": token.created_at,
+                            "market_cap": token.market_cap,
+                            "total_supply": token.total_supply,
+                            "total_reserve_in_usd": token.total_reserve_in_usd,
+                            "coingecko_coin_id": token.coingecko_coin_id
                         }
                 
                 return {
@@ -357,7 +337,7 @@ async def check_all_tokens_scam() -> Dict[str, Any]:
     """
     try:
         # 모든 토큰 가져오기
-        all_tokens = get_all_tokens()
+        all_tokens = await run_db(get_all_tokens)
         
         if not all_tokens:
             return {
@@ -499,7 +479,7 @@ async def check_user_tokens_scam(user_id: int) -> Dict[str, Any]:
     """
     try:
         # 사용자의 토큰 가져오기
-        user_tokens = get_user_tokens(user_id)
+        user_tokens = await run_db(get_user_tokens, user_id)
         
         if not user_tokens:
             return {
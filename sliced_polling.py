@@ -0,0 +1,307 @@
+import os
+import math
+import time
+import zlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rate_limiter import limiter
+from market_data import MULTI_BATCH_SIZE
+from adaptive_polling import asset_key, adaptive_policy
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 가격 알림 수집 방식 (환경 변수로 조정 가능)
+PRICE_POLL_MODE = os.getenv("PRICE_POLL_MODE", "sliced")  # sliced: 주기 전체에 나눠 조회, burst: 주기마다 한 번에 조회
+PRICE_POLL_SLOT_SECONDS = float(os.getenv("PRICE_POLL_SLOT_SECONDS", 15))  # 슬롯 하나의 길이(초)
+
+
+class SlicedPoller:
+    """
+    추적 자산을 주기(interval) 안의 시간 슬롯에 나눠 배정하여, 슬롯마다 자기 몫만 조회하도록 하는 분할 수집기입니다.
+    자산은 해시 순서로 정렬한 뒤 연속 구간으로 슬롯에 배정하므로 슬롯별 자산 수가 고르고,
+    자산이 추가/제거되어도 대부분의 자산은 같은 슬롯에 남습니다.
+    한 번 조회한 자산은 주기가 지나면 다시 조회합니다. 적응형 조회 시에는 같은 네트워크, 같은 조회 간격의 자산을
+    배치 크기만큼 묶어 묶음마다 고정된 슬롯에 함께 조회하므로, 간격이 달라도 요청이 흩어지지 않습니다.
+    """
+
+    def __init__(self, name: str, interval: float, slot_seconds: float, subsystem: str,
+                 batch_size: int = MULTI_BATCH_SIZE):
+        self.name = name
+        self.interval = max(interval, 1.0)
+        self.ticks = max(int(round(self.interval / max(slot_seconds, 1.0))), 1)
+        self.slot_seconds = self.interval / self.ticks
+        self.subsystem = subsystem
+        self.batch_size = max(batch_size, 1)
+
+        self.cycle_started: Optional[float] = None
+        self.next_tick = 0
+        self.epoch: Optional[float] = None
+        self.last_global_tick = -1
+        self._last_polled: Dict[Tuple[str, str], float] = {}
+        self._last_refreshed: Dict[Tuple[str, str], float] = {}
+
+        # 통계
+        self.cycles = 0
+        self.asset_count = 0
+        self.groups = 0
+        self.last_slot_size = 0
+        self.max_slot_size = 0
+        self.fastest_interval = self.interval
+        self.slowest_interval = self.interval
+        self.last_refresh_gap = 0.0
+        self.max_refresh_gap = 0.0
+        self.over_capacity = False
+
+    def capacity(self) -> int:
+        """
+        한 주기 동안 이 서브시스템의 보장 예산으로 조회할 수 있는 자산 수를 반환합니다.
+
+        Returns:
+            int: 보장 요청 수 × tokens/multi 배치 크기
+        """
+        return int(limiter.guaranteed_rate(self.subsystem) * self.interval * self.batch_size)
+
+    def _start_cycle(self, now: float, asset_count: int):
+        if self.cycle_started is None or now - self.cycle_started >= 2 * self.interval:
+            # 처음 시작하거나 한 주기 이상 밀리면 현재 시각부터 새 주기 시작
+            self.cycle_started = now
+        else:
+            self.cycle_started += self.interval
+        self.next_tick = 0
+        self.cycles += 1
+
+        # 자산이 적으면 배치 하나를 채울 만큼만 슬롯을 사용하여 요청 수를 늘리지 않음
+        self.groups = min(self.ticks, max(-(-asset_count // self.batch_size), 1))
+
+        capacity = self.capacity()
+        self.over_capacity = asset_count > capacity
+        if self.over_capacity:
+            logger.warning(
+                f"{self.name}: 추적 자산 {asset_count}개가 {self.interval:.0f}초 주기에 조회 가능한 "
+                f"{capacity}개를 넘어 자산별 갱신 주기가 {self.interval:.0f}초보다 길어집니다."
+            )
+
+    def _tick_of(self, rank: int, count: int) -> int:
+        group = rank * self.groups // count
+        return group * self.ticks // self.groups
+
+    def _class_phases(self, ranked: List[Dict[str, Any]],
+                      intervals: Dict[Tuple[str, str], float]) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        # 적응형 조회: (네트워크, 조회 간격)이 같은 자산을 해시 순서대로 배치 크기씩 묶고, 묶음마다 주기 안의 슬롯 하나를 배정
+        members: Dict[Tuple[str, int], int] = {}
+        phases = {}
+        for asset in ranked:
+            key = asset_key(asset["token_address"], asset["network"])
+            if key not in intervals:
+                continue
+            exponent = round(math.log2(intervals[key] / self.interval))
+            period = max(int(round(self.ticks * 2 ** exponent)), 1)
+            network = key[0]
+            position = members.get((network, exponent), 0)
+            members[(network, exponent)] = position + 1
+            chunk = position // self.batch_size
+            phases[key] = (period, zlib.crc32(f"{network}:{exponent}:{chunk}".encode()) % period)
+        return phases
+
+    def due(self, assets: Iterable[Dict[str, Any]], now: Optional[float] = None,
+            intervals: Optional[Dict[Tuple[str, str], float]] = None) -> List[Dict[str, Any]]:
+        """
+        조회할 차례가 된 자산을 반환합니다. 처음 보는 자산은 도래한 슬롯에 배정된 경우, 이미 조회한 자산은
+        주기가 지난 경우(적응형 조회 시에는 묶음의 슬롯이 도래한 경우) 반환합니다.
+        실행이 늦어 지나간 슬롯이 있으면 함께 반환하여 건너뛰지 않습니다.
+
+        Args:
+            assets (Iterable[Dict[str, Any]]): token_address, network 키를 가진 추적 자산 목록
+            now (float, optional): 현재 시각 (time.monotonic 기준)
+            intervals (Dict[Tuple[str, str], float], optional): asset_key별 조회 간격(초). 없는 자산은 주기 사용
+
+        Returns:
+            List[Dict[str, Any]]: 이번에 조회할 자산 목록
+        """
+        now = time.monotonic() if now is None else now
+        ranked = sorted(
+            assets,
+            key=lambda asset: zlib.crc32("{}:{}".format(*asset_key(asset["token_address"], asset["network"])).encode())
+        )
+        self.asset_count = len(ranked)
+
+        if self.cycle_started is None or (self.next_tick >= self.ticks and now >= self.cycle_started + self.interval):
+            self._start_cycle(now, len(ranked))
+
+        due_tick = min(int((now - self.cycle_started) / self.slot_seconds) + 1, self.ticks)
+        first_tick, self.next_tick = self.next_tick, max(self.next_tick, due_tick)
+
+        if self.epoch is None:
+            self.epoch = now
+        global_tick = int((now - self.epoch) / self.slot_seconds)
+        previous_tick, self.last_global_tick = self.last_global_tick, global_tick
+
+        intervals = intervals or {}
+        phases = {}
+        if intervals:
+            self.fastest_interval = min(intervals.values())
+            self.slowest_interval = max(intervals.values())
+            phases = self._class_phases(ranked, intervals)
+
+        selected = []
+        for rank, asset in enumerate(ranked):
+            key = asset_key(asset["token_address"], asset["network"])
+            last_polled = self._last_polled.get(key)
+            if last_polled is None:
+                # 처음 보는 자산은 슬롯 배정에 따라 첫 조회 시각을 분산
+                if first_tick <= self._tick_of(rank, len(ranked)) < self.next_tick:
+                    selected.append(asset)
+            elif key in phases:
+                period, phase = phases[key]
+                elapsed = now - last_polled
+                # 묶음의 슬롯이 지나간 구간에 있었으면 조회 (묶음 구성이 바뀌어 슬롯을 놓친 자산은 1.5배 간격에서 조회)
+                slot_passed = global_tick - previous_tick >= period or any(
+                    tick % period == phase for tick in range(previous_tick + 1, global_tick + 1)
+                )
+                if (slot_passed and elapsed >= intervals[key] / 2) or elapsed >= intervals[key] * 1.5:
+                    selected.append(asset)
+            elif now - last_polled >= self.interval - self.slot_seconds / 2:
+                # 이후에는 마지막 조회 시각 기준으로 반복하므로 처음 분산된 위상이 유지됨
+                selected.append(asset)
+
+        for asset in selected:
+            self._last_polled[asset_key(asset["token_address"], asset["network"])] = now
+
+        # 더 이상 추적하지 않는 자산 정리
+        if len(self._last_polled) > len(ranked):
+            current = {asset_key(asset["token_address"], asset["network"]) for asset in ranked}
+            for key in [key for key in self._last_polled if key not in current]:
+                self._last_polled.pop(key, None)
+                self._last_refreshed.pop(key, None)
+
+        if selected:
+            self.last_slot_size = len(selected)
+            self.max_slot_size = max(self.max_slot_size, len(selected))
+        return selected
+
+    def max_age(self, assets: Iterable[Dict[str, Any]], intervals: Optional[Dict[Tuple[str, str], float]],
+                freshness: float) -> float:
+        """
+        이번에 조회할 자산에 허용할 가격의 최대 경과 시간(초)을 반환합니다.
+        적응형 조회 간격이 소비자 신선도보다 짧은 자산이 있으면, 캐시된 가격을 재사용해 조회를 앞당긴 의미가
+        없어지지 않도록 가장 짧은 간격의 절반으로 줄입니다.
+
+        Args:
+            assets (Iterable[Dict[str, Any]]): 이번에 조회할 자산 목록 (due 반환값)
+            intervals (Dict[Tuple[str, str], float], optional): asset_key별 조회 간격(초)
+            freshness (float): 소비자 신선도(초)
+
+        Returns:
+            float: 최대 경과 시간(초)
+        """
+        if not intervals:
+            return freshness
+        shortest = min(
+            (intervals.get(asset_key(asset["token_address"], asset["network"]), self.interval) for asset in assets),
+            default=self.interval
+        )
+        return min(freshness, shortest / 2) if shortest < freshness else freshness
+
+    def mark_refreshed(self, assets: Iterable[Tuple[str, str]], now: Optional[float] = None):
+        """
+        가격 조회에 성공한 자산을 기록하여 자산별 갱신 간격을 측정합니다.
+
+        Args:
+            assets (Iterable[Tuple[str, str]]): (토큰 주소, 네트워크) 목록
+            now (float, optional): 현재 시각 (time.monotonic 기준)
+        """
+        now = time.monotonic() if now is None else now
+        for token_address, network in assets:
+            key = asset_key(token_address, network)
+            previous = self._last_refreshed.get(key)
+            if previous is not None:
+                self.last_refresh_gap = now - previous
+                self.max_refresh_gap = max(self.max_refresh_gap, self.last_refresh_gap)
+            self._last_refreshed[key] = now
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        분할 수집 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 자산 수, 사용 슬롯 수, 슬롯별 자산 수, 조회 가능 자산 수, 자산별 조회 간격 범위,
+            가장 오래된 가격의 경과 시간(초) 등
+        """
+        now = time.monotonic()
+        return {
+            "interval": self.interval,
+            "slot_seconds": self.slot_seconds,
+            "ticks": self.ticks,
+            "groups": self.groups,
+            "cycles": self.cycles,
+            "assets": self.asset_count,
+            "capacity": self.capacity(),
+            "over_capacity": self.over_capacity,
+            "last_slot_size": self.last_slot_size,
+            "max_slot_size": self.max_slot_size,
+            "fastest_interval": self.fastest_interval,
+            "slowest_interval": self.slowest_interval,
+            "oldest_age": max((now - refreshed for refreshed in self._last_refreshed.values()), default=0.0),
+            "last_refresh_gap": self.last_refresh_gap,
+            "max_refresh_gap": self.max_refresh_gap,
+        }
+
+
+# 등록된 분할 수집기 (상태 표시용)
+pollers: Dict[str, SlicedPoller] = {}
+
+
+# 분할 수집기 생성
+def create_poller(name: str, interval: float, subsystem: str,
+                  slot_seconds: float = PRICE_POLL_SLOT_SECONDS) -> SlicedPoller:
+    """
+    분할 수집기를 만들고 /apistatus 표시 목록에 등록합니다.
+
+    Args:
+        name (str): 수집기 이름
+        interval (float): 자산마다 한 번씩 조회할 주기(초)
+        subsystem (str): API 예산 서브시스템 (조회 가능 자산 수 계산에 사용)
+        slot_seconds (float, optional): 슬롯 길이(초)
+
+    Returns:
+        SlicedPoller: 생성된 수집기
+    """
+    poller = SlicedPoller(name, interval, slot_seconds, subsystem)
+    pollers[name] = poller
+    return poller
+
+
+# 분할 수집 상태 텍스트 생성 (텔레그램 메시지용)
+def format_polling_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 분할 수집 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열 (등록된 수집기가 없으면 빈 문자열)
+    """
+    # 이 프로세스에서 실행 중인 수집기만 표시 (다중 프로세스 모드의 프런트엔드는 수집하지 않음)
+    active = {name: poller for name, poller in pollers.items() if poller.cycles}
+    if not active:
+        return ""
+
+    text = "\n🕸 <b>분할 수집</b>\n"
+    for name, poller in active.items():
+        stats = poller.stats()
+        text += (
+            f"• {name}: 자산 {stats['assets']}개 / 주기당 최대 {stats['capacity']}개, "
+            f"슬롯 {stats['groups']}/{stats['ticks']}개 ({stats['slot_seconds']:.0f}초, 최근 {stats['last_slot_size']}개)\n"
+            f"  가장 오래된 가격 {stats['oldest_age']:.0f}초, 갱신 간격 최근 {stats['last_refresh_gap']:.0f}초/"
+            f"최대 {stats['max_refresh_gap']:.0f}초\n"
+        )
+        reasons = adaptive_policy.stats()["reasons"].get(name)
+        if reasons:
+            text += (
+                f"  적응형 조회 간격 {stats['fastest_interval']:.0f}~{stats['slowest_interval']:.0f}초 ("
+                + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())) + ")\n"
+            )
+        if stats["over_capacity"]:
+            text += f"  ⚠️ 자산 수가 {stats['interval']:.0f}초 주기 예산을 넘었습니다.\n"
+
+    return text
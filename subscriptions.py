@@ -0,0 +1,250 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from db import get_connection
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 추적 자산의 알림 기준 가격 갱신 (알림을 보냈거나 기준 가격이 PRICE_CHECK_INTERVAL보다 오래된 경우, write_queue로 기록)
+UPDATE_ASSET_PRICE_SQL = """
+UPDATE tracked_assets SET last_price = ?, name = ?, symbol = ?, last_updated = ?
+WHERE token_address = ? AND network = ?
+"""
+
+# 추적 자산 이름/심볼만 갱신 (알림 기준 가격은 유지)
+UPDATE_ASSET_INFO_SQL = """
+UPDATE tracked_assets SET name = ?, symbol = ?
+WHERE token_address = ? AND network = ?
+"""
+
+
+# 저장된 시각 변환 (datetime 문자열 또는 CURRENT_TIMESTAMP 기본값)
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+# 구독/추적 자산 테이블 초기화
+def init_subscription_db():
+    """
+    추적 자산(tracked_assets)과 사용자 구독(subscriptions) 테이블을 초기화합니다.
+    tracked_assets는 (토큰 주소, 네트워크)당 한 행으로 가격 상태와 메타데이터를 보관하고,
+    subscriptions는 어떤 사용자가 어떤 자산을 추적하는지만 보관합니다.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tracked_assets (
+        token_address TEXT,
+        network TEXT,
+        name TEXT,
+        symbol TEXT,
+        last_price REAL DEFAULT 0,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (token_address, network)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS subscriptions (
+        user_id INTEGER,
+        token_address TEXT,
+        network TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, token_address, network)
+    )
+    ''')
+
+    # 자산별 구독자 조회 (가격 알림 전송)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_asset ON subscriptions (token_address, network)")
+
+    conn.commit()
+    conn.close()
+
+
+# 구독 추가
+def add_subscription(user_id: int, token_address: str, network: str, price_info: Dict[str, Any]):
+    """
+    사용자의 토큰 구독을 추가합니다. 자산이 처음 추적되면 tracked_assets에 추가하고,
+    이미 추적 중이면 이름/심볼만 갱신합니다 (기존 구독자의 알림 기준 가격은 유지).
+
+    Args:
+        user_id (int): 사용자 ID
+        token_address (str): 토큰 주소
+        network (str): 네트워크 이름
+        price_info (Dict[str, Any]): 현재 가격 정보 (price, name, symbol)
+    """
+    now = datetime.now()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            """
+            INSERT INTO tracked_assets (token_address, network, name, symbol, last_price, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (token_address, network) DO UPDATE SET
+                name = excluded.name,
+                symbol = excluded.symbol
+            """,
+            (token_address, network, price_info.get("name"), price_info.get("symbol"), price_info["price"], now)
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO subscriptions (user_id, token_address, network, created_at) VALUES (?, ?, ?, ?)",
+            (user_id, token_address, network, now)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# 저장된 구독 찾기
+def find_subscription(user_id: int, token_address: str, network: str,
+                      case_insensitive: bool = False) -> Optional[Tuple[str, str]]:
+    """
+    사용자의 구독을 찾습니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        token_address (str): 토큰 주소
+        network (str): 네트워크 이름
+        case_insensitive (bool, optional): 대소문자를 구분하지 않고 찾을지 여부
+
+    Returns:
+        Optional[Tuple[str, str]]: 저장된 (토큰 주소, 네트워크), 없으면 None
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    if case_insensitive:
+        cursor.execute(
+            "SELECT token_address, network FROM subscriptions "
+            "WHERE user_id = ? AND LOWER(token_address) = LOWER(?) AND LOWER(network) = LOWER(?)",
+            (user_id, token_address, network)
+        )
+    else:
+        cursor.execute(
+            "SELECT token_address, network FROM subscriptions WHERE user_id = ? AND token_address = ? AND network = ?",
+            (user_id, token_address, network)
+        )
+
+    row = cursor.fetchone()
+    conn.close()
+    return tuple(row) if row else None
+
+
+# 구독 제거
+def remove_subscription(user_id: int, token_address: str, network: str) -> bool:
+    """
+    사용자의 구독을 제거합니다. 더 이상 구독자가 없는 자산은 tracked_assets에서도 제거합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        token_address (str): 저장된 토큰 주소
+        network (str): 저장된 네트워크 이름
+
+    Returns:
+        bool: 제거된 구독이 있으면 True
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            "DELETE FROM subscriptions WHERE user_id = ? AND token_address = ? AND network = ?",
+            (user_id, token_address, network)
+        )
+        removed = cursor.rowcount > 0
+
+        cursor.execute(
+            """
+            DELETE FROM tracked_assets
+            WHERE token_address = ? AND network = ?
+            AND NOT EXISTS (SELECT 1 FROM subscriptions s WHERE s.token_address = ? AND s.network = ?)
+            """,
+            (token_address, network, token_address, network)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return removed
+
+
+# 사용자의 구독 목록
+def get_user_subscriptions(user_id: int) -> List[Tuple[str, str]]:
+    """
+    사용자가 구독 중인 자산 목록을 가져옵니다.
+
+    Args:
+        user_id (int): 사용자 ID
+
+    Returns:
+        List[Tuple[str, str]]: (토큰 주소, 네트워크) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT token_address, network FROM subscriptions WHERE user_id = ?", (user_id,))
+    subscriptions = cursor.fetchall()
+    conn.close()
+    return subscriptions
+
+
+# 전체 구독 목록
+def get_all_subscriptions() -> List[Tuple[int, str, str]]:
+    """
+    모든 사용자의 구독 목록을 가져옵니다.
+
+    Returns:
+        List[Tuple[int, str, str]]: (사용자 ID, 토큰 주소, 네트워크) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id, token_address, network FROM subscriptions")
+    subscriptions = cursor.fetchall()
+    conn.close()
+    return subscriptions
+
+
+# 추적 자산과 구독자 목록
+def get_subscribed_assets(with_subscribers: bool = False) -> List[Dict[str, Any]]:
+    """
+    추적 중인 자산 목록을 가져옵니다. 수집기는 자산마다 한 번만 처리하고 구독자에게 결과를 나눠 보냅니다.
+
+    Args:
+        with_subscribers (bool, optional): 자산별 구독자 ID 목록을 포함할지 여부
+
+    Returns:
+        List[Dict[str, Any]]: token_address, network, name, symbol, last_price(알림 기준 가격),
+            last_updated(기준 가격을 정한 시각) (및 subscribers) 목록
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT token_address, network, name, symbol, last_price, last_updated FROM tracked_assets")
+
+    assets = [
+        {
+            "token_address": token_address, "network": network, "name": name, "symbol": symbol,
+            "last_price": last_price or 0.0, "last_updated": _parse_timestamp(last_updated),
+        }
+        for token_address, network, name, symbol, last_price, last_updated in cursor.fetchall()
+    ]
+
+    if with_subscribers:
+        subscribers: Dict[Tuple[str, str], List[int]] = {}
+        cursor.execute("SELECT user_id, token_address, network FROM subscriptions")
+        for user_id, token_address, network in cursor.fetchall():
+            subscribers.setdefault((token_address, network), []).append(user_id)
+
+        for asset in assets:
+            asset["subscribers"] = subscribers.get((asset["token_address"], asset["network"]), [])
+
+    conn.close()
+    return assets
@@ -0,0 +1,486 @@
+import os
+import json
+import time
+import zlib
+import signal
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from db import get_connection, run_db, db_executor, close_connection
+from rate_limiter import limiter
+from adaptive_polling import asset_key
+from job_scheduler import job_scheduler
+from sliced_polling import pollers
+from write_behind import write_queue
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 다중 프로세스 설정 (환경 변수로 조정 가능)
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", 0))  # 수집 워커 프로세스 수 (0이면 한 프로세스에서 모두 실행)
+WORKER_SHARD_BY = os.getenv("WORKER_SHARD_BY", "network")  # network: 네트워크별, hash: 자산 해시 구간별 분할
+WORKER_NETWORKS = os.getenv("WORKER_NETWORKS", "")  # 워커별 네트워크 직접 지정 (예: "solana,base;ethereum,bsc")
+WORKER_HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", 30))  # 워커 상태 기록 간격(초)
+WORKER_FRONTEND_BUDGET = float(os.getenv("WORKER_FRONTEND_BUDGET", 0.2))  # 프런트엔드(명령어)에 남길 API 한도 비율
+WORKER_REQUEST_POLL_SECONDS = float(os.getenv("WORKER_REQUEST_POLL_SECONDS", 2))  # 워커가 즉시 실행 요청을 확인하는 간격(초)
+WORKER_REQUEST_TIMEOUT = float(os.getenv("WORKER_REQUEST_TIMEOUT", 900))  # 즉시 실행 요청의 결과를 기다리는 최대 시간(초)
+
+# 워커 상태 기록 (워커마다 한 행)
+WORKER_STATUS_UPSERT_SQL = """
+INSERT OR REPLACE INTO worker_status (worker_id, pid, shard, started_at, heartbeat_at, stats)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class Shard:
+    """
+    수집 워커 하나가 담당하는 자산 범위입니다.
+    network 방식은 네트워크 단위로, hash 방식은 (네트워크, 토큰 주소) 해시 구간 단위로 나눕니다.
+    """
+
+    def __init__(self, index: int, count: int, mode: str = "network", assignment: Optional[Dict[str, int]] = None):
+        self.index = index
+        self.count = max(count, 1)
+        self.mode = mode
+        self.assignment = assignment or {}  # 네트워크 → 워커 번호 (network 방식)
+
+    @property
+    def primary(self) -> bool:
+        # 네트워크와 관계없는 전역 작업(일일 요약, DB 유지보수)은 첫 번째 워커만 실행
+        return self.index == 0
+
+    def owns(self, network: str, token_address: Optional[str] = None) -> bool:
+        """
+        자산(또는 토큰 주소를 생략하면 네트워크 단위 작업)이 이 워커 담당인지 확인합니다.
+        """
+        network = network.lower()
+        if self.mode == "hash" and token_address is not None:
+            return zlib.crc32("{}:{}".format(*asset_key(token_address, network)).encode()) % self.count == self.index
+        if network in self.assignment:
+            return self.assignment[network] == self.index
+        # 지정되지 않은 네트워크는 이름 해시로 배정
+        return zlib.crc32(network.encode()) % self.count == self.index
+
+    def describe(self) -> str:
+        if self.mode == "hash":
+            return f"hash {self.index}/{self.count}"
+        networks = sorted(network for network, index in self.assignment.items() if index == self.index)
+        return ",".join(networks) or f"network {self.index}/{self.count}"
+
+
+# 현재 프로세스가 담당하는 범위 (None이면 전체: 단일 프로세스 모드 또는 프런트엔드)
+current_shard: Optional[Shard] = None
+
+
+# 현재 프로세스 담당 여부
+def owns(network: str, token_address: Optional[str] = None) -> bool:
+    """
+    자산이나 네트워크가 현재 프로세스 담당인지 확인합니다. 단일 프로세스 모드에서는 항상 True입니다.
+
+    Args:
+        network (str): 네트워크 이름
+        token_address (str, optional): 토큰 주소. 생략 시 네트워크 단위로 판단
+
+    Returns:
+        bool: 담당 여부
+    """
+    return current_shard is None or current_shard.owns(network, token_address)
+
+
+# 담당 자산만 남기기
+def shard_filter(items: Iterable[Any], network: Callable[[Any], str],
+                 token_address: Optional[Callable[[Any], str]] = None) -> List[Any]:
+    """
+    목록에서 현재 프로세스 담당 항목만 남깁니다.
+
+    Args:
+        items (Iterable[Any]): 자산, 페어 등의 목록
+        network (Callable[[Any], str]): 항목의 네트워크를 꺼내는 함수
+        token_address (Callable[[Any], str], optional): 항목의 토큰 주소를 꺼내는 함수 (hash 방식에 사용)
+
+    Returns:
+        List[Any]: 담당 항목 목록
+    """
+    if current_shard is None:
+        return list(items)
+    return [
+        item for item in items
+        if current_shard.owns(network(item), token_address(item) if token_address else None)
+    ]
+
+
+# 워커별 네트워크 배정
+def assign_networks(networks: Iterable[str], count: int) -> Dict[str, int]:
+    """
+    네트워크를 워커에 배정합니다. WORKER_NETWORKS가 있으면 그대로 따르고, 없으면 순서대로 돌아가며 배정합니다.
+
+    Args:
+        networks (Iterable[str]): 지원 네트워크 목록
+        count (int): 워커 수
+
+    Returns:
+        Dict[str, int]: 네트워크 → 워커 번호
+    """
+    assignment = {}
+    if WORKER_NETWORKS:
+        for index, group in enumerate(WORKER_NETWORKS.split(";")):
+            for network in group.split(","):
+                if network.strip():
+                    assignment[network.strip().lower()] = index % count
+        return assignment
+
+    for position, network in enumerate(networks):
+        assignment[network.lower()] = position % count
+    return assignment
+
+
+# 워커 상태 테이블 초기화
+def init_worker_db():
+    """
+    워커별 상태(하트비트와 지표)를 기록하는 테이블을 초기화합니다.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS worker_status (
+        worker_id INTEGER PRIMARY KEY,
+        pid INTEGER,
+        shard TEXT,
+        started_at INTEGER,
+        heartbeat_at INTEGER,
+        stats TEXT
+    )
+    ''')
+
+    # 프런트엔드가 워커에 보내는 작업 즉시 실행 요청 (/scan_market 등 관리자 명령어)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS worker_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        worker_id INTEGER,
+        job TEXT,
+        requested_at INTEGER,
+        started_at INTEGER,
+        finished_at INTEGER,
+        result TEXT
+    )
+    ''')
+
+    conn.commit()
+    conn.close()
+
+
+# 워커 상태 기록
+def save_worker_status(worker_id: int, pid: int, shard: str, started_at: float, stats: Dict[str, Any]):
+    conn = get_connection()
+    conn.execute(
+        WORKER_STATUS_UPSERT_SQL,
+        (worker_id, pid, shard, int(started_at), int(time.time()), json.dumps(stats))
+    )
+    conn.commit()
+    conn.close()
+
+
+# 이전 실행의 워커 상태 삭제
+def clear_worker_status():
+    conn = get_connection()
+    conn.execute("DELETE FROM worker_status")
+    conn.commit()
+    conn.close()
+
+
+# 워커 상태 조회
+def get_worker_status() -> List[Dict[str, Any]]:
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT worker_id, pid, shard, started_at, heartbeat_at, stats FROM worker_status ORDER BY worker_id")
+
+    workers = [
+        {"worker_id": worker_id, "pid": pid, "shard": shard, "started_at": started_at,
+         "heartbeat_at": heartbeat_at, "stats": json.loads(stats or "{}")}
+        for worker_id, pid, shard, started_at, heartbeat_at, stats in cursor.fetchall()
+    ]
+    conn.close()
+    return workers
+
+
+# 작업 즉시 실행 요청 추가
+def add_worker_requests(job: str, worker_ids: Iterable[int]) -> List[int]:
+    conn = get_connection()
+    now = int(time.time())
+    ids = [
+        conn.execute(
+            "INSERT INTO worker_requests (worker_id, job, requested_at) VALUES (?, ?, ?)", (worker_id, job, now)
+        ).lastrowid
+        for worker_id in worker_ids
+    ]
+    conn.commit()
+    conn.close()
+    return ids
+
+
+# 워커에 도착한 요청 가져오기 (가져간 요청은 시작 시각을 기록하여 다시 가져가지 않음)
+def take_worker_requests(worker_id: int) -> List[tuple]:
+    conn = get_connection()
+    requests = conn.execute(
+        "SELECT id, job FROM worker_requests WHERE worker_id = ? AND started_at IS NULL ORDER BY id", (worker_id,)
+    ).fetchall()
+    if requests:
+        conn.executemany(
+            "UPDATE worker_requests SET started_at = ? WHERE id = ?", [(int(time.time()), request_id) for request_id, _ in requests]
+        )
+        conn.commit()
+    conn.close()
+    return requests
+
+
+# 요청 결과 기록
+def finish_worker_request(request_id: int, result: Dict[str, Any]):
+    conn = get_connection()
+    conn.execute(
+        "UPDATE worker_requests SET finished_at = ?, result = ? WHERE id = ?",
+        (int(time.time()), json.dumps(result, default=str), request_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+# 요청 결과 조회 (끝난 요청은 결과를 읽은 뒤 삭제)
+def collect_worker_requests(request_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    conn = get_connection()
+    placeholders = ",".join("?" * len(request_ids))
+    rows = conn.execute(
+        f"SELECT id, result FROM worker_requests WHERE id IN ({placeholders}) AND finished_at IS NOT NULL", request_ids
+    ).fetchall()
+    if rows:
+        conn.executemany("DELETE FROM worker_requests WHERE id = ?", [(request_id,) for request_id, _ in rows])
+        conn.commit()
+    conn.close()
+    return {request_id: json.loads(result or "{}") for request_id, result in rows}
+
+
+# 현재 워커 지표 수집
+def _collect_stats() -> Dict[str, Any]:
+    # resource 모듈은 유닉스 전용이므로 여기서 가져와, 없으면(Windows) CPU 시간만 보고
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_seconds, max_rss_mb = usage.ru_utime + usage.ru_stime, usage.ru_maxrss / 1024
+    except ImportError:
+        cpu_seconds, max_rss_mb = time.process_time(), 0.0
+    budget = limiter.status()
+
+    return {
+        "cpu_seconds": cpu_seconds,
+        "max_rss_mb": max_rss_mb,
+        "api_used_last_minute": budget["used_last_minute"],
+        "api_limit_per_minute": budget["limit_per_minute"],
+        "write_backlog": write_queue.backlog,
+        "db_queued": db_executor.stats()["queued"],
+        "jobs": {
+            job["name"]: {"runs": job["runs"], "failures": job["failures"] + job["timeouts"],
+                          "last_duration": job["last_duration"], "max_lag": job["max_lag"]}
+            for job in job_scheduler.stats()
+        },
+        "assets": {name: poller.stats()["assets"] for name, poller in pollers.items()},
+    }
+
+
+# 워커 프로세스 본체
+async def _run_worker(worker_id: int, shard: Shard):
+    global current_shard
+    current_shard = shard
+
+    # 수집 작업은 main 모듈에 정의되어 있으므로 워커 안에서 가져옴 (봇 업데이트 처리는 하지 않음)
+    import main as app
+
+    # 프런트엔드 몫을 뺀 API 한도(분당 한도와 순간 허용량)를 워커끼리 나눠 사용
+    # 429 일시 정지와 회로 차단 상태는 프로세스마다 따로 유지됨 (network 방식에서는 네트워크별 엔드포인트를 한 워커만 호출)
+    limiter.scale((1 - WORKER_FRONTEND_BUDGET) / shard.count)
+
+    started_at = time.time()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    async def heartbeat():
+        await run_db(save_worker_status, worker_id, os.getpid(), shard.describe(), started_at, _collect_stats())
+
+    # 프런트엔드의 즉시 실행 요청 처리 (오래 걸리는 작업도 확인 주기를 막지 않도록 별도 태스크로 실행)
+    request_tasks = set()
+
+    async def run_request(request_id: int, job: str):
+        result = await job_scheduler.run_now(job)
+        await run_db(finish_worker_request, request_id, {"success": result["success"], "error": result.get("error")})
+
+    async def poll_requests():
+        for request_id, job in await run_db(take_worker_requests, worker_id):
+            task = asyncio.create_task(run_request(request_id, job))
+            request_tasks.add(task)
+            task.add_done_callback(request_tasks.discard)
+
+    app.register_jobs(global_jobs=shard.primary)
+    job_scheduler.add_job("worker_heartbeat", heartbeat, WORKER_HEARTBEAT_SECONDS, initial_delay=0)
+    job_scheduler.add_job("worker_requests", poll_requests, WORKER_REQUEST_POLL_SECONDS, initial_delay=0, jitter=0)
+    job_scheduler.start()
+    flush_task = asyncio.create_task(write_queue.run())
+    logger.info(f"수집 워커 {worker_id} 시작 (pid {os.getpid()}, 담당 {shard.describe()})")
+
+    try:
+        await stop.wait()
+    finally:
+        await job_scheduler.stop()
+        for task in request_tasks:
+            task.cancel()
+        flush_task.cancel()
+        await app.close_session()
+        # 알림 전송에 쓴 텔레그램 봇 세션 정리
+        await (await app.bot.get_session()).close()
+        await write_queue.flush_async()
+        db_executor.shutdown()
+        close_connection()
+        logger.info(f"수집 워커 {worker_id} 종료")
+
+
+# 워커 프로세스 진입점
+def run_worker(worker_id: int, count: int, mode: str, assignment: Dict[str, int]):
+    """
+    수집 워커 프로세스에서 실행됩니다. 담당 범위의 수집 작업만 등록하고 종료 신호를 받을 때까지 실행합니다.
+    """
+    asyncio.run(_run_worker(worker_id, Shard(worker_id, count, mode, assignment)))
+
+
+class WorkerPool:
+    """
+    프런트엔드 프로세스에서 수집 워커 프로세스를 시작하고, 종료된 워커를 다시 시작합니다.
+    """
+
+    def __init__(self, count: int, mode: str):
+        self.count = count
+        self.mode = mode if mode in ("network", "hash") else "network"
+        self.assignment: Dict[str, int] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, Any] = {}
+        self._budget_scaled = False
+        self.restarts = 0
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(
+            target=run_worker, args=(worker_id, self.count, self.mode, self.assignment),
+            name=f"collector-{worker_id}", daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def start(self, networks: Iterable[str]):
+        """
+        워커 프로세스를 시작합니다. 프런트엔드는 봇 업데이트와 명령어만 처리합니다.
+
+        Args:
+            networks (Iterable[str]): 지원 네트워크 목록 (network 방식 배정에 사용)
+        """
+        self.assignment = assign_networks(networks, self.count)
+        if not self._budget_scaled:
+            # 리더가 다시 되어 워커를 재시작해도 한도는 한 번만 줄임
+            limiter.scale(WORKER_FRONTEND_BUDGET)
+            self._budget_scaled = True
+        clear_worker_status()
+
+        for worker_id in range(self.count):
+            self._spawn(worker_id)
+        logger.info(f"수집 워커 {self.count}개 시작 ({self.mode} 방식)")
+
+    async def supervise(self):
+        """
+        종료된 워커를 다시 시작합니다. 작업 스케줄러에서 주기적으로 실행됩니다.
+        """
+        for worker_id, process in list(self._processes.items()):
+            if not process.is_alive():
+                self.restarts += 1
+                logger.error(f"수집 워커 {worker_id} 종료됨 (종료 코드 {process.exitcode}), 다시 시작")
+                self._spawn(worker_id)
+
+    async def run_now(self, name: str, timeout: float = WORKER_REQUEST_TIMEOUT) -> Dict[str, Any]:
+        """
+        모든 워커에 작업 즉시 실행을 요청하고 결과를 기다립니다. 각 워커는 자기 담당 범위에서 작업을 실행합니다.
+        요청은 공유 DB로 전달되므로 리더가 아닌 복제본에서 호출해도 리더의 워커가 실행합니다.
+
+        Args:
+            name (str): 작업 이름
+            timeout (float, optional): 최대 대기 시간(초)
+
+        Returns:
+            Dict[str, Any]: {"success": bool, "error": 실패한 워커의 오류}
+        """
+        pending = await run_db(add_worker_requests, name, range(self.count))
+        results: Dict[int, Dict[str, Any]] = {}
+        deadline = time.monotonic() + timeout
+
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            finished = await run_db(collect_worker_requests, pending)
+            results.update(finished)
+            pending = [request_id for request_id in pending if request_id not in finished]
+
+        if pending:
+            return {"success": False, "error": f"워커 {len(pending)}개가 {timeout:.0f}초 안에 응답하지 않았습니다."}
+
+        errors = [result.get("error") or "알 수 없는 오류" for result in results.values() if not result.get("success")]
+        if errors:
+            return {"success": False, "error": "; ".join(dict.fromkeys(errors))}
+        return {"success": True}
+
+    async def stop(self, timeout: float = 15):
+        """
+        모든 워커에 종료 신호를 보내고 끝날 때까지 기다립니다.
+        """
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        loop = asyncio.get_running_loop()
+        for process in self._processes.values():
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                process.kill()
+        self._processes = {}
+
+
+# 프로세스 전역 워커 풀 (WORKER_PROCESSES > 0일 때만 사용)
+worker_pool = WorkerPool(WORKER_PROCESSES, WORKER_SHARD_BY)
+
+
+# 워커 상태 텍스트 생성 (텔레그램 메시지용)
+async def format_worker_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 워커별 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열 (단일 프로세스 모드에서는 빈 문자열)
+    """
+    if WORKER_PROCESSES <= 0:
+        return ""
+
+    now = time.time()
+    text = f"\n🧵 <b>수집 워커</b> ({WORKER_PROCESSES}개, {worker_pool.mode} 방식, 재시작 {worker_pool.restarts}회)\n"
+
+    for worker in await run_db(get_worker_status):
+        stats = worker["stats"]
+        age = now - worker["heartbeat_at"]
+        state = "정상" if age <= WORKER_HEARTBEAT_SECONDS * 3 else f"⚠️ 응답 없음 {age:.0f}초"
+        runs = sum(job["runs"] for job in stats.get("jobs", {}).values())
+        failures = sum(job["failures"] for job in stats.get("jobs", {}).values())
+        assets = ", ".join(f"{name} {count}" for name, count in stats.get("assets", {}).items())
+
+        text += (
+            f"• #{worker['worker_id']} ({worker['shard']}, pid {worker['pid']}): {state}, "
+            f"CPU {stats.get('cpu_seconds', 0):.0f}초, 메모리 {stats.get('max_rss_mb', 0):.0f}MB\n"
+            f"  API {stats.get('api_used_last_minute', 0)}/{stats.get('api_limit_per_minute', 0):.1f}회/분, "
+            f"작업 {runs}회 (실패 {failures}), 쓰기 대기 {stats.get('write_backlog', 0)}"
+            + (f", 자산 {assets}" if assets else "") + "\n"
+        )
+
+    return text
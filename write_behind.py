@@ -0,0 +1,185 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from db import get_connection, run_db
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 쓰기 지연 설정 (환경 변수로 조정 가능)
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", 1000))  # 주기적 flush 간격(ms)
+WRITE_BEHIND_MAX_BACKLOG = int(os.getenv("WRITE_BEHIND_MAX_BACKLOG", 5000))  # 이 개수 이상 쌓이면 즉시 flush
+
+
+class WriteBehindQueue:
+    """
+    데이터베이스 쓰기를 모아 두었다가 한 트랜잭션에서 executemany로 기록하는 큐입니다.
+    같은 SQL 문의 파라미터를 묶어 실행하며, SQL 문은 처음 들어온 순서대로 실행합니다.
+    """
+
+    def __init__(self, flush_ms: int, max_backlog: int):
+        self.flush_ms = max(flush_ms, 10)
+        self.max_backlog = max(max_backlog, 1)
+        self._pending: Dict[str, List[Sequence[Any]]] = {}
+        self._backlog = 0
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # 통계
+        self.flush_count = 0
+        self.rows_written = 0
+        self.failed_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def backlog(self) -> int:
+        return self._backlog
+
+    def enqueue(self, sql: str, params: Sequence[Any]):
+        """
+        쓰기를 큐에 추가합니다. 실제 기록은 다음 flush에서 이루어집니다.
+
+        Args:
+            sql (str): INSERT/UPDATE/DELETE 문
+            params (Sequence[Any]): 파라미터
+        """
+        self._pending.setdefault(sql, []).append(params)
+        self._backlog += 1
+
+        if self._backlog >= self.max_backlog and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _take(self):
+        # 쌓인 쓰기를 꺼냄 (enqueue와 같은 스레드에서 호출)
+        pending, self._pending = self._pending, {}
+        count, self._backlog = self._backlog, 0
+        return pending, count
+
+    def flush(self) -> int:
+        """
+        쌓인 쓰기를 한 트랜잭션으로 기록합니다. 종료 시처럼 이벤트 루프 밖에서 사용합니다.
+
+        Returns:
+            int: 기록한 행(파라미터) 수
+        """
+        if not self._pending:
+            return 0
+
+        return self._write(*self._take())
+
+    async def flush_async(self) -> int:
+        """
+        쌓인 쓰기를 DB 실행기 스레드에서 한 트랜잭션으로 기록합니다.
+        큐는 이벤트 루프에서 비우므로 기록 중에 들어온 쓰기는 다음 flush로 넘어갑니다.
+
+        Returns:
+            int: 기록한 행(파라미터) 수
+        """
+        if not self._pending:
+            return 0
+
+        return await run_db(self._write, *self._take())
+
+    def _write(self, pending: Dict[str, List[Sequence[Any]]], count: int) -> int:
+        started = time.perf_counter()
+        conn = get_connection()
+
+        try:
+            cursor = conn.cursor()
+            for sql, rows in pending.items():
+                cursor.executemany(sql, rows)
+            conn.commit()
+        except Exception as e:
+            # 묶음 실패 시 한 건씩 다시 기록하여 문제 있는 쓰기만 버림
+            conn.rollback()
+            logger.error(f"지연 쓰기 일괄 flush 실패, 한 건씩 재시도: {str(e)}")
+            count = self._flush_each(conn, pending)
+        finally:
+            conn.close()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flush_count += 1
+        self.rows_written += count
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+        logger.debug(f"지연 쓰기 flush: {count}건, {elapsed_ms:.1f}ms")
+        return count
+
+    def _flush_each(self, conn, pending: Dict[str, List[Sequence[Any]]]) -> int:
+        written = 0
+        cursor = conn.cursor()
+
+        for sql, rows in pending.items():
+            for params in rows:
+                try:
+                    cursor.execute(sql, params)
+                    written += 1
+                except Exception as e:
+                    self.failed_rows += 1
+                    logger.error(f"지연 쓰기 실패 (버림): {str(e)} / {sql.split()[0]} {params}")
+
+        conn.commit()
+        return written
+
+    async def run(self):
+        """
+        flush_ms마다, 또는 쌓인 쓰기가 max_backlog에 도달하면 flush하는 백그라운드 루프입니다.
+        """
+        self._wakeup = asyncio.Event()
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            try:
+                await self.flush_async()
+            except Exception as e:
+                logger.error(f"지연 쓰기 flush 오류: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        큐 통계를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: 대기 중인 쓰기 수, flush 횟수, 기록 행 수, flush 지연(ms)
+        """
+        return {
+            "backlog": self._backlog,
+            "flush_count": self.flush_count,
+            "rows_written": self.rows_written,
+            "failed_rows": self.failed_rows,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.flush_count if self.flush_count else 0.0,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+
+# 프로세스 전역 쓰기 큐
+write_queue = WriteBehindQueue(flush_ms=WRITE_BEHIND_FLUSH_MS, max_backlog=WRITE_BEHIND_MAX_BACKLOG)
+
+
+# 쓰기 큐 상태 텍스트 생성 (텔레그램 메시지용)
+def format_write_queue_status() -> str:
+    """
+    /apistatus 명령어에서 사용할 쓰기 큐 상태 문자열을 생성합니다.
+
+    Returns:
+        str: HTML 형식의 상태 문자열
+    """
+    stats = write_queue.stats()
+
+    return (
+        f"\n💾 <b>DB 쓰기 큐</b>\n"
+        f"대기: <b>{stats['backlog']}</b>건, flush {stats['flush_count']}회 ({stats['rows_written']}건 기록)\n"
+        f"flush 지연: 최근 {stats['last_flush_ms']:.1f}ms / 평균 {stats['avg_flush_ms']:.1f}ms / 최대 {stats['max_flush_ms']:.1f}ms\n"
+        + (f"실패로 버린 쓰기: {stats['failed_rows']}건\n" if stats["failed_rows"] else "")
+    )